@@ -0,0 +1,89 @@
+"""
+Benchmark loading commit details with vaskitsa.git.commit.GitCommit
+
+Creates a synthetic git repository with COMMIT_COUNT commits with git fast-import
+and compares GitCommit.to_dict(), which loads all fields with a single git show
+command, to the previous implementation running one git show command for each
+field. The previous implementation is measured on a sample of commits and
+extrapolated to all commits, because it takes a long time.
+
+Run with: python benchmarks/git_commit_details.py
+"""
+import subprocess
+import sys
+import time
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from vaskitsa.git.commit import COMMIT_FIELDS, COMMIT_SIGNATURE_FIELDS
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+COMMIT_COUNT = 1000
+LEGACY_SAMPLE_COUNT = 50
+
+
+def create_synthetic_repository(path: Path) -> None:
+    """
+    Create git repository with COMMIT_COUNT commits with git fast-import
+    """
+    path.mkdir()
+    subprocess.run(('git', 'init', '-q'), cwd=path, check=True)
+    commands = []
+    for index in range(COMMIT_COUNT):
+        content = f'value = {index}\n'
+        message = f'Commit number {index}\n'
+        commands.append('commit refs/heads/main')
+        commands.append(f'committer Benchmark <benchmark@example.com> {1600000000 + index} +0000')
+        commands.append(f'data {len(message)}\n{message}')
+        commands.append(f'M 100644 inline module_{index % 10}.py')
+        commands.append(f'data {len(content)}\n{content}')
+    subprocess.run(
+        ('git', 'fast-import', '--quiet'),
+        cwd=path,
+        input='\n'.join(commands).encode('utf-8'),
+        check=True
+    )
+    subprocess.run(('git', 'checkout', '-q', 'main'), cwd=path, check=True)
+
+
+def legacy_to_dict(repository: GitRepository, revision: str) -> dict:
+    """
+    Load commit fields with one git show command for each field as before
+    """
+    return {
+        field: run_git_command('show', '--no-notes', '--no-patch', f'--format={placeholder}', revision, cwd=repository)
+        for field, placeholder in COMMIT_FIELDS + COMMIT_SIGNATURE_FIELDS
+    }
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results
+    """
+    with TemporaryDirectory() as directory:
+        path = Path(directory, 'synthetic-repository')
+        create_synthetic_repository(path)
+        repository = GitRepository(path)
+        revisions = run_git_command('rev-list', 'HEAD', cwd=path)
+
+        start = time.perf_counter()
+        for revision in revisions[:LEGACY_SAMPLE_COUNT]:
+            legacy_to_dict(repository, revision)
+        legacy = (time.perf_counter() - start) / LEGACY_SAMPLE_COUNT
+
+        start = time.perf_counter()
+        for revision in revisions:
+            repository.get_commit(revision).to_dict()
+        batched = (time.perf_counter() - start) / len(revisions)
+
+    print(f'{len(revisions)} commits')
+    print(f'{"implementation":>16} {"ms/commit":>10} {"total s":>10}')
+    print(f'{"legacy":>16} {legacy * 1000:>10.2f} {legacy * len(revisions):>10.2f} (estimated)')
+    print(f'{"single command":>16} {batched * 1000:>10.2f} {batched * len(revisions):>10.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+Benchmark reading file contents at a revision with vaskitsa.git.batch.GitObjectReader
+
+Compares reading every file in the repository at HEAD by running git show
+<revision>:<path> for each file to reading them through the persistent git cat-file
+process of the object reader. Run in a git repository, by default the current
+directory.
+
+Run with: python benchmarks/git_object_reader.py [repository]
+"""
+import os
+import sys
+import time
+
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+REVISION = 'HEAD'
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results
+    """
+    repository = GitRepository(sys.argv[1] if len(sys.argv) > 1 else os.getcwd())
+    filenames = run_git_command('ls-tree', '-r', '--name-only', REVISION, cwd=repository)
+
+    start = time.perf_counter()
+    for filename in filenames:
+        run_git_command('show', f'{REVISION}:{filename}', cwd=repository)
+    commands = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for filename in filenames:
+        repository.object_reader.read_file(REVISION, filename)
+    reader = time.perf_counter() - start
+    repository.close()
+
+    print(f'{len(filenames)} files at {REVISION}')
+    print(f'{"implementation":>16} {"us/file":>10} {"total s":>10}')
+    print(f'{"git show":>16} {commands / len(filenames) * 1000000:>10.1f} {commands:>10.3f}')
+    print(f'{"object reader":>16} {reader / len(filenames) * 1000000:>10.1f} {reader:>10.3f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
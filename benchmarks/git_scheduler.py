@@ -0,0 +1,75 @@
+"""
+Benchmark running git operations in many repositories with vaskitsa.git.scheduler
+
+Creates mock git repositories with a few commits and compares running a change set
+and log command for each repository in a serial loop to running the same operations
+with GitScheduler.
+
+Run with: python benchmarks/git_scheduler.py [repositories] [concurrency]
+"""
+import subprocess
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from vaskitsa.git.scheduler import GitScheduler
+from vaskitsa.git.utils import run_git_command
+
+DEFAULT_REPOSITORY_COUNT = 100
+DEFAULT_CONCURRENCY = 8
+MOCK_GIT_ENVIRONMENT = ('-c', 'user.name=Benchmark', '-c', 'user.email=benchmark@example.com')
+
+
+def create_repository(path: Path) -> None:
+    """
+    Create mock repository with two commits
+    """
+    path.mkdir()
+    subprocess.run(('git', 'init', '-q'), cwd=path, check=True)
+    for index in range(2):
+        path.joinpath('file.txt').write_text(f'{index}\n', encoding='utf-8')
+        subprocess.run(('git', 'add', 'file.txt'), cwd=path, check=True)
+        subprocess.run(
+            ('git',) + MOCK_GIT_ENVIRONMENT + ('commit', '-q', '-m', f'commit {index}'),
+            cwd=path,
+            check=True
+        )
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_REPOSITORY_COUNT
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CONCURRENCY
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [Path(tmpdir, f'repository-{index}') for index in range(count)]
+        for path in paths:
+            create_repository(path)
+
+        start = time.perf_counter()
+        for path in paths:
+            run_git_command('diff-tree', '--name-status', '-r', 'HEAD~1..HEAD', cwd=path)
+            run_git_command('log', '--format=%s', cwd=path)
+        serial = time.perf_counter() - start
+
+        start = time.perf_counter()
+        scheduler = GitScheduler(max_concurrency=concurrency)
+        for path in paths:
+            scheduler.add_change_set(path, 'HEAD~1', 'HEAD')
+            scheduler.add_command(path, 'log', '--format=%s')
+        results = scheduler.run()
+        scheduled = time.perf_counter() - start
+        errors = [result for result in results if not result.ok]
+
+    print(f'{count} repositories, concurrency {concurrency}, {len(errors)} errors')
+    print(f'{"implementation":>16} {"total s":>10}')
+    print(f'{"serial":>16} {serial:>10.3f}')
+    print(f'{"scheduler":>16} {scheduled:>10.3f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Benchmark matching ignored paths with vaskitsa.ignore.IgnorePatterns
+
+Creates a synthetic package tree and a list of hundreds of ignore patterns and
+compares the compiled matcher to the previous implementation, which matched each
+entry name against every pattern with fnmatch. Reports both the time to match
+all tree paths and the time to scan the tree with the package scanner.
+
+Run with: python benchmarks/ignore_patterns.py
+"""
+import fnmatch
+import os
+import sys
+import time
+
+from operator import attrgetter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Tuple
+
+import yaml
+
+from vaskitsa.configuration import DEFAULT_IGNORED_DIRECTORIES, REPOSITORY_CONFIGURATION
+from vaskitsa.ignore import IgnorePatterns
+from vaskitsa.python.package import Package
+from vaskitsa.python.scanner import PYTHON_FILE_SUFFIX, PackageScanner
+
+PATTERN_COUNTS = (10, 100, 500)
+DIRECTORY_COUNT = 1000
+FILES_PER_DIRECTORY = 10
+REPEAT = 3
+
+
+def create_patterns(count: int) -> List[str]:
+    """
+    Create count ignore patterns with literal names, globs and anchored paths
+    """
+    patterns = list(DEFAULT_IGNORED_DIRECTORIES)
+    index = 0
+    while len(patterns) < count:
+        patterns.extend((
+            f'ignored_{index}/',
+            f'*.generated_{index}.py',
+            f'vendor_{index}_*/',
+            f'synthetic/group_{index}/skip_*.py',
+        ))
+        index += 1
+    return patterns[:count]
+
+
+def create_synthetic_package(path: Path) -> List[Tuple[str, bool]]:
+    """
+    Create synthetic package tree, returning relative paths of all entries
+    """
+    entries = []
+    for index in range(DIRECTORY_COUNT):
+        directory = path.joinpath('synthetic', f'group_{index // 10}', f'module_{index}')
+        directory.mkdir(parents=True)
+        entries.append((directory.relative_to(path).as_posix(), True))
+        for file_index in range(FILES_PER_DIRECTORY):
+            filename = directory.joinpath(f'file_{file_index}.py')
+            filename.write_text('', encoding='utf-8')
+            entries.append((filename.relative_to(path).as_posix(), False))
+    return entries
+
+
+class LegacyPackageScanner(PackageScanner):
+    """
+    Package scanner matching entry names with fnmatch for each pattern as before
+    """
+    def __init__(self, package: Package) -> None:
+        super().__init__(package)
+        self.__patterns__ = [pattern.rstrip('/') for pattern in self.excluded]
+
+    def is_excluded_name(self, name: str) -> bool:
+        """
+        Check if a file or directory name matches the excluded patterns
+        """
+        if name in self.excluded:
+            return True
+        for pattern in self.__patterns__:
+            if fnmatch.fnmatch(name, pattern):
+                return True
+        return False
+
+    def __read_directory__(self, path: str, parts: Tuple[str]) -> List[Tuple[str, bool]]:
+        try:
+            with os.scandir(path) as iterator:
+                entries = sorted(iterator, key=attrgetter('name'))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return []
+        items = []
+        for entry in entries:
+            if self.is_excluded_name(entry.name):
+                continue
+            if entry.is_dir():
+                items.append((entry.name, True))
+            elif entry.name.endswith(PYTHON_FILE_SUFFIX) and entry.is_file():
+                items.append((entry.name, False))
+        return items
+
+
+def best_time(callback) -> float:
+    """
+    Return best time of REPEAT runs of callback
+    """
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        callback()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results table
+    """
+    with TemporaryDirectory() as directory:
+        path = Path(directory, 'synthetic-package')
+        entries = create_synthetic_package(path)
+        print(f'{len(entries)} tree entries')
+        print(f'{"patterns":>8} {"legacy match s":>15} {"compiled s":>11} {"legacy scan s":>14} {"scan s":>8}')
+        for count in PATTERN_COUNTS:
+            path.joinpath(REPOSITORY_CONFIGURATION).write_text(
+                yaml.safe_dump({'ignored_directories': create_patterns(count)}),
+                encoding='utf-8'
+            )
+            package = Package(path)
+            legacy = LegacyPackageScanner(package)
+            compiled = IgnorePatterns(package.excluded)
+
+            legacy_match = best_time(
+                lambda: [legacy.is_excluded_name(item.rsplit('/', 1)[-1]) for item, _is_directory in entries]
+            )
+            compiled_match = best_time(
+                lambda: [compiled.match(item, is_directory) for item, is_directory in entries]
+            )
+            legacy_scan = best_time(legacy.scan)
+            scan = best_time(package.scanner.scan)
+            print(
+                f'{len(package.excluded):>8} {legacy_match:>15.4f} {compiled_match:>11.4f} '
+                f'{legacy_scan:>14.4f} {scan:>8.4f}'
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Benchmark parsing python files of a large package with vaskitsa.python.analyzer
+
+Creates a synthetic package with many python files and compares parsing the file
+summaries in the calling process to parsing them with the process pool analyzer.
+The summary and fingerprint caches are cleared before each run, so every file is read
+and parsed. The lookup time is the time the calling process spends looking up cached
+fingerprints before sending the files to the workers, which limits the speedup.
+
+Run with: python benchmarks/package_analyzer.py [files] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from pathlib import Path
+
+from vaskitsa.git.fingerprint import clear_fingerprint_cache
+from vaskitsa.python.package import Package
+from vaskitsa.python.summary import clear_summary_cache
+
+DEFAULT_FILE_COUNT = 20000
+# Files are created with old modification times like files in a real work tree, so
+# their fingerprints are not skipped from the cache as recently modified
+MOCK_OLD_MTIME = 1600000000
+FILES_PER_MODULE = 100
+MOCK_FILE_TEMPLATE = '''"""
+Synthetic module {index}
+"""
+import os
+from .module_{previous} import Handler{previous}
+
+MAX_ITEMS_{index} = {index}
+
+
+class Handler{index}:
+    """
+    Handler {index}
+    """
+    def handle(self, value):
+        if value > MAX_ITEMS_{index}:
+            return [item * 2 for item in range(value)]
+        return {{'value': value, 'path': os.getcwd()}}
+
+
+def process_{index}(items):
+    """
+    Process items
+    """
+    return sorted(Handler{index}().handle(item) for item in items)
+'''
+
+
+def create_package(path: Path, count: int) -> None:
+    """
+    Create synthetic package with count python files with old modification times
+    """
+    path.mkdir(parents=True)
+    path.joinpath('setup.py').write_text('', encoding='utf-8')
+    for index in range(count):
+        directory = path.joinpath('synthetic', f'group_{index // FILES_PER_MODULE}')
+        if not directory.is_dir():
+            directory.mkdir(parents=True)
+            directory.joinpath('__init__.py').write_text('', encoding='utf-8')
+        directory.joinpath(f'module_{index}.py').write_text(
+            MOCK_FILE_TEMPLATE.format(index=index, previous=max(index - 1, 0)),
+            encoding='utf-8',
+        )
+    path.joinpath('synthetic', '__init__.py').write_text('', encoding='utf-8')
+    for item in path.rglob('*.py'):
+        os.utime(item, (MOCK_OLD_MTIME, MOCK_OLD_MTIME))
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_FILE_COUNT
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir, 'synthetic-package')
+        create_package(path, count)
+        package = Package(path)
+        files = package.python_files
+
+        clear_fingerprint_cache()
+        start = time.perf_counter()
+        package.get_file_fingerprints(files, hash_files=False)
+        lookup = time.perf_counter() - start
+
+        results = []
+        for name, max_workers in (('serial', 1), ('process pool', workers)):
+            clear_summary_cache()
+            clear_fingerprint_cache()
+            start = time.perf_counter()
+            symbol_table = package.analyze_files(files, max_workers=max_workers)
+            results.append((name, time.perf_counter() - start, len(symbol_table)))
+
+        start = time.perf_counter()
+        package.analyze_files(files, max_workers=workers)
+        cached = time.perf_counter() - start
+
+    print(f'{len(files)} files, {workers} workers')
+    print(f'{"implementation":>16} {"total s":>10} {"symbols":>10}')
+    for name, duration, symbols in results:
+        print(f'{name:>16} {duration:>10.3f} {symbols:>10}')
+    print(f'{"cached":>16} {cached:>10.3f}')
+    print(f'{"lookup":>16} {lookup:>10.3f}')
+    print(f'speedup {results[0][1] / results[1][1]:.2f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark python module discovery in vaskitsa.python.package.Package
+
+Creates synthetic package trees with increasing file counts and reports the
+time per file for detecting modules. With a single pass scanner the time per
+file should stay roughly constant, i.e. discovery scales linearly with the
+number of files in the tree.
+
+Run with: python benchmarks/package_discovery.py
+"""
+import sys
+import time
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from vaskitsa.python.package import Package
+
+FILE_COUNTS = (1000, 2000, 4000, 8000, 16000)
+FILES_PER_MODULE = 10
+MODULES_PER_DIRECTORY = 10
+REPEAT = 3
+
+
+def create_synthetic_package(path: Path, file_count: int) -> Path:
+    """
+    Create synthetic package with file_count python files
+    """
+    module_count = file_count // FILES_PER_MODULE
+    for index in range(module_count):
+        module = path.joinpath(
+            'synthetic',
+            f'group_{index // MODULES_PER_DIRECTORY}',
+            f'module_{index}'
+        )
+        module.mkdir(parents=True)
+        module.joinpath('__init__.py').write_text('', encoding='utf-8')
+        for file_index in range(1, FILES_PER_MODULE):
+            module.joinpath(f'file_{file_index}.py').write_text('', encoding='utf-8')
+        module.joinpath('data.txt').write_text('', encoding='utf-8')
+    return path
+
+
+def time_discovery(path: Path) -> float:
+    """
+    Return best time of REPEAT runs for detecting modules in a new package object
+    """
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        Package(path).detect_python_modules()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results table
+    """
+    results = []
+    print(f'{"files":>8} {"seconds":>10} {"us/file":>10}')
+    for file_count in FILE_COUNTS:
+        with TemporaryDirectory() as directory:
+            path = create_synthetic_package(Path(directory, 'synthetic-package'), file_count)
+            seconds = time_discovery(path)
+        per_file = seconds / file_count * 1000000
+        results.append(per_file)
+        print(f'{file_count:>8} {seconds:>10.4f} {per_file:>10.2f}')
+
+    ratio = results[-1] / results[0]
+    print(f'per file cost ratio largest / smallest tree: {ratio:.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
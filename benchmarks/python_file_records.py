@@ -0,0 +1,154 @@
+"""
+Benchmark memory use and derived path throughput of vaskitsa.python.file.PythonFile
+
+Compares the slotted PythonFile with cached derived paths to the previous
+implementation, which stored attributes in instance dictionaries and computed
+relative_path, relative_directory and import_path on every access.
+
+Run with: python benchmarks/python_file_records.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List, Optional
+
+from vaskitsa.python.file import PythonFile
+from vaskitsa.python.module import PythonModule
+from vaskitsa.python.package import Package
+
+FILE_COUNT = 100000
+FILES_PER_MODULE = 20
+ACCESS_ROUNDS = 5
+
+
+class LegacyPythonFile:
+    """
+    Copy of the previous PythonFile implementation for comparison
+    """
+    def __init__(self, path, module=None) -> None:
+        self.module = module
+        self.path = Path(path)
+        self.module_root = self.path.name == '__init__.py'
+
+    @property
+    def relative_path(self) -> Optional[Path]:
+        """
+        Return path relative to package
+        """
+        if self.module and self.module.package:
+            return self.path.relative_to(self.module.package)
+        return None
+
+    @property
+    def relative_directory(self) -> Optional[Path]:
+        """
+        Return parent directory relative to package root
+        """
+        if self.relative_path:
+            return self.relative_path.parent
+        return None
+
+    @property
+    def import_path(self) -> Optional[str]:
+        """
+        Return file import path
+        """
+        path = self.relative_path
+        if path is not None:
+            if path.name == '__init__.py':
+                path = path.with_suffix('').parent
+            else:
+                path = path.with_suffix('')
+            return str(path).replace(os.sep, '.')
+        return None
+
+
+def create_modules(package: Package) -> List[PythonModule]:
+    """
+    Create python module objects for synthetic files without touching filesystem
+    """
+    return [
+        PythonModule(package.joinpath('synthetic', f'module_{index}'), package=package, files=[])
+        for index in range(FILE_COUNT // FILES_PER_MODULE)
+    ]
+
+
+def create_files(file_class: type, modules: List[PythonModule]) -> list:
+    """
+    Create FILE_COUNT file objects with specified class
+    """
+    files = []
+    for module in modules:
+        files.append(file_class(module.joinpath('__init__.py'), module=module))
+        for index in range(1, FILES_PER_MODULE):
+            files.append(file_class(module.joinpath(f'file_{index}.py'), module=module))
+    return files
+
+
+def access_derived_paths(files: list) -> None:
+    """
+    Access derived paths of all files ACCESS_ROUNDS times
+    """
+    for _ in range(ACCESS_ROUNDS):
+        for item in files:
+            # pylint: disable=pointless-statement
+            item.relative_path
+            item.relative_directory
+            item.import_path
+
+
+def measure(file_class: type, modules: List[PythonModule]) -> dict:
+    """
+    Measure memory used by file objects and time to create them and access derived paths
+
+    Memory is measured after creating the objects and after accessing derived paths, which
+    includes the values cached by the objects.
+    """
+    tracemalloc.start()
+    files = create_files(file_class, modules)
+    created_memory = tracemalloc.get_traced_memory()[0]
+    access_derived_paths(files)
+    accessed_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del files
+
+    start = time.perf_counter()
+    files = create_files(file_class, modules)
+    create_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    access_derived_paths(files)
+    access_seconds = time.perf_counter() - start
+
+    return {
+        'created_memory': created_memory / len(files),
+        'accessed_memory': accessed_memory / len(files),
+        'create': create_seconds,
+        'access': access_seconds,
+    }
+
+
+def main() -> int:
+    """
+    Run the benchmark and print results table
+    """
+    with TemporaryDirectory() as directory:
+        package = Package(directory)
+        modules = create_modules(package)
+        print(f'{FILE_COUNT} files, {ACCESS_ROUNDS} rounds of derived path access')
+        print(f'{"class":>18} {"bytes/file":>12} {"cached":>12} {"create s":>10} {"access s":>10}')
+        for file_class in (LegacyPythonFile, PythonFile):
+            result = measure(file_class, modules)
+            print(
+                f'{file_class.__name__:>18} {result["created_memory"]:>12.0f} {result["accessed_memory"]:>12.0f} '
+                f'{result["create"]:>10.3f} {result["access"]:>10.3f}'
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
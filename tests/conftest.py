@@ -0,0 +1,21 @@
+"""
+Unit test configuration shared by all test modules
+"""
+from pathlib import Path
+
+import pytest
+
+from .utils import create_git_repository
+
+
+@pytest.fixture
+def git_repository(tmpdir):
+    """
+    Factory for mock git repositories in temporary directory
+
+    The factory takes repository directory name and optional files, branch and first
+    commit message, and returns path to the repository
+    """
+    def create(name='repository', **kwargs):
+        return create_git_repository(Path(tmpdir.strpath, name), **kwargs)
+    yield create
@@ -0,0 +1,76 @@
+"""
+Unit tests for vaskitsa.git.batch module
+"""
+import threading
+
+from vaskitsa.git.batch import GitObjectReader
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+from ..constants import REPO_ROOT_PATH
+
+MOCK_THREAD_COUNT = 8
+MOCK_THREAD_ROUNDS = 20
+MOCK_FILENAME = 'pyproject.toml'
+
+
+def test_git_object_reader_lookups():
+    """
+    Test looking up objects with persistent git cat-file processes
+    """
+    repository = GitRepository(REPO_ROOT_PATH)
+    reader = repository.object_reader
+    assert isinstance(reader, GitObjectReader)
+    assert isinstance(reader.__repr__(), str)
+    assert repository.object_reader is reader
+
+    head = run_git_command('rev-parse', 'HEAD', cwd=REPO_ROOT_PATH)[0]
+    info = reader.get_info('HEAD')
+    assert info.object_hash == head
+    assert info.object_type == 'commit'
+    assert info.data is None
+    assert reader.get_info('no-such-revision') is None
+    assert reader.get_info('HEAD:no such file') is None
+
+    expected = REPO_ROOT_PATH.joinpath(MOCK_FILENAME).read_bytes()
+    assert reader.read_file('HEAD', MOCK_FILENAME) == expected
+    assert reader.read_file('HEAD', 'no-such-file') is None
+    assert (
+        '100644',
+        MOCK_FILENAME,
+        reader.get_info(f'HEAD:{MOCK_FILENAME}').object_hash
+    ) in reader.read_tree('HEAD')
+
+    details = reader.read_commit('HEAD')
+    assert details['commit_hash'] == head
+    assert details['commit_message'] == run_git_command('show', '--no-patch', '--format=%s', cwd=REPO_ROOT_PATH)[0]
+
+    commit = repository.read_commit('HEAD')
+    assert commit.to_dict() == dict(repository.get_commit(head).to_dict(), revision=head)
+
+    repository.close()
+    assert reader.get_info('HEAD').object_hash == head
+    reader.close()
+
+
+def test_git_object_reader_threads():
+    """
+    Test object lookups from multiple threads with a shared reader
+    """
+    expected = REPO_ROOT_PATH.joinpath(MOCK_FILENAME).read_bytes()
+    errors = []
+
+    with GitObjectReader(GitRepository(REPO_ROOT_PATH)) as reader:
+        def read_files():
+            for _ in range(MOCK_THREAD_ROUNDS):
+                if reader.read_file('HEAD', MOCK_FILENAME) != expected:
+                    errors.append('unexpected file contents')
+                if reader.get_info('HEAD').object_type != 'commit':
+                    errors.append('unexpected object type')
+
+        threads = [threading.Thread(target=read_files) for _ in range(MOCK_THREAD_COUNT)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert errors == []
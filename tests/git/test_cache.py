@@ -0,0 +1,68 @@
+"""
+Unit tests for vaskitsa.git.cache module
+"""
+from unittest.mock import patch
+
+from vaskitsa.git.cache import GitCommitCache
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+from ..constants import REPO_ROOT_PATH
+
+MOCK_DETAILS = {'commit_hash': 'a' * 40, 'author_name': 'Test'}
+
+
+def test_git_commit_cache_lru(tmpdir):
+    """
+    Test commit cache drops least recently used commits and counts hits and misses
+    """
+    cache = GitCommitCache(2)
+    assert isinstance(cache.__repr__(), str)
+    cache.set('a', MOCK_DETAILS)
+    cache.set('b', MOCK_DETAILS)
+    assert cache.get('a') == MOCK_DETAILS
+    cache.set('c', MOCK_DETAILS)
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.stats == {'hits': 1, 'misses': 1, 'size': 2, 'max_size': 2}
+
+    path = tmpdir.join('cache', 'commits.json').strpath
+    cache = GitCommitCache(2, path=path)
+    cache.set('a', MOCK_DETAILS)
+    cache.save()
+    cache = GitCommitCache(2, path=path)
+    assert cache.get('a') == MOCK_DETAILS
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.stats['hits'] == 0
+
+
+def test_git_commit_cache_shared_details():
+    """
+    Test commit details are shared between commit objects for same commit hash
+    """
+    repository = GitRepository(REPO_ROOT_PATH)
+    cache = repository.commit_cache
+    assert GitRepository(REPO_ROOT_PATH).commit_cache is cache
+    cache.clear()
+
+    commit_hash = run_git_command('rev-parse', 'HEAD', cwd=REPO_ROOT_PATH)[0]
+    commit = repository.get_commit('HEAD')
+    assert commit.author_name
+    assert commit_hash in cache
+    assert cache.stats['misses'] == 1
+
+    with patch.object(GitRepository, 'run_git_command_records', autospec=True) as mock_run:
+        other = repository.get_commit(commit_hash)
+        assert other.author_name == commit.author_name
+        assert other.commit_message == commit.commit_message
+        mock_run.assert_not_called()
+    assert cache.stats['hits'] == 1
+
+    with patch.object(
+            GitRepository,
+            'run_git_command_records',
+            autospec=True,
+            side_effect=GitRepository.run_git_command_records) as mock_run:
+        assert other.ref_names == commit.ref_names
+        assert mock_run.call_count == 1
@@ -0,0 +1,112 @@
+"""
+Unit tests for vaskitsa.git.changeset module
+"""
+from pathlib import Path
+
+import pytest
+
+from vaskitsa.exceptions import GitError
+from vaskitsa.git.changeset import GitChangeState, get_change_set_command, iter_change_records
+from vaskitsa.git.repository import GitRepository
+
+from ..utils import git
+
+
+def create_mock_change_repository(git_repository):
+    """
+    Create mock repository with two commits and all common change types between them
+    """
+    path = git_repository(files={
+        name: ''.join(f'{name} {index}\n' for index in range(20))
+        for name in ('old.txt', 'modified.txt', 'deleted.txt', 'src/copied.txt')
+    })
+
+    git(path, 'mv', 'old.txt', 'new name\twith tab.txt')
+    path.joinpath('modified.txt').write_text('modified\n', encoding='utf-8')
+    path.joinpath('deleted.txt').unlink()
+    path.joinpath('src/added.txt').write_text('added\n', encoding='utf-8')
+    contents = path.joinpath('src/copied.txt').read_text(encoding='utf-8')
+    path.joinpath('src/copy.txt').write_text(contents, encoding='utf-8')
+    path.joinpath('src/copied.txt').write_text(f'{contents}modified\n', encoding='utf-8')
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', 'second')
+    return GitRepository(path)
+
+
+def test_git_change_set_command():
+    """
+    Test git diff-tree arguments for change sets
+    """
+    assert get_change_set_command('a', 'b') == [
+        'diff-tree', '-z', '--no-commit-id', '--name-status', '-r', 'a..b', '--'
+    ]
+    assert get_change_set_command('a', 'b', paths=[Path('src')], find_renames=True)[-4:] == [
+        '-M', 'a..b', '--', 'src'
+    ]
+    assert '-C' in get_change_set_command('a', 'b', find_renames=True, find_copies=True)
+
+
+def test_git_change_records_parse():
+    """
+    Test parsing git name status records with rename and copy scores
+    """
+    records = iter(['M', 'a.py', 'R100', 'old.py', 'new.py', 'C075', 'b.py', 'c.py', 'D', 'd.py'])
+    changes = list(iter_change_records(records))
+    assert [change.state for change in changes] == [
+        GitChangeState.MODIFIED,
+        GitChangeState.RENAMED,
+        GitChangeState.COPIED,
+        GitChangeState.DELETED,
+    ]
+    assert changes[1].old_path == Path('old.py')
+    assert changes[1].path == Path('new.py')
+    assert changes[1].similarity == 100
+    assert changes[2].similarity == 75
+    assert changes[3].old_path is None
+    assert changes[3].similarity is None
+
+    with pytest.raises(GitError):
+        list(iter_change_records(['X', 'a.py']))
+    with pytest.raises(GitError):
+        list(iter_change_records(['R100', 'old.py']))
+
+
+def test_git_change_set_states(git_repository):
+    """
+    Test loading change set lists with and without rename detection
+    """
+    repository = create_mock_change_repository(git_repository)
+    change_set = repository.get_change_set('HEAD~1', 'HEAD')
+    assert change_set.added == [Path('new name\twith tab.txt'), Path('src/added.txt'), Path('src/copy.txt')]
+    assert change_set.deleted == [Path('deleted.txt'), Path('old.txt')]
+    assert change_set.modified == [Path('modified.txt'), Path('src/copied.txt')]
+    assert change_set.renamed == []
+
+    change_set = repository.get_change_set('HEAD~1', 'HEAD', find_copies=True)
+    assert change_set.renamed == [Path('new name\twith tab.txt')]
+    assert change_set.copied == [Path('src/copy.txt')]
+    assert change_set.deleted == [Path('deleted.txt')]
+    assert change_set.filter('renamed,copied') == [Path('new name\twith tab.txt'), Path('src/copy.txt')]
+
+    renamed = list(change_set.iter_changes(states=[GitChangeState.RENAMED]))
+    assert len(renamed) == 1
+    assert renamed[0].old_path == Path('old.txt')
+    assert renamed[0].similarity == 100
+
+
+def test_git_change_set_paths(git_repository):
+    """
+    Test limiting change set to path prefixes
+    """
+    repository = create_mock_change_repository(git_repository)
+    change_set = repository.get_change_set('HEAD~1', 'HEAD', paths=['src'])
+    assert [change.path for change in change_set] == [
+        Path('src/added.txt'),
+        Path('src/copied.txt'),
+        Path('src/copy.txt'),
+    ]
+
+    commit = repository.get_commit('HEAD~1')
+    change_set = commit.get_change_set('HEAD', paths=['modified.txt'])
+    assert change_set.modified == [Path('modified.txt')]
+    assert change_set.added == []
@@ -0,0 +1,123 @@
+"""
+Unit tests for vaskitsa.git.churn module
+"""
+import os
+
+from pathlib import Path
+
+from vaskitsa.git.churn import GitChurnEngine, iter_numstat_commits
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.python.package import Package
+
+from ..utils import git, write_files
+
+MOCK_AUTHORS = {
+    'first': ('First Author', 'first@example.com', '2024-01-15T12:00:00Z'),
+    'second': ('Second Author', 'second@example.com', '2024-02-15T12:00:00Z'),
+}
+
+
+def commit_files(path, author, files, message):
+    """
+    Write files and commit them as mock author
+    """
+    name, email, date = MOCK_AUTHORS[author]
+    write_files(path, files)
+    environment = dict(
+        os.environ,
+        GIT_AUTHOR_NAME=name,
+        GIT_AUTHOR_EMAIL=email,
+        GIT_AUTHOR_DATE=date,
+        GIT_COMMITTER_NAME=name,
+        GIT_COMMITTER_EMAIL=email,
+        GIT_COMMITTER_DATE=date,
+    )
+    git(path, 'add', '-A')
+    git(path, 'commit', '-q', '-m', message, env=environment)
+
+
+def create_mock_churn_repository(git_repository):
+    """
+    Create mock python package repository with commits from two authors
+    """
+    path = git_repository()
+    commit_files(path, 'first', {
+        'setup.py': '',
+        'demo/__init__.py': 'a\nb\n',
+        'demo/main.py': 'a\nb\nc\n',
+        'demo/sub/__init__.py': 'a\n',
+    }, 'first')
+    commit_files(path, 'second', {
+        'demo/__init__.py': 'a\nB\n',
+        'demo/main.py': 'a\nb\nc\nd\n',
+    }, 'second')
+    return GitRepository(path)
+
+
+def test_git_churn_numstat_parse():
+    """
+    Test parsing git log numstat records with renames and binary files
+    """
+    records = [
+        '\x1eabc', 'Name', 'name@example.com', '1700000000', '',
+        '\n1\t2\tfile.py', '-\t-\timage.png', '0\t0\t', 'old.py', 'new.py',
+        '\x1edef', 'Other', 'other@example.com', '1700000001', '',
+    ]
+    commits = list(iter_numstat_commits(records))
+    assert len(commits) == 2
+    assert commits[0]['commit_hash'] == 'abc'
+    assert commits[0]['files'] == [('file.py', 1, 2), ('image.png', 0, 0), ('new.py', 0, 0)]
+    assert commits[1]['author_email'] == 'other@example.com'
+    assert commits[1]['files'] == []
+
+
+def test_git_churn_incremental(git_repository, tmpdir):
+    """
+    Test churn statistics are updated incrementally and saved to cache file
+    """
+    repository = create_mock_churn_repository(git_repository)
+    cache_path = Path(tmpdir.strpath, 'cache', 'churn.json')
+    engine = GitChurnEngine(repository, path=cache_path)
+    assert engine.update() == 2
+    assert engine.update() == 0
+
+    statistics = engine.get_directory_statistics('demo')
+    assert statistics.commits == 2
+    assert statistics.added == 7
+    assert statistics.deleted == 1
+    assert [author['email'] for author in statistics.top_authors()] == ['first@example.com', 'second@example.com']
+    assert statistics.top_authors(1)[0]['added'] == 5
+    assert statistics.periods == {
+        '2024-01': {'commits': 1, 'added': 5, 'deleted': 0},
+        '2024-02': {'commits': 1, 'added': 2, 'deleted': 1},
+    }
+    assert engine.get_directory_statistics('demo/sub').commits == 1
+    assert engine.get_directory_statistics('missing').commits == 0
+    assert engine.total.commits == 2
+    engine.save()
+
+    commit_files(repository, 'second', {'demo/sub/__init__.py': 'b\n'}, 'third')
+    engine = GitChurnEngine(repository, path=cache_path)
+    assert engine.total.commits == 2
+    assert engine.update() == 1
+    assert engine.get_directory_statistics('demo/sub').commits == 2
+
+    git(repository, 'reset', '-q', '--hard', 'HEAD~2')
+    assert engine.update() == 1
+    assert engine.total.commits == 1
+
+
+def test_git_churn_package_modules(git_repository):
+    """
+    Test churn statistics by python module
+    """
+    repository = create_mock_churn_repository(git_repository)
+    package = Package(repository)
+    statistics = {
+        str(module.relative_directory): value
+        for module, value in package.get_module_churn().items()
+    }
+    assert statistics['demo'].commits == 2
+    assert statistics['demo/sub'].commits == 1
+    assert statistics['demo/sub'].top_authors()[0]['name'] == 'First Author'
+    assert repository.churn is GitRepository(repository).churn
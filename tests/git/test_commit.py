@@ -0,0 +1,55 @@
+"""
+Unit tests for vaskitsa.git.commit module
+"""
+from unittest.mock import patch
+
+from vaskitsa.git.commit import GitCommit
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+from ..constants import REPO_ROOT_PATH
+
+
+def test_git_commit_details_single_command():
+    """
+    Test loading all commit details with a single git command
+    """
+    repository = GitRepository(REPO_ROOT_PATH)
+    commit = repository.get_commit('HEAD')
+    assert isinstance(commit, GitCommit)
+    with patch.object(
+            GitRepository,
+            'run_git_command_records',
+            autospec=True,
+            side_effect=GitRepository.run_git_command_records) as mock_run:
+        data = commit.to_dict()
+        assert mock_run.call_count == 1
+        assert commit.author_email == data['author_email']
+        assert commit.signing_key == data['signing_key']
+        assert mock_run.call_count == 1
+    assert data['revision'] == 'HEAD'
+    assert data['commit_hash'] == run_git_command('rev-parse', 'HEAD', cwd=REPO_ROOT_PATH)[0]
+    assert data['commit_message'] == run_git_command('show', '--no-patch', '--format=%s', cwd=REPO_ROOT_PATH)
+    assert isinstance(data['author_timestamp'], int)
+    assert isinstance(commit.to_json(), str)
+
+
+def test_git_commit_details_without_signature():
+    """
+    Test loading commit details without signature fields
+    """
+    repository = GitRepository(REPO_ROOT_PATH)
+    repository.commit_cache.clear()
+    commit = repository.get_commit('HEAD')
+    with patch.object(
+            GitRepository,
+            'run_git_command_records',
+            autospec=True,
+            side_effect=GitRepository.run_git_command_records) as mock_run:
+        assert len(commit.tree_hash) == len(commit.commit_hash)
+        assert commit.author_date == commit.author_date
+        assert mock_run.call_count == 1
+        args = mock_run.call_args[0]
+        assert '%GK' not in args[4]
+        assert commit.signing_key_trust
+        assert mock_run.call_count == 2
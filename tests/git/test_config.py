@@ -0,0 +1,151 @@
+"""
+Unit tests for vaskitsa.git.config module
+"""
+import os
+import subprocess
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from vaskitsa.exceptions import GitError
+from vaskitsa.git.config import GitConfig, GitRepositoryConfig, parse_config
+
+MOCK_GLOBAL_CONFIG = r'''
+# Global configuration
+[user]
+    name = "Test User" ; comment
+    email = test@example.com
+[core]
+    autocrlf
+    pager = less \
+        -R
+[alias]
+    lg = "log --format=\"%h %s\"\t# not a comment"
+[url "https://example.com/with.dots/"]
+    insteadOf = ex:
+[Section.SubSection]
+    Value = deprecated
+[include]
+    path = included.conf
+[includeIf "gitdir:~/work/"]
+    path = work.conf
+[includeIf "gitdir:~/other/"]
+    path = other.conf
+[includeIf "onbranch:feature/"]
+    path = feature.conf
+[includeIf "hasconfig:remote.*.url:https://example.com/**"]
+    path = remote.conf
+'''
+MOCK_INCLUDE_FILES = {
+    'included.conf': '[user]\n\tsigningkey = ABC\n',
+    'work.conf': '[user]\n\temail = work@example.com\n',
+    'other.conf': '[user]\n\temail = other@example.com\n',
+    'feature.conf': '[feature]\n\tenabled = yes\n',
+    'remote.conf': '[remote]\n\tmatched = yes\n',
+}
+
+
+@pytest.fixture
+def mock_git_home(tmpdir):
+    """
+    Mock home directory with global git configuration and included files
+    """
+    home = Path(tmpdir.strpath, 'home')
+    home.mkdir()
+    home.joinpath('.gitconfig').write_text(MOCK_GLOBAL_CONFIG, encoding='utf-8')
+    for filename, contents in MOCK_INCLUDE_FILES.items():
+        home.joinpath(filename).write_text(contents, encoding='utf-8')
+    environment = {
+        'HOME': str(home),
+        'GIT_CONFIG_NOSYSTEM': '1',
+        'XDG_CONFIG_HOME': str(home.joinpath('.config')),
+        'GIT_CONFIG_COUNT': '1',
+        'GIT_CONFIG_KEY_0': 'command.Sub.Key',
+        'GIT_CONFIG_VALUE_0': 'value',
+    }
+    with patch.dict(os.environ, environment):
+        for key in ('GIT_CONFIG_GLOBAL', 'GIT_CONFIG_SYSTEM', 'GIT_CONFIG_PARAMETERS'):
+            os.environ.pop(key, None)
+        yield home
+
+
+def get_git_config_list(path):
+    """
+    Get settings from git config --show-scope --list as scope, key and value
+    """
+    stdout = subprocess.run(
+        ('git', 'config', '--show-scope', '--list', '-z'),
+        cwd=path,
+        check=True,
+        stdout=subprocess.PIPE,
+    ).stdout.decode()
+    records = stdout.split('\0')[:-1]
+    settings = []
+    for scope, item in zip(records[::2], records[1::2]):
+        key, _separator, value = item.partition('\n')
+        settings.append((scope, key, value if '\n' in item else 'true'))
+    return settings
+
+
+def test_git_config_parse():
+    """
+    Test parsing git config file syntax
+    """
+    entries = parse_config(MOCK_GLOBAL_CONFIG)
+    assert ('user', None, 'name', 'Test User') in entries
+    assert ('core', None, 'autocrlf', 'true') in entries
+    assert ('core', None, 'pager', 'less         -R') in entries
+    assert ('alias', None, 'lg', 'log --format="%h %s"\t# not a comment') in entries
+    assert ('url', 'https://example.com/with.dots/', 'insteadof', 'ex:') in entries
+    assert ('section', 'subsection', 'value', 'deprecated') in entries
+
+    for text in ('key = value\n', '[core]\nkey = "unterminated\n', '[core]\nkey = \\x\n', '[core\n'):
+        with pytest.raises(GitError):
+            parse_config(text)
+
+
+def test_git_config_matches_git(mock_git_home):
+    """
+    Test loaded repository configuration matches git config --list output
+    """
+    path = mock_git_home.joinpath('work', 'repository')
+    path.mkdir(parents=True)
+    subprocess.run(('git', 'init', '-q', '-b', 'feature/test'), cwd=path, check=True)
+    subprocess.run(('git', 'config', 'extensions.worktreeConfig', 'true'), cwd=path, check=True)
+    subprocess.run(('git', 'config', '--worktree', 'worktree.value', 'yes'), cwd=path, check=True)
+
+    config = GitRepositoryConfig(path)
+    config.load()
+    settings = [(setting.scope, setting.key, setting.value) for setting in config.settings]
+    assert settings == get_git_config_list(path)
+    assert config.user.email.value == 'work@example.com'
+    assert config.user.signingkey.value == 'ABC'
+    assert config.feature.enabled.value == 'yes'
+    assert config.include.paths[0].value == 'included.conf'
+    assert not hasattr(config, 'remote')
+
+    global_config = GitConfig()
+    global_config.load()
+    assert global_config.user.email.value == 'test@example.com'
+    assert not hasattr(global_config, 'feature')
+
+
+def test_git_config_cache(mock_git_home):
+    """
+    Test configuration is loaded again only when configuration files are modified
+    """
+    path = mock_git_home.joinpath('repository')
+    path.mkdir()
+    subprocess.run(('git', 'init', '-q'), cwd=path, check=True)
+    config = GitRepositoryConfig(path)
+    config.load()
+    with patch('vaskitsa.git.config.load_config_file') as mock_load:
+        config.load()
+        assert mock_load.call_count == 0
+
+    subprocess.run(('git', 'config', 'user.email', 'local@example.com'), cwd=path, check=True)
+    config.load()
+    assert config.user.email.value == 'local@example.com'
+    assert [(setting.scope, setting.key, setting.value) for setting in config.settings] == get_git_config_list(path)
@@ -0,0 +1,123 @@
+"""
+Unit tests for vaskitsa.git.fingerprint module
+"""
+import os
+import subprocess
+
+from pathlib import Path
+from unittest.mock import patch
+
+from vaskitsa.git.fingerprint import get_blob_hash, get_cached_file_fingerprint, get_file_fingerprint
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.python.package import Package
+
+MOCK_OLD_MTIME = 1600000000
+
+
+def git_hash_object(path):
+    """
+    Get git blob hash for a file with git hash-object
+    """
+    return subprocess.run(
+        ('git', 'hash-object', '--no-filters', str(path)),
+        check=True,
+        stdout=subprocess.PIPE,
+        text=True,
+    ).stdout.strip()
+
+
+def create_mock_fingerprint_repository(git_repository):
+    """
+    Create mock python package repository with clean, modified, deleted and untracked files
+    """
+    path = git_repository(files={
+        'setup.py': '',
+        'demo/__init__.py': '"""Demo"""\n',
+        'demo/clean.py': 'VALUE = 1\n',
+        'demo/modified.py': 'VALUE = 2\n',
+        'demo/deleted.py': 'VALUE = 3\n',
+    })
+    path.joinpath('demo/modified.py').write_text('VALUE = 4\n', encoding='utf-8')
+    path.joinpath('demo/deleted.py').unlink()
+    path.joinpath('demo/untracked.py').write_text('VALUE = 5\n', encoding='utf-8')
+    return path
+
+
+def test_git_fingerprint_blob_hash(tmpdir):
+    """
+    Test blob hashes match git hash-object and are cached by file stat details
+    """
+    path = Path(tmpdir.strpath, 'file.txt')
+    path.write_bytes(b'contents\n\0binary')
+    assert get_blob_hash(path.read_bytes()) == git_hash_object(path)
+    assert get_file_fingerprint(path) == git_hash_object(path)
+    assert get_file_fingerprint(Path(tmpdir.strpath, 'missing.txt')) is None
+    assert get_file_fingerprint(tmpdir.strpath) is None
+    assert len(get_blob_hash(b'', 'sha256')) == 64
+
+    os.utime(path, (MOCK_OLD_MTIME, MOCK_OLD_MTIME))
+    value = get_file_fingerprint(path)
+    with patch('vaskitsa.git.fingerprint.get_blob_hash') as mock_hash:
+        assert get_file_fingerprint(path) == value
+        assert mock_hash.call_count == 0
+    assert get_file_fingerprint(path, 'sha256') == get_blob_hash(path.read_bytes(), 'sha256')
+    assert get_file_fingerprint(path) == value
+    assert get_cached_file_fingerprint(path) == value
+    path.write_bytes(b'modified\n')
+    os.utime(path, (MOCK_OLD_MTIME + 1, MOCK_OLD_MTIME + 1))
+    assert get_cached_file_fingerprint(path) is None
+    assert get_file_fingerprint(path) == git_hash_object(path)
+
+
+def test_git_fingerprint_repository_files(git_repository):
+    """
+    Test reading fingerprints for tracked files from the git index in bulk
+    """
+    path = create_mock_fingerprint_repository(git_repository)
+    repository = GitRepository(path)
+    assert repository.object_format == 'sha1'
+
+    with patch('vaskitsa.git.repository.get_file_fingerprint', side_effect=get_file_fingerprint) as mock_hash:
+        fingerprints = repository.get_file_fingerprints()
+        assert mock_hash.call_count == 1
+    assert sorted(str(item.relative_to(path)) for item in fingerprints) == [
+        'demo/__init__.py',
+        'demo/clean.py',
+        'demo/modified.py',
+        'setup.py',
+    ]
+    for item, value in fingerprints.items():
+        assert value == git_hash_object(item)
+
+    fingerprints = repository.get_file_fingerprints(directory=path.joinpath('demo'), paths=['clean.py'])
+    assert list(fingerprints) == [path.joinpath('demo/clean.py')]
+
+    # Modified files are not hashed without hash_modified, recently modified files are not cached
+    with patch('vaskitsa.git.repository.get_file_fingerprint') as mock_hash:
+        fingerprints = repository.get_file_fingerprints(hash_modified=False)
+        mock_hash.assert_not_called()
+    assert path.joinpath('demo/modified.py') not in fingerprints
+    assert path.joinpath('demo/clean.py') in fingerprints
+
+
+def test_git_fingerprint_package_files(git_repository):
+    """
+    Test fingerprints for python files in a package
+    """
+    path = create_mock_fingerprint_repository(git_repository)
+    package = Package(path)
+    fingerprints = package.get_file_fingerprints()
+    assert sorted(str(item.relative_to(path)) for item in fingerprints) == [
+        'demo/__init__.py',
+        'demo/clean.py',
+        'demo/modified.py',
+        'demo/untracked.py',
+    ]
+    for item in package.python_files:
+        assert item.fingerprint == fingerprints[item.path] == git_hash_object(item.path)
+
+    fingerprints = package.get_file_fingerprints(hash_files=False)
+    assert sorted(str(item.relative_to(path)) for item in fingerprints) == [
+        'demo/__init__.py',
+        'demo/clean.py',
+    ]
@@ -0,0 +1,68 @@
+"""
+Unit tests for vaskitsa.git.refs module
+"""
+from vaskitsa.git.refs import get_git_directories, resolve_head, resolve_ref
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
+from ..utils import git
+
+
+def rev_parse(path, revision='HEAD'):
+    """
+    Return commit hash for revision with git
+    """
+    return run_git_command('rev-parse', revision, cwd=path)[0]
+
+
+def test_git_refs_resolve_head(git_repository, tmpdir):
+    """
+    Test resolving HEAD from loose refs, packed refs and detached HEAD
+    """
+    path = git_repository()
+    assert resolve_head(path) is None
+    assert resolve_head(tmpdir.strpath) is None
+
+    git(path, 'commit', '-q', '--allow-empty', '-m', 'first')
+    assert resolve_head(path) == rev_parse(path)
+    assert resolve_head(path.joinpath('.git')) == rev_parse(path)
+
+    git(path, 'pack-refs', '--all')
+    assert not path.joinpath('.git', 'refs', 'heads', 'main').exists()
+    assert resolve_head(path) == rev_parse(path)
+
+    git(path, 'commit', '-q', '--allow-empty', '-m', 'second')
+    assert resolve_head(path) == rev_parse(path)
+    directories = get_git_directories(path)
+    assert resolve_ref(*directories, 'refs/heads/main') == rev_parse(path)
+    assert resolve_ref(*directories, 'refs/heads/missing') is None
+    assert resolve_ref(*directories, 'main') is None
+
+    git(path, 'checkout', '-q', '--detach', 'HEAD~1')
+    assert resolve_head(path) == rev_parse(path)
+
+    repository = GitRepository(path)
+    assert repository.resolve_revision('HEAD') == rev_parse(path)
+    assert repository.resolve_revision('refs/heads/main') == rev_parse(path, 'main')
+    assert repository.resolve_revision('main') is None
+    assert repository.resolve_revision(rev_parse(path)) == rev_parse(path)
+    assert repository.resolve_revision('0' * 40) is None
+    assert repository.get_commit('HEAD').commit_hash == rev_parse(path)
+
+
+def test_git_refs_resolve_worktree(git_repository):
+    """
+    Test resolving HEAD in linked worktree with .git file
+    """
+    path = git_repository(files={})
+    worktree = path.parent.joinpath('worktree')
+    git(path, 'worktree', 'add', '-q', '-b', 'feature', str(worktree))
+    git(worktree, 'commit', '-q', '--allow-empty', '-m', 'feature')
+
+    assert worktree.joinpath('.git').is_file()
+    git_directory, common_directory = get_git_directories(worktree)
+    assert common_directory == path.joinpath('.git')
+    assert git_directory != common_directory
+    assert resolve_head(worktree) == rev_parse(worktree)
+    assert resolve_head(path) == rev_parse(path)
+    assert resolve_head(worktree) != resolve_head(path)
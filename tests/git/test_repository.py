@@ -1,7 +1,20 @@
 
 
+import os
+
+from unittest.mock import patch
+
+import pytest
+
+from vaskitsa.exceptions import GitError
+from vaskitsa.git.commit import GitCommit
 from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import run_git_command
+
 from ..constants import REPO_ROOT_PATH
+from ..utils import git
+
+MOCK_REFS_MTIME = 1600000000
 
 
 def test_git_repository_load_project():
@@ -10,3 +23,92 @@ def test_git_repository_load_project():
     """
     git = GitRepository(REPO_ROOT_PATH)
     assert git == REPO_ROOT_PATH
+
+
+def test_git_repository_list_files():
+    """
+    Test listing files in git repository index
+    """
+    git = GitRepository(REPO_ROOT_PATH)
+    files = git.list_files()
+    assert 'vaskitsa/git/repository.py' in files
+    assert 'pyproject.toml' in files
+    assert git.list_files(directory=REPO_ROOT_PATH.joinpath('vaskitsa', 'git'), paths=['repository.py']) == [
+        'repository.py'
+    ]
+
+
+def test_git_repository_iter_commits():
+    """
+    Test streaming commits with details from git log
+    """
+    git = GitRepository(REPO_ROOT_PATH)
+    commits = git.iter_commits()
+    commit = next(commits)
+    assert isinstance(commit, GitCommit)
+    assert commit.commit_hash == git.head.commit_hash
+    commits.close()
+
+    count = int(run_git_command('rev-list', '--count', 'HEAD', cwd=REPO_ROOT_PATH)[0])
+    with patch.object(GitCommit, '__load_details__', autospec=True) as mock_load:
+        commits = list(git.iter_commits())
+        assert [item.author_email for item in commits]
+        mock_load.assert_not_called()
+    assert len(commits) == count
+    assert len(list(git.iter_commits(max_count=2))) == 2
+
+    paths = ['vaskitsa/git/repository.py']
+    expected = run_git_command('log', '--format=%H', 'HEAD', '--', *paths, cwd=REPO_ROOT_PATH)
+    assert [item.commit_hash for item in git.iter_commits('HEAD', paths=paths)] == expected
+
+    with pytest.raises(GitError):
+        list(git.iter_commits('no-such-revision'))
+
+
+def set_refs_mtimes(path, mtime):
+    """
+    Set modification times of git HEAD and refs to a timestamp older than the racy interval
+    """
+    git_directory = path.joinpath('.git')
+    items = [git_directory.joinpath('HEAD')] + [item for item in git_directory.joinpath('refs').rglob('*')]
+    items.append(git_directory.joinpath('refs'))
+    for item in items:
+        os.utime(item, (mtime, mtime))
+
+
+def test_git_repository_state_cache(git_repository, tmpdir):
+    """
+    Test repository state is cached per object and invalidated when refs change
+    """
+    path = git_repository()
+    repository = GitRepository(path)
+    other = GitRepository(tmpdir.strpath)
+    assert repository.is_git_directory
+    assert not other.is_git_directory
+    assert repository.config is not None
+
+    with patch.object(GitRepository, 'resolve_revision', return_value=None):
+        with patch(
+                'vaskitsa.git.repository.run_git_command',
+                side_effect=run_git_command) as mock_run:
+            assert repository.has_commits is False
+            assert repository.has_commits is False
+            assert mock_run.call_count == 1
+
+            git(path, 'commit', '-q', '--allow-empty', '-m', 'first')
+            assert repository.has_commits is True
+            assert repository.has_commits is True
+            assert mock_run.call_count == 2
+
+        set_refs_mtimes(path, MOCK_REFS_MTIME)
+        revision = repository.get_revision()
+        with patch.object(GitRepository, 'run_git_command_records', autospec=True) as mock_run:
+            assert repository.get_revision(8) == revision[:8]
+            mock_run.assert_not_called()
+
+        git(path, 'commit', '-q', '--allow-empty', '-m', 'second')
+        assert repository.get_revision() != revision
+
+    with patch.object(GitRepository, 'run_git_command_records', autospec=True) as mock_run:
+        assert repository.get_revision() == run_git_command('rev-parse', 'HEAD', cwd=path)[0]
+        mock_run.assert_not_called()
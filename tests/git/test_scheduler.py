@@ -0,0 +1,119 @@
+"""
+Unit tests for vaskitsa.git.scheduler module
+"""
+import threading
+import time
+
+import pytest
+
+from vaskitsa.exceptions import GitError
+from vaskitsa.git.changeset import GitChangeState
+from vaskitsa.git.scheduler import GitScheduler
+from vaskitsa.git.utils import run_git_command
+
+from ..utils import git
+
+MOCK_REPOSITORY_COUNT = 4
+
+
+@pytest.fixture
+def mock_repositories(git_repository):
+    """
+    Mock git repositories with two commits
+    """
+    paths = []
+    for index in range(MOCK_REPOSITORY_COUNT):
+        path = git_repository(f'repository-{index}', files={'file.txt': 'first\n'})
+        path.joinpath('file.txt').write_text('second\n', encoding='utf-8')
+        path.joinpath('new.txt').write_text('new\n', encoding='utf-8')
+        git(path, 'add', 'file.txt', 'new.txt')
+        git(path, 'commit', '-q', '-m', 'second')
+        paths.append(path)
+    yield paths
+
+
+def test_git_scheduler_results(mock_repositories, tmpdir):
+    """
+    Test running operations in many repositories with structured results
+    """
+    scheduler = GitScheduler(max_concurrency=3)
+    for path in mock_repositories:
+        scheduler.add_revision(path)
+        scheduler.add_change_set(path, 'HEAD~1', 'HEAD')
+        scheduler.add_command(path, 'log', '--format=%s')
+        scheduler.add_config(path)
+    scheduler.add_command(mock_repositories[0], 'rev-parse', 'missing-revision')
+    scheduler.add_command(tmpdir.strpath, 'status')
+
+    results = scheduler.run()
+    assert scheduler.operations == []
+    assert len(results) == MOCK_REPOSITORY_COUNT * 4 + 2
+    for index, path in enumerate(mock_repositories):
+        revision, change_set, log, config = results[index * 4:index * 4 + 4]
+        assert all(result.ok for result in (revision, change_set, log, config))
+        assert revision.value == run_git_command('rev-parse', 'HEAD', cwd=path)[0]
+        assert [(change.state, str(change.path)) for change in change_set.value] == [
+            (GitChangeState.MODIFIED, 'file.txt'),
+            (GitChangeState.ADDED, 'new.txt'),
+        ]
+        assert log.value == ['second', 'first']
+        assert isinstance(config.value, list)
+        assert config.to_dict()['ok'] is True
+        assert revision.duration >= 0
+
+    missing, status = results[-2:]
+    assert not missing.ok
+    assert isinstance(missing.error, GitError)
+    assert not status.ok
+    assert isinstance(status.error, GitError)
+    assert status.to_dict()['error']
+
+
+def test_git_scheduler_ordering(mock_repositories):
+    """
+    Test global concurrency limit, per repository ordering and stopping on errors
+    """
+    lock = threading.Lock()
+    running = []
+    peak = []
+    calls = []
+    overlapping = []
+
+    def record(repository):
+        with lock:
+            if repository in running:
+                overlapping.append(repository)
+            running.append(repository)
+            peak.append(len(running))
+            calls.append(str(repository))
+        time.sleep(0.02)
+        with lock:
+            running.remove(repository)
+        return str(repository)
+
+    def fail(repository):
+        raise GitError(f'Failed {repository}')
+
+    scheduler = GitScheduler(max_concurrency=2, stop_on_error=True)
+    operations = []
+    for _index in range(3):
+        for path in mock_repositories:
+            operations.append(scheduler.add_function(path, record))
+    scheduler.add_function(mock_repositories[0], fail)
+    skipped = scheduler.add_function(mock_repositories[0], record)
+
+    results = scheduler.run()
+    assert max(peak) == 2
+    assert overlapping == []
+    assert [result.operation for result in results[:len(operations)]] == operations
+    assert all(result.ok for result in results[:len(operations)])
+    for path in mock_repositories:
+        positions = [index for index, value in enumerate(calls) if value == str(path)]
+        assert len(positions) == 3
+    assert isinstance(results[-2].error, GitError)
+    assert results[-1].operation is skipped
+    assert not results[-1].ok
+    assert results[-1].duration is None
+
+    with pytest.raises(ValueError):
+        GitScheduler(max_concurrency=0)
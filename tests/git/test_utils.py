@@ -0,0 +1,83 @@
+"""
+Unit tests for vaskitsa.git.utils module
+"""
+import os
+
+from pathlib import Path
+from unittest.mock import patch
+
+from vaskitsa.git.repository import GitRepository
+from vaskitsa.git.utils import (
+    clear_git_repository_path_cache,
+    detect_git_repository_path,
+    is_git_work_tree_root,
+    run_git_command,
+)
+
+from ..utils import git
+
+
+def test_git_utils_detect_repository_cached(tmpdir):
+    """
+    Test detecting repository root from subdirectories with cached results
+    """
+    clear_git_repository_path_cache()
+    path = Path(tmpdir.strpath, 'repository')
+    subdirectory = path.joinpath('a', 'b')
+    subdirectory.mkdir(parents=True)
+    assert detect_git_repository_path(subdirectory) is None
+
+    git(path, 'init', '-q')
+    assert detect_git_repository_path(subdirectory) == path
+    with patch('vaskitsa.git.utils.is_git_work_tree_root') as mock_check:
+        assert detect_git_repository_path(subdirectory) == path
+        assert detect_git_repository_path(path.joinpath('a')) == path
+        assert detect_git_repository_path(path) == path
+        assert mock_check.call_count == 0
+
+        for _index in range(3):
+            assert GitRepository(subdirectory) == path
+        assert mock_check.call_count == 0
+
+    clear_git_repository_path_cache()
+    assert detect_git_repository_path(path.joinpath('a')) == path
+
+
+def test_git_utils_detect_repository_git_file(git_repository):
+    """
+    Test detecting linked worktrees and .git files with gitdir: pointers
+    """
+    path = git_repository(files={})
+    worktree = path.parent.joinpath('worktree')
+    git(path, 'worktree', 'add', '-q', '-b', 'feature', str(worktree))
+    git(worktree, 'commit', '-q', '--allow-empty', '-m', 'feature')
+    worktree.joinpath('sub').mkdir()
+
+    assert is_git_work_tree_root(str(worktree))
+    assert detect_git_repository_path(worktree.joinpath('sub')) == worktree
+    repository = GitRepository(worktree.joinpath('sub'))
+    assert repository.is_git_directory
+    assert repository.get_revision() == run_git_command('rev-parse', 'HEAD', cwd=worktree)[0]
+    assert repository.__get_refs_state__() is not None
+
+    invalid = path.joinpath('invalid')
+    invalid.mkdir()
+    invalid.joinpath('.git').write_text('gitdir: missing\n', encoding='utf-8')
+    assert not is_git_work_tree_root(str(invalid))
+    assert detect_git_repository_path(invalid) == path
+
+
+def test_git_utils_detect_repository_git_dir(git_repository):
+    """
+    Test detecting repository with GIT_DIR and GIT_WORK_TREE environment variables
+    """
+    path = git_repository()
+    work_tree = path.parent.joinpath('work-tree')
+    work_tree.mkdir()
+    with patch.dict(os.environ, {'GIT_DIR': str(path.joinpath('.git'))}):
+        os.environ.pop('GIT_WORK_TREE', None)
+        assert detect_git_repository_path(work_tree) == work_tree
+        with patch.dict(os.environ, {'GIT_WORK_TREE': str(path)}):
+            assert detect_git_repository_path(work_tree) == path
+    with patch.dict(os.environ, {'GIT_DIR': str(work_tree)}):
+        assert detect_git_repository_path(path) is None
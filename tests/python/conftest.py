@@ -0,0 +1,32 @@
+"""
+Unit test configuration for vaskitsa.python module
+"""
+from pathlib import Path
+
+import pytest
+
+MOCK_PACKAGE_TREE_NAME = 'demo-package'
+MOCK_PACKAGE_TREE_FILES = (
+    'setup.py',
+    'demo_package/__init__.py',
+    'demo_package/main.py',
+    'demo_package/data.txt',
+    'demo_package/sub/module.py',
+    'build/lib/demo_package/__init__.py',
+    'demo_package.egg-info/generated.py',
+    'tests/__init__.py',
+    'tests/sub/test_module.py',
+)
+
+
+@pytest.fixture
+def mock_package_tree(tmpdir):
+    """
+    Mock python package tree with ignored directories and test modules
+    """
+    path = Path(tmpdir.strpath, MOCK_PACKAGE_TREE_NAME)
+    for filename in MOCK_PACKAGE_TREE_FILES:
+        item = path.joinpath(filename)
+        item.parent.mkdir(parents=True, exist_ok=True)
+        item.write_text('', encoding='utf-8')
+    yield path
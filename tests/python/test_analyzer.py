@@ -0,0 +1,104 @@
+"""
+Unit tests for vaskitsa.python.analyzer module
+"""
+import os
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from vaskitsa.git.fingerprint import clear_fingerprint_cache
+from vaskitsa.python.analyzer import PackageAnalyzer, read_file_summaries
+from vaskitsa.python.package import Package
+from vaskitsa.python.summary import clear_summary_cache
+
+MOCK_OLD_MTIME = 1600000000
+MOCK_ANALYZER_PACKAGE_FILES = {
+    'setup.py': '',
+    'analyzer_demo/__init__.py': '"""Demo"""\nfrom .core import Engine\n\n__all__ = ["Engine"]\n',
+    'analyzer_demo/core.py': 'MAX_SIZE = 10\n\n\nclass Engine:\n    """Engine"""\n\n\ndef run():\n    pass\n',
+    'analyzer_demo/util/__init__.py': '',
+    'analyzer_demo/util/helpers.py': 'def run():\n    pass\n\n\ndef _private():\n    pass\n',
+    'analyzer_demo/broken.py': 'def broken(:\n',
+    'tests/test_core.py': 'def test_run():\n    pass\n',
+}
+
+
+@pytest.fixture
+def mock_analyzer_package(tmpdir):
+    """
+    Mock python package for analyzer tests
+    """
+    clear_summary_cache()
+    clear_fingerprint_cache()
+    path = Path(tmpdir.strpath, 'analyzer-demo')
+    for filename, contents in MOCK_ANALYZER_PACKAGE_FILES.items():
+        item = path.joinpath(filename)
+        item.parent.mkdir(parents=True, exist_ok=True)
+        item.write_text(contents, encoding='utf-8')
+        os.utime(item, (MOCK_OLD_MTIME, MOCK_OLD_MTIME))
+    yield Package(path)
+    clear_summary_cache()
+    clear_fingerprint_cache()
+
+
+def test_python_analyzer_symbol_table(mock_analyzer_package):
+    """
+    Test symbol table for files parsed in the calling process
+    """
+    symbol_table = mock_analyzer_package.analyze_files(max_workers=1)
+    assert len(symbol_table.summaries) == 6
+    assert list(symbol_table.errors) == [mock_analyzer_package.joinpath('analyzer_demo/broken.py')]
+    assert 'analyzer_demo.core.Engine' in symbol_table
+    item, symbol = symbol_table.get('analyzer_demo.core.Engine')
+    assert item.path.name == 'core.py'
+    assert symbol.kind == 'class'
+    assert symbol.docstring == 'Engine'
+    assert symbol_table.get('analyzer_demo.core.missing') is None
+    assert symbol_table.find('run') == ['analyzer_demo.core.run', 'analyzer_demo.util.helpers.run']
+    assert symbol_table.get_exports('analyzer_demo') == ['Engine']
+    assert symbol_table.get_exports('analyzer_demo.util.helpers') == ['run']
+    assert symbol_table.get_exports('analyzer_demo.missing') == []
+
+
+def test_python_analyzer_process_pool(mock_analyzer_package):
+    """
+    Test parsing files in worker processes returns same symbols as in-process parsing
+    """
+    expected = set(mock_analyzer_package.analyze_files(max_workers=1))
+    clear_summary_cache()
+    clear_fingerprint_cache()
+    with patch.object(
+            PackageAnalyzer,
+            '__read_summaries__',
+            autospec=True,
+            side_effect=PackageAnalyzer.__read_summaries__) as mock_read:
+        with patch('vaskitsa.python.package.get_file_fingerprint') as mock_fingerprint:
+            symbol_table = mock_analyzer_package.analyze_files(max_workers=2, batch_size=1)
+            mock_fingerprint.assert_not_called()
+        mock_read.assert_called_once()
+        assert len(mock_read.call_args[0][1]) == 6
+    assert set(symbol_table) == expected
+    assert len(symbol_table.summaries) == 6
+    assert len(mock_analyzer_package.get_file_fingerprints(hash_files=False)) == 6
+
+
+def test_python_analyzer_cached_summaries(mock_analyzer_package):
+    """
+    Test files with cached summaries are not parsed again
+    """
+    mock_analyzer_package.analyze_files(max_workers=1)
+    with patch('vaskitsa.python.analyzer.read_file_summaries', side_effect=read_file_summaries) as reader:
+        symbol_table = mock_analyzer_package.analyze_files(max_workers=1)
+        reader.assert_called_once()
+        assert reader.call_args[0][0] == []
+    assert len(symbol_table.summaries) == 6
+
+
+def test_python_analyzer_invalid_batch_size(mock_analyzer_package):
+    """
+    Test analyzer with invalid batch size
+    """
+    with pytest.raises(ValueError):
+        PackageAnalyzer(mock_analyzer_package, batch_size=0)
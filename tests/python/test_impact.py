@@ -0,0 +1,64 @@
+"""
+Unit tests for vaskitsa.python.impact module
+"""
+import pytest
+
+from vaskitsa.python.package import Package
+
+from ..utils import git
+
+MOCK_IMPACT_PACKAGE_FILES = {
+    'setup.py': '',
+    'impact_demo/__init__.py': 'from .api import handler\n',
+    'impact_demo/core/__init__.py': '',
+    'impact_demo/core/base.py': 'VALUE = 1\n',
+    'impact_demo/api/__init__.py': 'from ..core.base import VALUE\n\nhandler = VALUE\n',
+    'impact_demo/other/__init__.py': 'import json\n',
+    'tests/__init__.py': '',
+    'tests/core/test_base.py': 'from impact_demo.core import base\n',
+    'tests/api/test_api.py': 'from impact_demo.api import handler\n',
+    'tests/other/test_other.py': 'import impact_demo.other\n',
+}
+
+
+@pytest.fixture
+def mock_impact_package(git_repository):
+    """
+    Mock python package in git repository with change to the core module in last commit
+    """
+    path = git_repository('impact-demo', files=MOCK_IMPACT_PACKAGE_FILES)
+    path.joinpath('impact_demo/core/base.py').write_text('VALUE = 2\n', encoding='utf-8')
+    git(path, 'commit', '-q', '-a', '-m', 'second')
+    yield Package(path)
+
+
+def test_python_impact_changed_modules(mock_impact_package):
+    """
+    Test mapping changed files to modules and mirrored test modules
+    """
+    impact = mock_impact_package.get_change_impact(start_revision='HEAD~1')
+    assert [str(module.relative_directory) for module in impact.modules] == ['impact_demo/core']
+    assert [str(module.relative_directory) for module in impact.test_modules] == ['tests/core']
+    assert impact.dependent_modules == []
+
+    with pytest.raises(ValueError):
+        mock_impact_package.get_change_impact()
+
+
+def test_python_impact_reverse_dependencies(mock_impact_package):
+    """
+    Test including modules importing changed modules
+    """
+    change_set = mock_impact_package.git_repository.get_change_set('HEAD~1', 'HEAD')
+    impact = mock_impact_package.get_change_impact(change_set, reverse_dependencies=True)
+    assert [str(module.relative_directory) for module in impact.changed_modules] == ['impact_demo/core']
+    assert sorted(str(module.relative_directory) for module in impact.modules) == [
+        'impact_demo',
+        'impact_demo/api',
+        'impact_demo/core',
+    ]
+    assert sorted(str(module.relative_directory) for module in impact.test_modules) == [
+        'tests',
+        'tests/api',
+        'tests/core',
+    ]
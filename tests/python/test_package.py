@@ -48,3 +48,26 @@ def test_python_package_get_module_not_found():
     package = Package(MOCK_PACKAGE_PATH)
     module = package.get_python_module(MOCK_MISSING_MODULE_NAME)
     assert module is None
+
+
+def test_python_package_module_tree():
+    """
+    Test navigating python module tree in package
+    """
+    package = Package(MOCK_PACKAGE_PATH)
+    root_module = package.get_python_module('mock_python_module')
+    demo_module = package.get_python_module(MOCK_TEST_MODULE_NAME)
+    validate_module(package, root_module)
+
+    assert root_module in package.children
+    assert root_module.parent == package
+    assert demo_module.parent is root_module
+    assert root_module.children == [demo_module]
+    assert root_module.descendants == [demo_module]
+    assert not demo_module.children
+    assert list(root_module.walk_modules()) == [root_module, demo_module]
+
+    modules = list(package.walk_modules())
+    assert len(modules) == len(package.python_modules) + len(package.python_test_modules)
+    for module in package.python_modules + package.python_test_modules:
+        assert module in modules
@@ -0,0 +1,121 @@
+"""
+Unit tests for applying filesystem changes to loaded vaskitsa.python.package.Package modules
+"""
+import shutil
+
+from vaskitsa.python.constants import MODULE_DEFAULT_GROUP, TEST_MODULE_DEFAULT_GROUP
+from vaskitsa.python.package import Package
+
+
+def get_module_names(modules):
+    """
+    Return sorted relative paths of modules
+    """
+    return sorted(repr(module) for module in modules)
+
+
+def test_python_package_apply_changes_added(mock_package_tree):
+    """
+    Test adding files and directories to loaded package modules
+    """
+    package = Package(mock_package_tree)
+    root_module = package.get_python_module('demo_package')
+
+    new_file = mock_package_tree.joinpath('demo_package', 'extra.py')
+    new_file.write_text('', encoding='utf-8')
+    new_module = mock_package_tree.joinpath('demo_package', 'new', 'nested')
+    new_module.mkdir(parents=True)
+    new_module.joinpath('code.py').write_text('', encoding='utf-8')
+    excluded_file = mock_package_tree.joinpath('build', 'other.py')
+    excluded_file.write_text('', encoding='utf-8')
+
+    package.apply_changes(added=[new_file, 'demo_package/new', excluded_file])
+    assert [item.name for item in root_module.files] == ['__init__', 'extra', 'main']
+    assert get_module_names(package.python_modules) == [
+        'demo_package',
+        'demo_package/new/nested',
+        'demo_package/sub',
+    ]
+    nested = package.get_python_module('demo_package/new/nested')
+    assert nested.parent == package
+    assert nested in package.children
+
+    # Adding intermediate module links the nested module to it
+    intermediate = package.create_python_module('demo_package.new')
+    assert intermediate.group == MODULE_DEFAULT_GROUP
+    assert intermediate.parent is root_module
+    assert nested.parent is intermediate
+    assert nested not in package.children
+    assert intermediate.index is not None
+
+
+def test_python_package_create_module_not_loaded(mock_package_tree):
+    """
+    Test creating modules and files in package with modules not loaded yet
+    """
+    package = Package(mock_package_tree)
+    module = package.create_python_module('demo_package.created')
+    assert module.parent is package.get_python_module('demo_package')
+    assert [item.name for item in module.files] == ['__init__']
+
+    package = Package(mock_package_tree)
+    item = package.create_python_file('demo_package/other/code')
+    assert item.path == mock_package_tree.joinpath('demo_package', 'other', 'code.py')
+    assert get_module_names(package.python_modules) == [
+        'demo_package',
+        'demo_package/created',
+        'demo_package/other',
+        'demo_package/sub',
+    ]
+    assert [item.name for item in package.get_python_module('demo_package/other').files] == ['__init__', 'code']
+
+
+def test_python_package_apply_changes_removed(mock_package_tree):
+    """
+    Test removing files and directories from loaded package modules
+    """
+    package = Package(mock_package_tree)
+    root_module = package.get_python_module('demo_package')
+    sub_module = package.get_python_module('demo_package/sub')
+
+    mock_package_tree.joinpath('demo_package', 'main.py').unlink()
+    shutil.rmtree(mock_package_tree.joinpath('tests'))
+    package.apply_changes(removed=['demo_package/main.py', 'tests'])
+    assert [item.name for item in root_module.files] == ['__init__']
+    assert package.python_test_modules == []
+
+    mock_package_tree.joinpath('demo_package', '__init__.py').unlink()
+    package.apply_changes(removed=['demo_package/__init__.py'])
+    assert package.get_python_module('demo_package') is None
+    assert get_module_names(package.python_modules) == ['demo_package/sub']
+    assert sub_module.parent == package
+    assert sub_module in package.children
+
+
+def test_python_package_refresh(mock_package_tree):
+    """
+    Test refreshing loaded package modules for changed paths
+    """
+    package = Package(mock_package_tree)
+    assert get_module_names(package.python_test_modules) == ['tests', 'tests/sub']
+
+    mock_package_tree.joinpath('tests', 'sub', 'test_module.py').unlink()
+    mock_package_tree.joinpath('tests', 'other').mkdir()
+    mock_package_tree.joinpath('tests', 'other', 'test_other.py').write_text('', encoding='utf-8')
+    mock_package_tree.joinpath('demo_package', 'main.py').unlink()
+    mock_package_tree.joinpath('app.py').write_text('', encoding='utf-8')
+
+    package.refresh(paths=['tests', 'demo_package/main.py', 'app.py'])
+    assert get_module_names(package.python_test_modules) == ['tests', 'tests/other']
+    assert package.get_python_module('tests/other').group == TEST_MODULE_DEFAULT_GROUP
+    assert package.get_python_module('tests/other').parent is package.get_python_module('tests')
+    assert [item.name for item in package.get_python_module('demo_package').files] == ['__init__']
+
+    # New root module includes setup.py and becomes parent of top level modules
+    root_module = package.get_python_module('.')
+    assert [item.name for item in root_module.files] == ['app', 'setup']
+    assert package.children == [root_module]
+    assert package.get_python_module('demo_package').parent is root_module
+
+    package.refresh()
+    assert get_module_names(package.python_modules) == ['.', 'demo_package', 'demo_package/sub']
@@ -0,0 +1,227 @@
+"""
+Unit tests for vaskitsa.python.scanner module
+"""
+import os
+import subprocess
+
+from pathlib import Path
+from unittest.mock import patch
+
+from vaskitsa.configuration import REPOSITORY_CONFIGURATION
+from vaskitsa.python.cache import SCAN_CACHE_FILENAME
+from vaskitsa.python.configuration import DEFAULT_SCAN_CACHE_DIRECTORY
+from vaskitsa.python.module import PythonModule
+from vaskitsa.python.package import Package
+from vaskitsa.python.scanner import PackageScanner
+
+MOCK_DIRECTORY_MTIME = 1600000000
+
+
+def test_python_package_scanner_scan(mock_package_tree):
+    """
+    Test scanning mock package tree with ignored directories and test modules
+    """
+    package = Package(mock_package_tree)
+    scanner = package.scanner
+    assert isinstance(scanner, PackageScanner)
+    assert isinstance(scanner.__repr__(), str)
+
+    directories = {str(directory.relative_path): directory for directory in scanner.scan()}
+    assert sorted(directories.keys()) == [
+        'demo_package',
+        'demo_package/sub',
+        'tests',
+        'tests/sub',
+    ]
+    assert directories['demo_package'].filenames == ['__init__.py', 'main.py']
+    assert not directories['demo_package'].is_test_directory
+    assert directories['tests/sub'].is_test_directory
+
+
+def test_python_package_scanner_modules(mock_package_tree):
+    """
+    Test loading package modules and files from the scanner
+    """
+    package = Package(mock_package_tree)
+    assert [repr(module) for module in package.python_modules] == ['demo_package', 'demo_package/sub']
+    assert [repr(module) for module in package.python_test_modules] == ['tests', 'tests/sub']
+    assert len(package.python_files) == 3
+
+    module = package.get_python_module('demo_package')
+    assert module.index is not None
+    assert [item.path.name for item in module.files] == ['__init__.py', 'main.py']
+
+
+def set_directory_mtimes(path: Path, mtime: int) -> None:
+    """
+    Set mtime of all directories in the tree to specified timestamp
+    """
+    for item in [path] + [item for item in path.rglob('*') if item.is_dir()]:
+        os.utime(item, (mtime, mtime))
+
+
+def test_python_package_scanner_cache(mock_package_tree):
+    """
+    Test scanner cache reuses listings of unmodified directories
+    """
+    path = mock_package_tree
+    path.joinpath(REPOSITORY_CONFIGURATION).write_text('scanner:\n  cache: true\n', encoding='utf-8')
+    set_directory_mtimes(path, MOCK_DIRECTORY_MTIME)
+
+    expected = [repr(module) for module in Package(path).python_modules]
+    cache_file = path.joinpath(DEFAULT_SCAN_CACHE_DIRECTORY, SCAN_CACHE_FILENAME)
+    assert cache_file.is_file()
+    # Creating the cache directory modified the package root directory
+    set_directory_mtimes(path, MOCK_DIRECTORY_MTIME)
+
+    with patch.object(PackageScanner, '__read_directory__', autospec=True) as mock_read:
+        assert [repr(module) for module in Package(path).python_modules] == expected
+        mock_read.assert_not_called()
+
+    path.joinpath('demo_package', 'sub', 'other.py').write_text('', encoding='utf-8')
+    with patch.object(
+            PackageScanner,
+            '__read_directory__',
+            autospec=True,
+            side_effect=PackageScanner.__read_directory__) as mock_read:
+        package = Package(path)
+        assert [item.name for item in package.get_python_module('demo_package/sub').files] == ['module', 'other']
+        assert mock_read.call_count == 1
+
+
+def test_python_package_scanner_workers(mock_package_tree):
+    """
+    Test parallel scan returns directories in the same order as sequential scan
+    """
+    path = mock_package_tree
+    path.joinpath('root_module.py').write_text('', encoding='utf-8')
+    path.joinpath('zzz', 'deep').mkdir(parents=True)
+    path.joinpath('zzz', 'deep', 'code.py').write_text('', encoding='utf-8')
+    expected = [
+        (str(directory.relative_path), directory.filenames, directory.is_test_directory)
+        for directory in Package(path).scanner.scan()
+    ]
+    assert [item[0] for item in expected] == ['demo_package', 'demo_package/sub', '.', 'tests', 'tests/sub', 'zzz/deep']
+
+    path.joinpath(REPOSITORY_CONFIGURATION).write_text('scanner:\n  workers: 4\n', encoding='utf-8')
+    package = Package(path)
+    assert package.configuration.scanner.workers == 4
+    with patch.object(
+            PackageScanner,
+            'scan_subdirectory',
+            autospec=True,
+            side_effect=PackageScanner.scan_subdirectory) as mock_scan:
+        directories = [
+            (str(directory.relative_path), directory.filenames, directory.is_test_directory)
+            for directory in package.scanner.scan()
+        ]
+        assert mock_scan.call_count == 3
+    assert directories == expected
+
+
+def test_python_package_scanner_git_index(mock_package_tree):
+    """
+    Test scanning package files from git index instead of the filesystem
+    """
+    path = mock_package_tree
+    subprocess.run(('git', 'init', '-q'), cwd=path, check=True)
+    path.joinpath('.gitignore').write_text('ignored/\n', encoding='utf-8')
+    subprocess.run(('git', 'add', '.gitignore', 'demo_package', 'tests'), cwd=path, check=True)
+    path.joinpath('untracked', 'lib').mkdir(parents=True)
+    path.joinpath('untracked', 'lib', 'module.py').write_text('', encoding='utf-8')
+    path.joinpath('ignored').mkdir()
+    path.joinpath('ignored', 'module.py').write_text('', encoding='utf-8')
+    path.joinpath('demo_package', 'main.py').unlink()
+
+    configuration = path.joinpath(REPOSITORY_CONFIGURATION)
+    configuration.write_text('scanner:\n  git_index: true\n', encoding='utf-8')
+    with patch.object(PackageScanner, '__read_directory__', autospec=True) as mock_read:
+        directories = {str(directory.relative_path): directory for directory in Package(path).scanner.scan()}
+        mock_read.assert_not_called()
+    assert sorted(directories.keys()) == ['demo_package', 'demo_package/sub', 'tests', 'tests/sub']
+    assert directories['demo_package'].filenames == ['__init__.py']
+    assert directories['tests/sub'].is_test_directory
+
+    configuration.write_text('scanner:\n  git_index: true\n  git_untracked: true\n', encoding='utf-8')
+    package = Package(path)
+    assert [repr(module) for module in package.python_modules] == [
+        'demo_package',
+        'demo_package/sub',
+        'untracked/lib',
+    ]
+
+
+def test_python_package_module_lookup(mock_package_tree):
+    """
+    Test looking up a single module lists only the module directory and loads files lazily
+    """
+    package = Package(mock_package_tree)
+    with patch.object(
+            PackageScanner,
+            '__read_directory__',
+            autospec=True,
+            side_effect=PackageScanner.__read_directory__) as mock_read:
+        module = package.get_python_module('demo_package/sub')
+        assert mock_read.call_count == 1
+        assert not module.files_loaded
+        assert package.get_python_module('demo_package/sub') is module
+        assert package.get_python_module('build/lib/demo_package') is None
+        assert package.get_python_module('tests/sub').group == 'tests'
+        assert mock_read.call_count == 2
+
+    assert [item.name for item in module.files] == ['module']
+    assert module.files_loaded
+    assert repr(module.parent) == 'demo_package'
+
+    mock_package_tree.joinpath('demo_package', 'sub', 'other.py').write_text('', encoding='utf-8')
+    assert module in package.python_modules
+    assert module.parent is package.get_python_module('demo_package')
+    assert [item.name for item in module.files] == ['module', 'other']
+
+
+def test_python_package_module_load_files_excluded(mock_package_tree):
+    """
+    Test files matching excluded patterns are skipped when listing module files
+    """
+    path = mock_package_tree
+    path.joinpath(REPOSITORY_CONFIGURATION).write_text(
+        'ignored_directories:\n  - build/\n  - generated_*.py\n',
+        encoding='utf-8',
+    )
+    path.joinpath('demo_package', 'generated_models.py').write_text('', encoding='utf-8')
+    package = Package(path)
+    module = PythonModule(path.joinpath('demo_package'), package=package)
+    assert [item.name for item in module.files] == ['__init__', 'main']
+
+
+def test_python_package_scanner_custom_cache_directory(mock_package_tree):
+    """
+    Test configured scanner cache directory is excluded from scanned modules
+    """
+    path = mock_package_tree
+    path.joinpath(REPOSITORY_CONFIGURATION).write_text(
+        'scanner:\n  cache: true\n  cache_directory: var/scan-cache\n',
+        encoding='utf-8',
+    )
+    path.joinpath('var', 'scan-cache').mkdir(parents=True)
+    path.joinpath('var', 'scan-cache', 'cached.py').write_text('', encoding='utf-8')
+
+    package = Package(path)
+    assert 'var/scan-cache/' in package.excluded
+    assert package.get_python_module('var/scan-cache') is None
+    assert 'var/scan-cache' not in [str(module.relative_directory) for module in package.python_modules]
+    assert path.joinpath('var', 'scan-cache', SCAN_CACHE_FILENAME).is_file()
+
+
+def test_python_package_scanner_symlink_loop(mock_package_tree):
+    """
+    Test scanning package with symbolic link to parent directory
+    """
+    mock_package_tree.joinpath('demo_package/sub/loop').symlink_to(mock_package_tree, target_is_directory=True)
+    package = Package(mock_package_tree)
+    assert [str(directory.relative_path) for directory in package.scanner.scan()] == [
+        'demo_package',
+        'demo_package/sub',
+        'tests',
+        'tests/sub',
+    ]
@@ -0,0 +1,150 @@
+"""
+Unit tests for vaskitsa.python.summary module
+"""
+import os
+
+from pathlib import Path
+from unittest.mock import patch
+
+from vaskitsa.python.file import PythonFile
+from vaskitsa.python.package import Package
+from vaskitsa.python.summary import PythonFileSummary, clear_summary_cache, get_file_summary
+
+MOCK_OLD_MTIME = 1600000000
+MOCK_SUMMARY_SOURCE = '''"""
+Demo module
+"""
+import os
+from .base import Base, helper
+
+__all__ = ['Demo', 'run']
+__version__ = '1.2.3'
+
+MAX_ITEMS: int = 10
+DEFAULT_NAME = os.environ.get('NAME')
+_private = 1
+
+
+class Demo(Base):
+    """
+    Demo class
+    """
+    def method(self):
+        from json import dumps
+        return dumps({})
+
+
+async def run():
+    """Run demo"""
+
+
+def _hidden():
+    pass
+'''
+
+
+def test_python_summary_from_source():
+    """
+    Test parsing summary of top level symbols from python source code
+    """
+    summary = PythonFileSummary.from_source(MOCK_SUMMARY_SOURCE, 'abc')
+    assert summary.syntax_error is None
+    assert summary.docstring == 'Demo module'
+    assert summary.all == ['Demo', 'run']
+    assert summary.version == '1.2.3'
+    assert [(item.name, item.docstring) for item in summary.classes] == [('Demo', 'Demo class')]
+    assert [(item.name, item.docstring) for item in summary.functions] == [('run', 'Run demo'), ('_hidden', None)]
+    assert [(item.name, item.value) for item in summary.constants] == [('MAX_ITEMS', 10), ('DEFAULT_NAME', None)]
+    assert [item.name for item in summary.symbols] == ['MAX_ITEMS', 'DEFAULT_NAME', 'Demo', 'run', '_hidden']
+    assert summary.public_names == ['Demo', 'run']
+    assert set(summary.get_imported_names('demo.views')) == {
+        'os',
+        'json',
+        'json.dumps',
+        'demo.base',
+        'demo.base.Base',
+        'demo.base.helper',
+    }
+    assert summary.to_dict()['classes'][0]['lineno'] == 15
+
+
+def test_python_summary_relative_imports():
+    """
+    Test resolving absolute and relative imported names
+    """
+    source = 'import os.path\nfrom . import sibling\nfrom ..core.base import VALUE\nfrom json import *\n'
+    names = set(PythonFileSummary.from_source(source, 'abc').get_imported_names('demo.api.views'))
+    assert names == {
+        'os.path',
+        'demo.api',
+        'demo.api.sibling',
+        'demo.core.base',
+        'demo.core.base.VALUE',
+        'json',
+    }
+    summary = PythonFileSummary.from_source('from . import views\n', 'abc')
+    assert set(summary.get_imported_names('demo.api', is_package=True)) == {'demo.api', 'demo.api.views'}
+    summary = PythonFileSummary.from_source('from .... import views\n', 'abc')
+    assert summary.get_imported_names('demo.api') == []
+
+    # Relative imports can go up to the top level package, but not beyond it
+    summary = PythonFileSummary.from_source('from ..y import x\n', 'abc')
+    assert summary.get_imported_names('demo.api.views') == ['demo.y', 'demo.y.x']
+    assert summary.get_imported_names('pkg.mod') == []
+    assert summary.get_imported_names('pkg', is_package=True) == []
+    assert PythonFileSummary.from_source('from . import x\n', 'abc').get_imported_names('mod') == []
+
+
+def test_python_summary_syntax_error():
+    """
+    Test summary of python source code with syntax errors
+    """
+    summary = PythonFileSummary.from_source('def broken(:\n', 'abc')
+    assert summary.syntax_error is not None
+    assert summary.functions == []
+    assert summary.public_names == []
+
+
+def test_python_summary_cache(tmpdir):
+    """
+    Test file summaries are parsed again only when file contents change
+    """
+    clear_summary_cache()
+    path = Path(tmpdir.strpath, 'demo.py')
+    path.write_text('VALUE = 1\n', encoding='utf-8')
+    os.utime(path, (MOCK_OLD_MTIME, MOCK_OLD_MTIME))
+    item = PythonFile(path)
+
+    with patch('vaskitsa.python.summary.PythonFileSummary.from_source',
+               side_effect=PythonFileSummary.from_source) as from_source:
+        summary = item.summary
+        assert summary.fingerprint == item.fingerprint
+        assert item.summary is summary
+        assert PythonFile(path).summary is summary
+        assert from_source.call_count == 1
+
+        path.write_text('VALUE = 2\nOTHER = 3\n', encoding='utf-8')
+        os.utime(path, (MOCK_OLD_MTIME + 1, MOCK_OLD_MTIME + 1))
+        assert [symbol.value for symbol in item.summary.constants] == [2, 3]
+        assert from_source.call_count == 2
+
+    copy = Path(tmpdir.strpath, 'copy.py')
+    copy.write_bytes(path.read_bytes())
+    assert get_file_summary(copy) is item.summary
+    assert get_file_summary(Path(tmpdir.strpath, 'missing.py')) is None
+
+
+def test_python_summary_package_version(tmpdir):
+    """
+    Test package version is read from module summary
+    """
+    path = Path(tmpdir.strpath, 'summary-demo')
+    path.joinpath('summary_demo').mkdir(parents=True)
+    path.joinpath('setup.py').write_text('', encoding='utf-8')
+    path.joinpath('summary_demo/__init__.py').write_text(
+        '"""Demo"""\n__version__ = "2.0.1"\n',
+        encoding='utf-8',
+    )
+    package = Package(path)
+    assert str(package.python_package_version) == '2.0.1'
+    assert package.get_python_module('summary_demo').index.summary.docstring == 'Demo'
@@ -0,0 +1,126 @@
+"""
+Unit tests for vaskitsa.python.watcher module
+"""
+import sys
+import threading
+
+from pathlib import Path
+
+import pytest
+
+from vaskitsa.python.package import Package
+from vaskitsa.python.watcher import InotifyBackend, PackageWatcher, PollingBackend
+
+MOCK_DEBOUNCE_INTERVAL = 0.05
+MOCK_POLL_INTERVAL = 0.05
+MOCK_TIMEOUT = 5
+
+
+def validate_watcher_changes(watcher, path):
+    """
+    Validate watcher detects and applies changes in the mock package tree
+    """
+    package = watcher.package
+    assert isinstance(watcher.__repr__(), str)
+    assert watcher.wait_for_changes(timeout=MOCK_DEBOUNCE_INTERVAL) == []
+
+    new_file = path.joinpath('demo_package', 'sub', 'extra.py')
+    new_file.write_text('', encoding='utf-8')
+    path.joinpath('demo_package', 'new').mkdir()
+    path.joinpath('demo_package', 'new', 'code.py').write_text('', encoding='utf-8')
+    path.joinpath('demo_package', 'main.py').unlink()
+    path.joinpath('demo_package', 'notes.txt').write_text('', encoding='utf-8')
+
+    changes = []
+    while len(changes) < 3:
+        paths = watcher.wait_for_changes(timeout=MOCK_TIMEOUT)
+        assert paths
+        changes.extend(paths)
+        modules = watcher.update(paths)
+        assert modules
+    assert new_file in changes
+    assert path.joinpath('demo_package', 'notes.txt') not in changes
+
+    assert [item.name for item in package.get_python_module('demo_package').files] == ['__init__']
+    assert [item.name for item in package.get_python_module('demo_package/sub').files] == ['extra', 'module']
+    assert package.get_python_module('demo_package/new') is not None
+
+
+def test_python_package_watcher_polling(mock_package_tree):
+    """
+    Test watching package changes with polling backend
+    """
+    package = Package(mock_package_tree)
+    with PackageWatcher(package, debounce=MOCK_DEBOUNCE_INTERVAL, poll_interval=MOCK_POLL_INTERVAL,
+                        polling=True) as watcher:
+        assert isinstance(watcher.backend, PollingBackend)
+        validate_watcher_changes(watcher, mock_package_tree)
+    assert watcher.backend is None
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='inotify requires linux')
+def test_python_package_watcher_inotify(mock_package_tree):
+    """
+    Test watching package changes with inotify backend
+    """
+    package = Package(mock_package_tree)
+    with PackageWatcher(package, debounce=MOCK_DEBOUNCE_INTERVAL) as watcher:
+        assert isinstance(watcher.backend, InotifyBackend)
+        validate_watcher_changes(watcher, mock_package_tree)
+
+
+def test_python_package_watcher_run(mock_package_tree):
+    """
+    Test running watcher in a thread with callback for changes
+    """
+    package = Package(mock_package_tree)
+    watcher = PackageWatcher(package, debounce=MOCK_DEBOUNCE_INTERVAL, poll_interval=MOCK_POLL_INTERVAL,
+                             polling=True)
+    updated = threading.Event()
+    results = []
+
+    def callback(package, modules):
+        results.append((package, modules))
+        updated.set()
+
+    watcher.start()
+    thread = threading.Thread(target=watcher.run, args=(callback,))
+    thread.start()
+    try:
+        mock_package_tree.joinpath('tests', 'test_new.py').write_text('', encoding='utf-8')
+        assert updated.wait(MOCK_TIMEOUT)
+    finally:
+        watcher.stop()
+        thread.join(MOCK_TIMEOUT)
+    assert not thread.is_alive()
+    assert results[0][0] is package
+    assert results[0][1] == [package.get_python_module('tests')]
+
+
+@pytest.mark.parametrize('polling', [True, False])
+def test_python_package_watcher_removed_modules(mock_package_tree, tmpdir, polling):
+    """
+    Test modules removed by moving their directory out of the package are returned
+    """
+    if not polling and not sys.platform.startswith('linux'):
+        pytest.skip('inotify requires linux')
+    package = Package(mock_package_tree)
+    with PackageWatcher(package, debounce=MOCK_DEBOUNCE_INTERVAL, poll_interval=MOCK_POLL_INTERVAL,
+                        polling=polling) as watcher:
+        removed = package.get_python_module('demo_package/sub')
+        assert removed is not None
+        moved = Path(tmpdir.strpath, 'moved')
+        mock_package_tree.joinpath('demo_package', 'sub').rename(moved)
+
+        modules = []
+        while removed not in modules:
+            paths = watcher.wait_for_changes(timeout=MOCK_TIMEOUT)
+            assert paths
+            modules.extend(watcher.update(paths))
+        assert package.get_python_module('demo_package/sub') is None
+        assert removed not in package.python_modules
+
+        if not polling:
+            assert mock_package_tree.joinpath('demo_package', 'sub') not in watcher.backend.__watches__.values()
+            moved.joinpath('ignored.py').write_text('', encoding='utf-8')
+            assert watcher.wait_for_changes(timeout=MOCK_DEBOUNCE_INTERVAL * 4) == []
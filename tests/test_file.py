@@ -1,12 +1,19 @@
 """
 Unit test cases for loading File objects
 """
+from pathlib import Path
 
 import pytest
 
 from pathlib_tree.tree import FilesystemError
 
 from vaskitsa.python.file import PythonFile
+from vaskitsa.python.package import Package
+
+from .constants import MOCK_DATA
+
+MOCK_PACKAGE_PATH = MOCK_DATA.joinpath('mock-python-module')
+MOCK_MODULE_NAME = 'mock_python_module'
 
 
 def test_file_load_self_no_module():
@@ -33,3 +40,26 @@ def test_file_callbacks_no_module():
         testcase.error('test error method errors')
     with pytest.raises(FilesystemError):
         testcase.message('test message method error')
+
+
+def test_file_cached_paths_invalidated_on_move():
+    """
+    Test cached derived paths are reset when file path is changed
+    """
+    package = Package(MOCK_PACKAGE_PATH)
+    module = package.get_python_module(MOCK_MODULE_NAME)
+    testcase = module.index
+    assert not hasattr(testcase, '__dict__')
+    assert testcase.relative_path == Path(MOCK_MODULE_NAME, '__init__.py')
+    assert testcase.relative_directory == Path(MOCK_MODULE_NAME)
+    assert testcase.import_path == MOCK_MODULE_NAME
+
+    testcase.path = module.joinpath('demo', 'run.py')
+    assert testcase.module_root is False
+    assert testcase.relative_path == Path(MOCK_MODULE_NAME, 'demo', 'run.py')
+    assert testcase.relative_directory == Path(MOCK_MODULE_NAME, 'demo')
+    assert testcase.import_path == f'{MOCK_MODULE_NAME}.demo.run'
+
+    testcase.module = None
+    assert testcase.relative_path is None
+    assert testcase.import_path is None
@@ -0,0 +1,84 @@
+"""
+Unit tests for vaskitsa.ignore module
+"""
+import pytest
+
+from vaskitsa.configuration import DEFAULT_IGNORED_DIRECTORIES
+from vaskitsa.ignore import IgnorePatterns
+
+MOCK_PATTERNS = (
+    '# comment line',
+    '',
+    '*.egg-info/',
+    '__pycache__/',
+    'build/',
+    '/local.py',
+    'docs/*.py',
+    'data/**/generated',
+    '**/vendor',
+    'test_[!a]*.py',
+    'cache-?',
+    '\\#hash.py',
+    'trailing.py   ',
+    '*.pyc',
+    '!keep.pyc',
+)
+
+
+@pytest.mark.parametrize('path,is_directory,expected', (
+    ('demo.egg-info', True, True),
+    ('src/demo.egg-info', True, True),
+    ('demo.egg-info', False, False),
+    ('build', True, True),
+    ('src/build', True, True),
+    ('build', False, False),
+    ('__pycache__', True, True),
+    ('local.py', False, True),
+    ('src/local.py', False, False),
+    ('docs/conf.py', False, True),
+    ('docs/sub/conf.py', False, False),
+    ('src/docs/conf.py', False, False),
+    ('data/generated', True, True),
+    ('data/a/b/generated', True, True),
+    ('other/data/generated', True, False),
+    ('vendor', True, True),
+    ('src/deep/vendor', False, True),
+    ('test_module.py', False, True),
+    ('test_abc.py', False, False),
+    ('cache-1', True, True),
+    ('cache-12', True, False),
+    ('#hash.py', False, True),
+    ('trailing.py', False, True),
+    ('module.pyc', False, True),
+    ('keep.pyc', False, False),
+    ('module.py', False, False),
+))
+def test_ignore_patterns_match(path, is_directory, expected):
+    """
+    Test matching paths with ignore patterns
+    """
+    patterns = IgnorePatterns(MOCK_PATTERNS)
+    assert isinstance(patterns.__repr__(), str)
+    assert patterns.match(path, is_directory) is expected
+
+
+def test_ignore_patterns_match_parts():
+    """
+    Test matching paths with excluded parent directories
+    """
+    patterns = IgnorePatterns(MOCK_PATTERNS)
+    assert patterns.match_parts(('build', 'lib', 'module.py')) is True
+    assert patterns.match_parts(('src', 'lib', 'module.py')) is False
+    assert patterns.match_parts(('src', 'build')) is False
+    assert patterns.match_parts(('src', 'build'), is_directory=True) is True
+
+
+def test_ignore_patterns_default_directories():
+    """
+    Test default ignored directories match as before at any level
+    """
+    patterns = IgnorePatterns(DEFAULT_IGNORED_DIRECTORIES)
+    for name in ('.git', '.tox', 'demo.egg-info', 'dist', '__pycache__'):
+        assert patterns.match(name, True)
+        assert patterns.match(f'src/{name}', True)
+    assert not patterns.match('src', True)
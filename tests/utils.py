@@ -0,0 +1,48 @@
+"""
+Shared utilities for unit tests with mock git repositories
+"""
+import subprocess
+
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+MOCK_GIT_ENVIRONMENT = ('-c', 'user.name=Test', '-c', 'user.email=test@example.com')
+
+
+def git(path: Union[str, Path], *args: str, env: Optional[Dict[str, str]] = None) -> None:
+    """
+    Run git command in mock repository with test user details
+    """
+    subprocess.run(
+        ('git',) + MOCK_GIT_ENVIRONMENT + args,
+        cwd=path,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=env,
+    )
+
+
+def write_files(path: Path, files: Dict[str, str]) -> None:
+    """
+    Write files with contents relative to path, creating missing directories
+    """
+    for filename, contents in files.items():
+        item = path.joinpath(filename)
+        item.parent.mkdir(parents=True, exist_ok=True)
+        item.write_text(contents, encoding='utf-8')
+
+
+def create_git_repository(path: Path,
+                          files: Optional[Dict[str, str]] = None,
+                          branch: str = 'main',
+                          message: str = 'first') -> Path:
+    """
+    Create mock git repository, committing files to first commit if files are given
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    git(path, 'init', '-q', '-b', branch)
+    if files is not None:
+        write_files(path, files)
+        git(path, 'add', '-A')
+        git(path, 'commit', '-q', '--allow-empty', '-m', message)
+    return path
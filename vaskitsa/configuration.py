@@ -4,13 +4,15 @@ Parser for code generatation repository configuration
 import os
 
 from pathlib import Path
-from typing import Dict, Optional, Union, TYPE_CHECKING
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
 
 from sys_toolkit.configuration import YamlConfiguration
 
 from .documentation.configuration import DocumentationConfiguration
 from .documentation.sphinx.configuration import SphinxConfiguration
+from .git.configuration import GitConfiguration
 from .hooks.configuration import HooksConfiguration
+from .python.configuration import ScannerConfiguration
 
 if TYPE_CHECKING:
     from .documentation.sphinx.package import AutodocPackageGenerator
@@ -46,7 +48,9 @@ class Configuration(YamlConfiguration):
     }
     __section_loaders__ = (
         DocumentationConfiguration,
+        GitConfiguration,
         HooksConfiguration,
+        ScannerConfiguration,
         SphinxConfiguration,
     )
 
@@ -68,6 +72,26 @@ class Configuration(YamlConfiguration):
         )
         self.__tree_instances__ = {}
 
+    @property
+    def ignored_cache_directories(self) -> List[str]:
+        """
+        Return ignore patterns for configured scanner and git cache directories
+
+        Cache directories outside the repository are not returned
+        """
+        patterns = []
+        # pylint: disable=no-member
+        for directory in (self.scanner.cache_directory, self.git.cache_directory):
+            if not directory or os.path.isabs(directory):
+                continue
+            directory = os.path.normpath(directory).replace(os.sep, '/')
+            if directory == '.' or directory.startswith('../'):
+                continue
+            pattern = f'{directory}/'
+            if pattern not in patterns:
+                patterns.append(pattern)
+        return patterns
+
     @property
     def git_repository(self) -> 'GitRepository':
         """
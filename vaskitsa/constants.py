@@ -0,0 +1,10 @@
+"""
+Constants shared by vaskitsa modules
+"""
+
+# Directory for persistent caches, relative to repository or package root
+DEFAULT_SCAN_CACHE_DIRECTORY = '.vaskitsa-cache'
+
+# Files and directories modified less than this time ago are not cached, because
+# further changes within the filesystem timestamp resolution would not change mtime
+RACY_MTIME_INTERVAL_NS = 2 * 10**9
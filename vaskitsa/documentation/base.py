@@ -14,6 +14,7 @@ class TemplateGenerator:
     """
     Common base class for items linked to template generators
     """
+    __slots__ = ()
     template_name: str = None
 
     @property
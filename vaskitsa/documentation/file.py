@@ -17,6 +17,7 @@ class FileDocumentGenerator(PythonFile, TemplateGenerator):
     """
     Documentation generator for single python file
     """
+    __slots__ = ()
     template_name: Optional[str] = None
     """Template to render for file documentation"""
 
@@ -11,6 +11,7 @@ class AutoModuleFileGenerator(FileDocumentGenerator):
     """
     Autodoc automodule import generator for python file
     """
+    __slots__ = ()
 
     @property
     def template_directory(self) -> Path:
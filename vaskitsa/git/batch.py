@@ -0,0 +1,278 @@
+"""
+Persistent git cat-file batch processes for object lookups
+
+Running a git command for every lookup is dominated by the process startup cost.
+GitObjectReader keeps long running git cat-file --batch and --batch-check processes
+for a repository and sends lookups to them over a pipe, so reading object details
+or file contents at a revision does not start new processes.
+
+Requests from multiple threads are serialized with a lock for each process. The
+processes are started on first use and stopped with close(), when the reader is
+garbage collected or when the interpreter exits.
+"""
+import os
+import subprocess
+import threading
+import weakref
+
+from typing import Dict, IO, List, Optional, Tuple, TYPE_CHECKING
+
+from ..exceptions import GitError
+
+if TYPE_CHECKING:
+    from .repository import GitRepository
+
+DEFAULT_COMMIT_ENCODING = 'utf-8'
+SHUTDOWN_TIMEOUT = 5
+
+
+class GitObject:
+    """
+    Git object details from git cat-file
+    """
+    object_hash: str
+    object_type: str
+    size: int
+    data: Optional[bytes]
+
+    def __init__(self, object_hash: str, object_type: str, size: int, data: Optional[bytes] = None) -> None:
+        self.object_hash = object_hash
+        self.object_type = object_type
+        self.size = size
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f'{self.object_type} {self.object_hash}'
+
+
+def stop_process(process: Optional[subprocess.Popen]) -> None:
+    """
+    Stop a git cat-file process by closing its input, killing it if it does not exit
+    """
+    if process is None:
+        return
+    try:
+        process.stdin.close()
+    except OSError:
+        pass
+    try:
+        process.wait(timeout=SHUTDOWN_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    process.stdout.close()
+
+
+def stop_processes(processes: Dict[str, Optional[subprocess.Popen]]) -> None:
+    """
+    Stop all git cat-file processes in dictionary
+    """
+    for key, process in list(processes.items()):
+        processes[key] = None
+        stop_process(process)
+
+
+def parse_commit_object(object_hash: str, data: bytes) -> Dict[str, str]:
+    """
+    Parse raw commit object to commit details with same fields as git show format fields
+
+    Commit subject is the first paragraph of the message joined to one line, as with
+    git show %s format
+    """
+    header, _separator, message = data.partition(b'\n\n')
+    lines = header.split(b'\n')
+    encoding = DEFAULT_COMMIT_ENCODING
+    for line in lines:
+        if line.startswith(b'encoding '):
+            encoding = line[9:].decode('ascii', errors='replace')
+
+    details = {
+        'commit_hash': object_hash,
+        'parent_hashes': [],
+    }
+    for line in lines:
+        key, _separator, value = line.partition(b' ')
+        if key == b'tree':
+            details['tree_hash'] = value.decode('ascii')
+        elif key == b'parent':
+            details['parent_hashes'].append(value.decode('ascii'))
+        elif key in (b'author', b'committer'):
+            identity, _separator, date = value.decode(encoding, errors='replace').rpartition('> ')
+            name, _separator, email = identity.partition(' <')
+            timestamp = date.split(' ', 1)[0]
+            if key == b'author':
+                details.update(author_name=name, author_email=email, author_timestamp=timestamp)
+            else:
+                details.update(committer_name=name, committer_email=email, commit_timestamp=timestamp)
+
+    paragraph = message.decode(encoding, errors='replace').strip().split('\n\n', 1)[0]
+    details['commit_message'] = ' '.join(line.strip() for line in paragraph.splitlines())
+    return details
+
+
+def parse_tree_object(data: bytes, hash_length: int) -> List[Tuple[str, str, str]]:
+    """
+    Parse raw tree object to list of entry mode, name and object hash
+
+    Hash length is the length of object hashes in bytes, 20 for SHA-1 repositories
+    """
+    entries = []
+    offset = 0
+    while offset < len(data):
+        end = data.index(b'\0', offset)
+        mode, _separator, name = data[offset:end].partition(b' ')
+        object_hash = data[end + 1:end + 1 + hash_length].hex()
+        entries.append((mode.decode('ascii'), os.fsdecode(name), object_hash))
+        offset = end + 1 + hash_length
+    return entries
+
+
+class GitObjectReader:
+    """
+    Read git objects through persistent git cat-file batch processes
+    """
+    repository: 'GitRepository'
+
+    def __init__(self, repository: 'GitRepository') -> None:
+        self.repository = repository
+        self.__processes__ = {'--batch': None, '--batch-check': None}
+        self.__locks__ = {'--batch': threading.Lock(), '--batch-check': threading.Lock()}
+        self.__finalizer__ = weakref.finalize(self, stop_processes, self.__processes__)
+
+    def __repr__(self) -> str:
+        return f'object reader {self.repository}'
+
+    def __enter__(self) -> 'GitObjectReader':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __get_process__(self, mode: str) -> subprocess.Popen:
+        """
+        Get running git cat-file process for mode, starting it if necessary
+        """
+        process = self.__processes__[mode]
+        if process is not None and process.poll() is None:
+            return process
+        stop_process(process)
+        try:
+            # pylint: disable=consider-using-with
+            process = subprocess.Popen(
+                ('git', 'cat-file', mode),
+                cwd=self.repository,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as error:
+            raise GitError(f'Error starting git cat-file {mode}: {error}') from error
+        self.__processes__[mode] = process
+        return process
+
+    @staticmethod
+    def __read_header__(name: str, stdout: IO[bytes]) -> Optional[Tuple[str, str, int]]:
+        """
+        Read object header line from git cat-file output
+
+        Returns None for missing objects
+        """
+        line = stdout.readline()
+        if not line:
+            raise GitError(f'git cat-file exited while reading {name}')
+        line = line.decode('utf-8', errors='replace').rstrip('\n')
+        if line.endswith((' missing', ' ambiguous')):
+            return None
+        fields = line.rsplit(' ', 2)
+        if len(fields) != 3:
+            raise GitError(f'Unexpected git cat-file output for {name}: {line}')
+        return fields[0], fields[1], int(fields[2])
+
+    def __request__(self, mode: str, name: str) -> Optional[GitObject]:
+        """
+        Send object lookup to git cat-file process and read the response
+        """
+        if '\n' in name:
+            raise GitError(f'Invalid git object name: {name!r}')
+        with self.__locks__[mode]:
+            process = self.__get_process__(mode)
+            try:
+                process.stdin.write(os.fsencode(name) + b'\n')
+                process.stdin.flush()
+                header = self.__read_header__(name, process.stdout)
+                if header is None:
+                    return None
+                data = None
+                if mode == '--batch':
+                    data = process.stdout.read(header[2] + 1)[:-1]
+                    if len(data) != header[2]:
+                        raise GitError(f'git cat-file exited while reading {name}')
+            except (OSError, ValueError, GitError) as error:
+                self.__processes__[mode] = None
+                stop_process(process)
+                raise GitError(f'Error reading git object {name}: {error}') from error
+        return GitObject(*header, data=data)
+
+    def close(self) -> None:
+        """
+        Stop git cat-file processes
+        """
+        for mode, lock in self.__locks__.items():
+            with lock:
+                process = self.__processes__[mode]
+                self.__processes__[mode] = None
+                stop_process(process)
+
+    def get_info(self, name: str) -> Optional[GitObject]:
+        """
+        Get object hash, type and size for an object name without reading the data
+
+        Name can be any git object name, like a revision or revision:path. Returns None
+        if the object does not exist.
+        """
+        return self.__request__('--batch-check', name)
+
+    def get_object(self, name: str) -> Optional[GitObject]:
+        """
+        Get object with data for an object name
+
+        Returns None if the object does not exist
+        """
+        return self.__request__('--batch', name)
+
+    def read_file(self, revision: str, path: str) -> Optional[bytes]:
+        """
+        Read file contents at revision, with path relative to repository root
+
+        Returns None if the file does not exist at the revision
+        """
+        item = self.get_object(f'{revision}:{path}')
+        if item is None:
+            return None
+        if item.object_type != 'blob':
+            raise GitError(f'Path {path} at {revision} is not a file: {item.object_type}')
+        return item.data
+
+    def read_tree(self, treeish: str) -> Optional[List[Tuple[str, str, str]]]:
+        """
+        Read tree entries as mode, name and object hash for a tree, commit or revision:path
+
+        Returns None if the tree does not exist
+        """
+        item = self.get_object(f'{treeish}^{{tree}}')
+        if item is None:
+            return None
+        return parse_tree_object(item.data, len(item.object_hash) // 2)
+
+    def read_commit(self, revision: str) -> Optional[Dict[str, str]]:
+        """
+        Read commit details for a revision from the commit object
+
+        Returns dictionary with commit_hash, tree_hash, parent_hashes, author_name,
+        author_email, author_timestamp, committer_name, committer_email, commit_timestamp
+        and commit_message subject, or None if the commit does not exist
+        """
+        item = self.get_object(f'{revision}^{{commit}}')
+        if item is None:
+            return None
+        return parse_commit_object(item.object_hash, item.data)
@@ -0,0 +1,168 @@
+"""
+Cache of immutable git commit details keyed by full commit hash
+
+Commit objects never change once created, so details like author, tree hash and
+message can be cached by commit hash and shared by all GitCommit objects for the
+same commit. Details that can change, like ref names and signature trust, are not
+cached.
+
+One cache is shared by all GitRepository objects for the same repository path.
+The cache keeps the most recently used commits up to a maximum size and can be
+saved to a file to reuse details between runs.
+"""
+import atexit
+import json
+import os
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .repository import GitRepository
+
+COMMIT_CACHE_FILENAME = 'commits.json'
+COMMIT_CACHE_VERSION = 1
+
+
+class GitCommitCache:
+    """
+    LRU cache of commit details by full commit hash, with hit and miss counters
+    """
+    path: Optional[Path]
+    max_size: int
+    hits: int
+    misses: int
+    modified: bool
+
+    __instances__: Dict[str, 'GitCommitCache'] = {}
+    __instances_lock__ = threading.Lock()
+
+    def __init__(self, max_size: int, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path is not None else None
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.modified = False
+        self.__lock__ = threading.Lock()
+        self.__commits__ = OrderedDict()
+        if self.path is not None:
+            self.__load__()
+
+    def __repr__(self) -> str:
+        return f'commit cache {len(self)}/{self.max_size}'
+
+    def __len__(self) -> int:
+        return len(self.__commits__)
+
+    def __contains__(self, commit_hash: str) -> bool:
+        return commit_hash in self.__commits__
+
+    @classmethod
+    def for_repository(cls, repository: 'GitRepository') -> 'GitCommitCache':
+        """
+        Get shared commit cache for a repository, creating it from repository configuration
+
+        Persistent caches are saved when the interpreter exits
+        """
+        key = str(repository)
+        with cls.__instances_lock__:
+            cache = cls.__instances__.get(key, None)
+            if cache is None:
+                configuration = repository.configuration.git
+                path = None
+                if configuration.commit_cache_persistent:
+                    path = repository.joinpath(configuration.cache_directory, COMMIT_CACHE_FILENAME)
+                cache = cls(int(configuration.commit_cache_size), path=path)
+                if path is not None:
+                    atexit.register(cache.save)
+                cls.__instances__[key] = cache
+        return cache
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """
+        Return cache hit and miss counters and size
+        """
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self),
+            'max_size': self.max_size,
+        }
+
+    def __load__(self) -> None:
+        """
+        Load cached commits from cache file, ignoring missing or invalid files
+        """
+        try:
+            with self.path.open('r', encoding='utf-8') as filedescriptor:
+                data = json.load(filedescriptor)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version', None) != COMMIT_CACHE_VERSION:
+            return
+        for commit_hash, details in data.get('commits', {}).items():
+            self.__commits__[commit_hash] = details
+        while len(self.__commits__) > self.max_size:
+            self.__commits__.popitem(last=False)
+
+    def get(self, commit_hash: str) -> Optional[Dict[str, str]]:
+        """
+        Get cached details for full commit hash, marking the commit recently used
+
+        Returns None if commit is not cached
+        """
+        with self.__lock__:
+            details = self.__commits__.get(commit_hash, None)
+            if details is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.__commits__.move_to_end(commit_hash)
+            return details
+
+    def set(self, commit_hash: str, details: Dict[str, str]) -> None:
+        """
+        Store details for full commit hash, dropping least recently used commits
+        """
+        with self.__lock__:
+            if commit_hash in self.__commits__:
+                self.__commits__.move_to_end(commit_hash)
+                return
+            self.__commits__[commit_hash] = details
+            self.modified = True
+            while len(self.__commits__) > self.max_size:
+                self.__commits__.popitem(last=False)
+
+    def clear(self) -> None:
+        """
+        Remove all commits from the cache and reset counters
+        """
+        with self.__lock__:
+            self.__commits__.clear()
+            self.hits = 0
+            self.misses = 0
+            self.modified = True
+
+    def save(self) -> None:
+        """
+        Save cached commits to cache file if cache is persistent and modified
+        """
+        if self.path is None or not self.modified:
+            return
+        with self.__lock__:
+            data = {
+                'version': COMMIT_CACHE_VERSION,
+                'commits': dict(self.__commits__),
+            }
+            self.modified = False
+        tmpfile = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmpfile.open('w', encoding='utf-8') as filedescriptor:
+                json.dump(data, filedescriptor)
+            os.replace(tmpfile, self.path)
+        except OSError:
+            self.modified = True
@@ -3,9 +3,10 @@ Change set in git repository
 """
 from enum import Enum
 from pathlib import Path
-from typing import List, Tuple, Union, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
 from ..exceptions import GitError
+from .utils import iter_git_command_records
 
 if TYPE_CHECKING:
     from .repository import GitRepository
@@ -21,6 +22,7 @@ class GitChangeState(Enum):
     DELETED = 'deleted'
     MODIFIED = 'modified'
     RENAMED = 'renamed'
+    TYPE_CHANGED = 'type_changed'
     UPDATED_UNMERGED = 'updated_unmerged'
 
 
@@ -41,6 +43,7 @@ CHANGE_STATE_MAP = {
     'D': GitChangeState.DELETED,
     'M': GitChangeState.MODIFIED,
     'R': GitChangeState.RENAMED,
+    'T': GitChangeState.TYPE_CHANGED,
     'U': GitChangeState.UPDATED_UNMERGED,
 }
 DEFAULT_FILTER_STATES = (
@@ -50,57 +53,224 @@ DEFAULT_FILTER_STATES = (
     GitFilterState.RENAMED,
 )
 
+# Change states with both source and destination paths in git diff output
+CHANGE_STATES_WITH_SOURCE = (GitChangeState.COPIED, GitChangeState.RENAMED)
+
+
+class GitChange:
+    """
+    Changed path in git change set
+
+    For renamed and copied files old_path is the source path and similarity the
+    similarity index percentage reported by git
+    """
+    state: GitChangeState
+    path: Path
+    old_path: Optional[Path]
+    similarity: Optional[int]
+
+    def __init__(self,
+                 state: GitChangeState,
+                 path: Path,
+                 old_path: Optional[Path] = None,
+                 similarity: Optional[int] = None) -> None:
+        self.state = state
+        self.path = path
+        self.old_path = old_path
+        self.similarity = similarity
+
+    def __repr__(self) -> str:
+        if self.old_path is not None:
+            return f'{self.state.value} {self.old_path} -> {self.path}'
+        return f'{self.state.value} {self.path}'
+
+
+def iter_change_records(records: Iterable[str]) -> Iterator[GitChange]:
+    """
+    Parse git diff --name-status -z output records to GitChange objects
+
+    Each change is a status record followed by one path, or by source and destination
+    paths for renames and copies. Status records can include a score after the status
+    letter, like R100 for renamed file with identical contents.
+    """
+    records = iter(records)
+    for status in records:
+        if not status:
+            continue
+        try:
+            state = CHANGE_STATE_MAP[status[:1]]
+            score = int(status[1:]) if len(status) > 1 else None
+        except (KeyError, ValueError) as error:
+            raise GitError(f'Unexpected git change status {status}') from error
+        old_path = None
+        if state in CHANGE_STATES_WITH_SOURCE:
+            old_path = next(records, None)
+        path = next(records, None)
+        if path is None:
+            raise GitError(f'Unexpected end of git change output after status {status}')
+        yield GitChange(
+            state,
+            Path(path),
+            old_path=Path(old_path) if old_path is not None else None,
+            similarity=score,
+        )
+
+
+def get_change_set_command(start_revision: str,
+                           end_revision: str,
+                           paths: Optional[Iterable[Union[str, Path]]] = None,
+                           find_renames: bool = False,
+                           find_copies: bool = False) -> List[str]:
+    """
+    Get git diff-tree arguments for NUL separated changes between revisions
+
+    The output can be parsed with iter_change_records(). Copy detection includes rename
+    detection.
+    """
+    args = ['diff-tree', '-z', '--no-commit-id', '--name-status', '-r']
+    if find_copies:
+        args.append('-C')
+    elif find_renames:
+        args.append('-M')
+    args.append(f'{start_revision}..{end_revision}')
+    args.append('--')
+    if paths:
+        args.extend(str(path) for path in paths)
+    return args
+
 
 class GitChangeSet:
     """
     Git change set between two revisions
+
+    Changes are streamed from git with iter_changes() or loaded to lists of paths by
+    change state when the state attributes are first accessed. Paths limit the changes
+    to paths matching the git pathspecs, like directory prefixes.
     """
     repository: 'GitRepository'
     start_revision: str
     end_revision: str
-
-    unmodified: List[Path]
-    added: List[Path]
-    copied: List[Path]
-    deleted: List[Path]
-    modified: List[Path]
-    renamed: List[Path]
-    updated_unmerged: List[Path]
+    paths: Tuple[str]
+    find_renames: bool
+    find_copies: bool
 
     def __init__(self,
                  repository: 'GitRepository',
                  start_revision: str,
-                 end_revision: str) -> None:
+                 end_revision: str,
+                 paths: Optional[Iterable[Union[str, Path]]] = None,
+                 find_renames: bool = False,
+                 find_copies: bool = False) -> None:
         self.repository = repository
         self.start_revision = start_revision
         self.end_revision = end_revision
-
-        for status in list(GitChangeState):
-            setattr(self, status.value, [])
-        self.__load_change_set__()
+        self.paths = tuple(str(path) for path in paths) if paths else ()
+        self.find_renames = find_renames
+        self.find_copies = find_copies
+        self.__changes__: Optional[Dict[GitChangeState, List[Path]]] = None
 
     def __repr__(self) -> str:
         return f'{self.start_revision}..{self.end_revision}'
 
+    def __iter__(self) -> Iterator[GitChange]:
+        return self.iter_changes()
+
+    @property
+    def unmodified(self) -> List[Path]:
+        """
+        Return unmodified paths
+        """
+        return self.__get_paths__(GitChangeState.UNMODIFIED)
+
+    @property
+    def added(self) -> List[Path]:
+        """
+        Return added paths
+        """
+        return self.__get_paths__(GitChangeState.ADDED)
+
+    @property
+    def copied(self) -> List[Path]:
+        """
+        Return destination paths of copied files
+        """
+        return self.__get_paths__(GitChangeState.COPIED)
+
+    @property
+    def deleted(self) -> List[Path]:
+        """
+        Return deleted paths
+        """
+        return self.__get_paths__(GitChangeState.DELETED)
+
+    @property
+    def modified(self) -> List[Path]:
+        """
+        Return modified paths
+        """
+        return self.__get_paths__(GitChangeState.MODIFIED)
+
+    @property
+    def renamed(self) -> List[Path]:
+        """
+        Return destination paths of renamed files
+        """
+        return self.__get_paths__(GitChangeState.RENAMED)
+
+    @property
+    def type_changed(self) -> List[Path]:
+        """
+        Return paths with changed file type
+        """
+        return self.__get_paths__(GitChangeState.TYPE_CHANGED)
+
+    @property
+    def updated_unmerged(self) -> List[Path]:
+        """
+        Return unmerged paths
+        """
+        return self.__get_paths__(GitChangeState.UPDATED_UNMERGED)
+
+    def __get_paths__(self, state: GitChangeState) -> List[Path]:
+        """
+        Get paths for change state, loading the change set on first call
+        """
+        if self.__changes__ is None:
+            self.__load_change_set__()
+        return self.__changes__[state]
+
     def __load_change_set__(self) -> None:
         """
         Load changes in change set
         """
-        lines = self.repository.run_git_command(
-            'diff-tree',
-            '--no-commit-id',
-            '--name-status',
-            '-r',
-            f'{self.start_revision}..{self.end_revision}'
+        changes = {state: [] for state in GitChangeState}
+        for change in self.iter_changes():
+            changes[change.state].append(change.path)
+        self.__changes__ = changes
+
+    def iter_changes(self,
+                     states: Optional[Iterable[GitChangeState]] = None) -> Iterator[GitChange]:
+        """
+        Iterate changes in change set, streaming the changes from a single git command
+
+        Memory use does not depend on the number of changes. Changes can be limited to
+        specified change states.
+        """
+        self.repository.validate()
+        if not self.repository.has_commits:
+            raise GitError(f'Repository has no commits: {self.repository}')
+        args = get_change_set_command(
+            self.start_revision,
+            self.end_revision,
+            paths=self.paths,
+            find_renames=self.find_renames,
+            find_copies=self.find_copies,
         )
-        for line in lines:
-            status, path = line.split('\t', 1)
-            path = Path(path)
-            try:
-                status = CHANGE_STATE_MAP[status]
-            except KeyError as error:
-                raise GitError(f'Unexpected git change status {status}') from error
-            getattr(self, status.value).append(path)
+        states = set(states) if states is not None else None
+        records = iter_git_command_records(*args, cwd=self.repository)
+        for change in iter_change_records(records):
+            if states is None or change.state in states:
+                yield change
 
     def get_filter_states(self, values: Union[str, List[str]]) -> List[GitChangeState]:
         """
@@ -0,0 +1,395 @@
+"""
+Churn and ownership statistics from git history
+
+Lines added and deleted are read from a single streamed git log --numstat pass and
+aggregated by directory, author and time period. Statistics for a directory count
+each commit once, even if it changes many files in the directory, so directories
+can be mapped directly to python modules.
+
+Processed statistics are kept with the last processed commit. Updating processes
+only commits added after it, and history is processed again from the start only if
+the last processed commit is no longer an ancestor of the revision.
+"""
+import atexit
+import json
+import os
+import posixpath
+import threading
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+from ..exceptions import GitError
+from .commit import get_commit_format
+from .configuration import DEFAULT_CHURN_PERIOD
+from .utils import iter_git_command_records, run_git_command
+
+if TYPE_CHECKING:
+    from .repository import GitRepository
+
+CHURN_CACHE_FILENAME = 'churn.json'
+CHURN_CACHE_VERSION = 1
+
+CHURN_PERIOD_FORMATS = {
+    'day': '%Y-%m-%d',
+    'week': '%G-W%V',
+    'month': '%Y-%m',
+    'year': '%Y',
+}
+
+# Commit fields read for churn statistics, with marker at start of each commit
+CHURN_COMMIT_FIELDS = (
+    ('commit_hash', '%H'),
+    ('author_name', '%an'),
+    ('author_email', '%ae'),
+    ('author_timestamp', '%at'),
+)
+COMMIT_RECORD_MARKER = '\x1e'
+
+
+def parse_numstat_count(value: str) -> int:
+    """
+    Parse added or deleted line count from git numstat output, binary files have -
+    """
+    return int(value) if value != '-' else 0
+
+
+def iter_numstat_commits(records: Iterable[str]) -> Iterator[Dict]:
+    """
+    Iterate commits with changed files from git log --numstat -z output records
+
+    The log format must start with COMMIT_RECORD_MARKER followed by CHURN_COMMIT_FIELDS.
+    Each commit has a files list of path, added lines and deleted lines. Renamed files
+    are reported with the new path.
+    """
+    records = iter(records)
+    commit = None
+    for record in records:
+        if record.startswith(COMMIT_RECORD_MARKER):
+            if commit is not None:
+                yield commit
+            values = [record[len(COMMIT_RECORD_MARKER):]]
+            for _field in CHURN_COMMIT_FIELDS[1:]:
+                value = next(records, None)
+                if value is None:
+                    raise GitError('Unexpected end of git log output in commit details')
+                values.append(value)
+            commit = {field: value for (field, _placeholder), value in zip(CHURN_COMMIT_FIELDS, values)}
+            commit['files'] = []
+            continue
+
+        record = record.lstrip('\n')
+        if not record:
+            continue
+        if commit is None:
+            raise GitError(f'Unexpected git log numstat output before commit: {record}')
+        try:
+            added, deleted, path = record.split('\t', 2)
+            if not path:
+                next(records, None)
+                path = next(records, None)
+                if path is None:
+                    raise GitError('Unexpected end of git log output in renamed file')
+            commit['files'].append((path, parse_numstat_count(added), parse_numstat_count(deleted)))
+        except ValueError as error:
+            raise GitError(f'Unexpected git log numstat output: {record}') from error
+    if commit is not None:
+        yield commit
+
+
+class ChurnStatistics:
+    """
+    Commit and changed line counters with totals per author and per period
+    """
+    commits: int
+    added: int
+    deleted: int
+    authors: Dict[str, Dict]
+    periods: Dict[str, Dict[str, int]]
+
+    def __init__(self) -> None:
+        self.commits = 0
+        self.added = 0
+        self.deleted = 0
+        self.authors = {}
+        self.periods = {}
+
+    def __repr__(self) -> str:
+        return f'{self.commits} commits +{self.added} -{self.deleted}'
+
+    @property
+    def lines_changed(self) -> int:
+        """
+        Return total number of added and deleted lines
+        """
+        return self.added + self.deleted
+
+    def add_commit(self, author_name: str, author_email: str, period: str, added: int, deleted: int) -> None:
+        """
+        Add one commit with changed line counts
+        """
+        self.commits += 1
+        self.added += added
+        self.deleted += deleted
+        author = self.authors.get(author_email, None)
+        if author is None:
+            author = self.authors[author_email] = {'name': author_name, 'commits': 0, 'added': 0, 'deleted': 0}
+        author['name'] = author_name
+        for counters in (author, self.periods.setdefault(period, {'commits': 0, 'added': 0, 'deleted': 0})):
+            counters['commits'] += 1
+            counters['added'] += added
+            counters['deleted'] += deleted
+
+    def merge(self, other: 'ChurnStatistics') -> None:
+        """
+        Add counters from other statistics
+        """
+        self.commits += other.commits
+        self.added += other.added
+        self.deleted += other.deleted
+        for email, values in other.authors.items():
+            author = self.authors.setdefault(email, {'name': values['name'], 'commits': 0, 'added': 0, 'deleted': 0})
+            for key in ('commits', 'added', 'deleted'):
+                author[key] += values[key]
+        for period, values in other.periods.items():
+            counters = self.periods.setdefault(period, {'commits': 0, 'added': 0, 'deleted': 0})
+            for key in ('commits', 'added', 'deleted'):
+                counters[key] += values[key]
+
+    def top_authors(self, count: Optional[int] = None) -> List[Dict]:
+        """
+        Return authors with email and counters, most changed lines and commits first
+        """
+        authors = [
+            dict(values, email=email)
+            for email, values in self.authors.items()
+        ]
+        authors.sort(key=lambda author: (-(author['added'] + author['deleted']), -author['commits'], author['email']))
+        return authors[:count] if count is not None else authors
+
+    def to_dict(self) -> Dict:
+        """
+        Return statistics as dictionary
+        """
+        return {
+            'commits': self.commits,
+            'added': self.added,
+            'deleted': self.deleted,
+            'authors': self.authors,
+            'periods': self.periods,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ChurnStatistics':
+        """
+        Create statistics from dictionary returned by to_dict()
+        """
+        statistics = cls()
+        statistics.commits = data['commits']
+        statistics.added = data['added']
+        statistics.deleted = data['deleted']
+        statistics.authors = data['authors']
+        statistics.periods = data['periods']
+        return statistics
+
+
+class GitChurnEngine:
+    """
+    Churn statistics for directories in a git repository, updated incrementally
+    """
+    repository: 'GitRepository'
+    period: str
+    path: Optional[Path]
+    last_commit: Optional[str]
+    total: ChurnStatistics
+    modified: bool
+
+    __instances__: Dict[str, 'GitChurnEngine'] = {}
+    __instances_lock__ = threading.Lock()
+
+    def __init__(self,
+                 repository: 'GitRepository',
+                 period: str = DEFAULT_CHURN_PERIOD,
+                 path: Optional[Path] = None) -> None:
+        if period not in CHURN_PERIOD_FORMATS:
+            raise GitError(f'Unexpected churn period {period}')
+        self.repository = repository
+        self.period = period
+        self.path = Path(path) if path is not None else None
+        self.modified = False
+        self.__lock__ = threading.Lock()
+        self.__reset__()
+        if self.path is not None:
+            self.__load__()
+
+    def __repr__(self) -> str:
+        return f'churn {self.repository} {self.last_commit}'
+
+    @classmethod
+    def for_repository(cls, repository: 'GitRepository') -> 'GitChurnEngine':
+        """
+        Get shared churn engine for a repository, creating it from repository configuration
+
+        Persistent statistics are saved when the interpreter exits
+        """
+        key = str(repository)
+        with cls.__instances_lock__:
+            engine = cls.__instances__.get(key, None)
+            if engine is None:
+                configuration = repository.configuration.git
+                path = None
+                if configuration.churn_cache_persistent:
+                    path = repository.joinpath(configuration.cache_directory, CHURN_CACHE_FILENAME)
+                engine = cls(repository, period=configuration.churn_period, path=path)
+                if path is not None:
+                    atexit.register(engine.save)
+                cls.__instances__[key] = engine
+        return engine
+
+    @property
+    def directories(self) -> Dict[str, ChurnStatistics]:
+        """
+        Return statistics by directory path relative to repository root
+        """
+        return dict(self.__directories__)
+
+    def __reset__(self) -> None:
+        """
+        Clear processed statistics
+        """
+        self.last_commit = None
+        self.total = ChurnStatistics()
+        self.__directories__: Dict[str, ChurnStatistics] = {}
+
+    def __load__(self) -> None:
+        """
+        Load statistics from cache file, ignoring missing, invalid or incompatible files
+        """
+        try:
+            with self.path.open('r', encoding='utf-8') as filedescriptor:
+                data = json.load(filedescriptor)
+            if data.get('version', None) != CHURN_CACHE_VERSION or data.get('period', None) != self.period:
+                return
+            directories = {
+                directory: ChurnStatistics.from_dict(values)
+                for directory, values in data['directories'].items()
+            }
+            total = ChurnStatistics.from_dict(data['total'])
+            last_commit = data['last_commit']
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return
+        self.__directories__ = directories
+        self.total = total
+        self.last_commit = last_commit
+
+    def __is_ancestor__(self, commit: str, revision: str) -> bool:
+        """
+        Check if commit is an ancestor of revision
+        """
+        try:
+            run_git_command('merge-base', '--is-ancestor', commit, revision, cwd=self.repository)
+        except GitError:
+            return False
+        return True
+
+    def __add_commit__(self, commit: Dict) -> None:
+        """
+        Add commit changes to directory statistics, counting the commit once per directory
+        """
+        timestamp = datetime.fromtimestamp(int(commit['author_timestamp']), tz=timezone.utc)
+        period = timestamp.strftime(CHURN_PERIOD_FORMATS[self.period])
+        name = commit['author_name']
+        email = commit['author_email']
+
+        directories = {}
+        for path, added, deleted in commit['files']:
+            directory = posixpath.dirname(path) or '.'
+            counts = directories.setdefault(directory, [0, 0])
+            counts[0] += added
+            counts[1] += deleted
+        for directory, (added, deleted) in directories.items():
+            statistics = self.__directories__.get(directory, None)
+            if statistics is None:
+                statistics = self.__directories__[directory] = ChurnStatistics()
+            statistics.add_commit(name, email, period, added, deleted)
+        self.total.add_commit(
+            name,
+            email,
+            period,
+            sum(counts[0] for counts in directories.values()),
+            sum(counts[1] for counts in directories.values()),
+        )
+
+    def update(self, revision: str = 'HEAD') -> int:
+        """
+        Process commits reachable from revision not processed yet, returning the number of
+        processed commits
+
+        Merge commits are skipped. Returns 0 without running git commands if the revision
+        is the last processed commit.
+        """
+        self.repository.validate()
+        if not self.repository.has_commits:
+            return 0
+        with self.__lock__:
+            commit_hash = self.repository.resolve_revision(revision)
+            if commit_hash is None:
+                commit_hash = run_git_command('rev-parse', '--verify', f'{revision}^{{commit}}', cwd=self.repository)[0]
+            if commit_hash == self.last_commit:
+                return 0
+
+            revision_range = commit_hash
+            if self.last_commit is not None and self.__is_ancestor__(self.last_commit, commit_hash):
+                revision_range = f'{self.last_commit}..{commit_hash}'
+            else:
+                self.__reset__()
+
+            records = iter_git_command_records(
+                'log', '--numstat', '-z', '-M', '--no-merges', '--no-notes',
+                f'--format={COMMIT_RECORD_MARKER}{get_commit_format(CHURN_COMMIT_FIELDS)}',
+                revision_range,
+                '--',
+                cwd=self.repository
+            )
+            count = 0
+            for commit in iter_numstat_commits(records):
+                self.__add_commit__(commit)
+                count += 1
+            self.last_commit = commit_hash
+            self.modified = True
+            return count
+
+    def get_directory_statistics(self, directory: str) -> ChurnStatistics:
+        """
+        Get statistics for files directly in directory relative to repository root
+        """
+        directory = posixpath.normpath(str(directory).replace(os.sep, '/'))
+        return self.__directories__.get(directory, ChurnStatistics())
+
+    def save(self) -> None:
+        """
+        Save statistics to cache file if cache is persistent and modified
+        """
+        if self.path is None or not self.modified:
+            return
+        with self.__lock__:
+            data = json.dumps({
+                'version': CHURN_CACHE_VERSION,
+                'period': self.period,
+                'last_commit': self.last_commit,
+                'total': self.total.to_dict(),
+                'directories': {
+                    directory: statistics.to_dict()
+                    for directory, statistics in self.__directories__.items()
+                },
+            })
+            self.modified = False
+        tmpfile = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmpfile.open('w', encoding='utf-8') as filedescriptor:
+                filedescriptor.write(data)
+            os.replace(tmpfile, self.path)
+        except OSError:
+            self.modified = True
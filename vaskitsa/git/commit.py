@@ -2,12 +2,16 @@
 Git commit in a repository
 """
 import json
+
 from datetime import datetime
-from typing import List, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
 from sys_toolkit.encoders import DateTimeEncoder
 
+from ..exceptions import GitError
+from .refs import RE_OBJECT_HASH
+
 if TYPE_CHECKING:
     from .changeset import GitChangeSet
     from .repository import GitRepository
@@ -16,32 +20,139 @@ DEFAULT_JSON_INDENT = 2
 DEFAULT_REVISION = 'HEAD'
 UTC_TIMEZONE = ZoneInfo('UTC')
 
+# Commit details fields and git show format placeholders, loaded with one git command
+COMMIT_FIELDS = (
+    ('commit_hash', '%H'),
+    ('tree_hash', '%T'),
+    ('author_email', '%ae'),
+    ('author_name', '%an'),
+    ('author_timestamp', '%at'),
+    ('commit_timestamp', '%ct'),
+    ('ref_names', '%D'),
+    ('commit_message', '%s'),
+)
+# Commit details fields cached by commit hash. Ref names are not cached, because they change
+COMMIT_CACHED_FIELDS = tuple(field for field, _placeholder in COMMIT_FIELDS if field != 'ref_names')
+
+# Signature fields require verifying the signature and are only loaded when requested
+COMMIT_SIGNATURE_FIELDS = (
+    ('signing_key', '%GK'),
+    ('signing_key_fingerprint', '%GF'),
+    ('signing_primary_key_fingerprint', '%GP'),
+    ('signing_key_trust', '%GT'),
+    ('signing_signer_name', '%GS'),
+)
+
+
+def get_commit_format(fields: Tuple[Tuple[str, str]]) -> str:
+    """
+    Return git format string for fields, with each field terminated by NUL
+    """
+    return ''.join(f'{placeholder}%x00' for _field, placeholder in fields)
+
+
+def iter_commit_details(records: Iterable[str],
+                        fields: Tuple[Tuple[str, str]] = COMMIT_FIELDS) -> Iterator[Dict[str, str]]:
+    """
+    Iterate commit details from NUL separated git log -z output records
+
+    Empty records separating commits in git log -z output are skipped
+    """
+    details = {}
+    for record in records:
+        if not details and not record:
+            continue
+        details[fields[len(details)][0]] = record
+        if len(details) == len(fields):
+            yield details
+            details = {}
+    if details:
+        raise GitError(f'Unexpected end of git log output with partial commit details: {details}')
+
 
 class GitCommit:
     """
     Git commit for repository
+
+    Commit details are loaded with a single git show command on first access and
+    cached in the object, unless already loaded details are given when creating the
+    object. Symbolic revisions like HEAD are resolved once per object and not updated
+    if the revision later points to another commit.
+
+    Immutable details are shared with other objects for same commit hash with the
+    repository commit cache.
     """
     repository: 'GitRepository'
     revision: str
 
-    def __init__(self, repository: 'GitRepository', revision: str = DEFAULT_REVISION):
+    __details__: Dict[str, str]
+    __signature_loaded__: bool
+    __commit_hash__: Optional[str]
+
+    def __init__(self,
+                 repository: 'GitRepository',
+                 revision: str = DEFAULT_REVISION,
+                 details: Optional[Dict[str, str]] = None):
         self.repository = repository
         self.revision = revision
+        self.__details__ = details if details is not None else {}
+        self.__signature_loaded__ = False
+        self.__commit_hash__ = revision if RE_OBJECT_HASH.match(revision) else None
+        if 'commit_hash' in self.__details__:
+            self.__commit_hash__ = self.__details__['commit_hash']
+            self.__store_cached_details__()
 
     def __repr__(self) -> str:
         return self.revision
 
-    def __show_formatted__(self, format_string) -> str:
+    def __load_details__(self, signature: bool = False) -> None:
         """
-        Run git show with --no-notes --no-patch and specified format string
+        Load commit details with one git show command and NUL separated fields
+
+        Signature fields are loaded only if signature is set
         """
-        return self.repository.run_git_command(
+        fields = COMMIT_FIELDS + COMMIT_SIGNATURE_FIELDS if signature else COMMIT_FIELDS
+        records = self.repository.run_git_command_records(
             'show',
             '--no-notes',
             '--no-patch',
-            f'--format={format_string}',
-            self.revision
+            f'--format={get_commit_format(fields)}',
+            self.__commit_hash__ if self.__commit_hash__ is not None else self.revision
         )
+        if len(records) < len(fields):
+            raise GitError(f'Unexpected git show output for revision {self.revision}')
+        self.__details__ = {field: records[index] for index, (field, _placeholder) in enumerate(fields)}
+        self.__signature_loaded__ = signature
+        self.__commit_hash__ = self.__details__['commit_hash']
+        self.__store_cached_details__()
+
+    def __store_cached_details__(self) -> None:
+        """
+        Store immutable commit details to the repository commit cache
+        """
+        if all(field in self.__details__ for field in COMMIT_CACHED_FIELDS):
+            self.repository.commit_cache.set(
+                self.__commit_hash__,
+                {field: self.__details__[field] for field in COMMIT_CACHED_FIELDS}
+            )
+
+    def __get_detail__(self, field: str) -> str:
+        """
+        Return commit detail field, loading the details if necessary
+
+        Immutable details are looked up from the repository commit cache if the commit
+        hash is known before running git commands
+        """
+        if field not in self.__details__:
+            if self.__commit_hash__ is None and field in COMMIT_CACHED_FIELDS:
+                self.__commit_hash__ = self.repository.resolve_revision(self.revision)
+            if field in COMMIT_CACHED_FIELDS and self.__commit_hash__ is not None:
+                details = self.repository.commit_cache.get(self.__commit_hash__)
+                if details is not None:
+                    self.__details__.update(details)
+                    return self.__details__[field]
+            self.__load_details__(signature=any(field == item[0] for item in COMMIT_SIGNATURE_FIELDS))
+        return self.__details__[field]
 
     @property
     def properties(self) -> List[str]:
@@ -63,36 +174,42 @@ class GitCommit:
     def commit_hash(self) -> str:
         """
         Return git commit hash
+
+        HEAD and full ref names are resolved without git commands when possible
         """
-        return self.__show_formatted__('%H')[0]
+        if self.__commit_hash__ is None:
+            self.__commit_hash__ = self.repository.resolve_revision(self.revision)
+        if self.__commit_hash__ is not None:
+            return self.__commit_hash__
+        return self.__get_detail__('commit_hash')
 
     @property
     def tree_hash(self) -> str:
         """
         Return git commit hash
         """
-        return self.__show_formatted__('%T')[0]
+        return self.__get_detail__('tree_hash')
 
     @property
     def author_email(self) -> str:
         """
         Return git commit author email
         """
-        return self.__show_formatted__('%ae')[0]
+        return self.__get_detail__('author_email')
 
     @property
     def author_name(self) -> str:
         """
         Return git commit author name
         """
-        return self.__show_formatted__('%an')[0]
+        return self.__get_detail__('author_name')
 
     @property
     def author_timestamp(self) -> int:
         """
         Return git commit author timestamp
         """
-        return int(self.__show_formatted__('%at')[0])
+        return int(self.__get_detail__('author_timestamp'))
 
     @property
     def author_date(self) -> datetime:
@@ -102,18 +219,18 @@ class GitCommit:
         return datetime.fromtimestamp(self.author_timestamp).astimezone(UTC_TIMEZONE)
 
     @property
-    def commit_message(self) -> str:
+    def commit_message(self) -> List[str]:
         """
         Return git commit message as list of lines
         """
-        return self.__show_formatted__('%s')
+        return self.__get_detail__('commit_message').splitlines()
 
     @property
     def commit_timestamp(self) -> int:
         """
         Return commit timestamp
         """
-        return int(self.__show_formatted__('%ct')[0])
+        return int(self.__get_detail__('commit_timestamp'))
 
     @property
     def commit_date(self) -> datetime:
@@ -127,59 +244,62 @@ class GitCommit:
         """
         Return commit ref names
         """
-        return self.__show_formatted__('%D')[0].split(', ')
+        return self.__get_detail__('ref_names').split(', ')
 
     @property
     def signing_key(self) -> str:
         """
         Return signing key for GPG signed commit
         """
-        return self.__show_formatted__('%GK')[0]
+        return self.__get_detail__('signing_key')
 
     @property
     def signing_key_fingerprint(self) -> str:
         """
         Return signing key fingerprint for GPG signed commit
         """
-        return self.__show_formatted__('%GF')[0]
+        return self.__get_detail__('signing_key_fingerprint')
 
     @property
     def signing_primary_key_fingerprint(self) -> str:
         """
         Return primary signing key fingerprint for GPG signed commit
         """
-        return self.__show_formatted__('%GP')[0]
+        return self.__get_detail__('signing_primary_key_fingerprint')
 
     @property
     def signing_key_trust(self) -> str:
         """
         Return primary signing key fingerprint for GPG signed commit
         """
-        return self.__show_formatted__('%GT')[0]
+        return self.__get_detail__('signing_key_trust')
 
     @property
     def signing_signer_name(self) -> str:
         """
         Return author name for GPG signed commit
         """
-        return self.__show_formatted__('%GS')[0]
+        return self.__get_detail__('signing_signer_name')
 
-    def get_change_set(self, revision: str = None) -> 'GitChangeSet':
+    def get_change_set(self, revision: str = None, **kwargs) -> 'GitChangeSet':
         """
         Show changed files between this against specified revision
 
-        If revision is not given compare to self.revision~1
+        If revision is not given compare to self.revision~1. Other arguments are passed
+        to GitRepository.get_change_set.
         """
         if revision is None:
             revision = f'{self.revision}~1'
-        return self.repository.get_change_set(self.revision, revision)
+        return self.repository.get_change_set(self.revision, revision, **kwargs)
 
     def to_dict(self) -> dict:
         """
         Return all properties as dictionary
 
-        This method runs one git command for each property
+        All details including signature fields are loaded with one git command
         """
+        if not self.__signature_loaded__:
+            self.__load_details__(signature=True)
         items = {}
         for prop in self.properties:
             items[prop] = getattr(self, prop)
@@ -1,18 +1,265 @@
 """
 Utility classes for git configuration
+
+Configuration files are parsed without running git commands. Files are read in the
+same order as git reads them: system, global, repository and worktree files followed
+by settings from GIT_CONFIG_COUNT environment variables. Files in include.path and
+matching includeIf.<condition>.path settings are read in place, with the scope of
+the including file. Parsed files are cached by modification time and size.
 """
+import os
+import re
+
 from pathlib import Path
-from typing import Any, List, Optional, Tuple, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from ..exceptions import GitError
+from ..ignore import translate_pattern
+from .refs import get_git_directories, get_head_branch
 from .utils import run_git_command
 
 INCLUDEIF_CONDITIONS = (
     'gitdir',
     'gitdir/i',
+    'hasconfig',
     'onbranch',
 )
 
+DEFAULT_SYSTEM_CONFIG_PATH = '/etc/gitconfig'
+MAX_INCLUDE_DEPTH = 10
+
+RE_CONFIG_NAME = re.compile(r'[A-Za-z][A-Za-z0-9-]*')
+RE_SECTION_NAME = re.compile(r'[A-Za-z0-9.-]+')
+
+CONFIG_VALUE_ESCAPES = {
+    'n': '\n',
+    't': '\t',
+    'b': '\b',
+    '\\': '\\',
+    '"': '"',
+}
+
+# Parsed configuration entries as section, subsection, name and value
+ConfigEntry = Tuple[str, Optional[str], str, str]
+
+__config_file_cache__: Dict[str, Tuple[Tuple[int, int], List[ConfigEntry]]] = {}
+
+
+def get_file_state(path: Union[str, Path]) -> Optional[Tuple[int, int]]:
+    """
+    Get modification time and size of a file, or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def parse_config_value(text: str, index: int) -> Tuple[str, int]:
+    """
+    Parse git configuration value starting at index, returning value and end index
+
+    Whitespace around the value and comments are removed, quotes and escapes are
+    processed and lines ending with backslash are joined
+    """
+    value = []
+    quoted = False
+    comment = False
+    spaces = 0
+    length = len(text)
+    while index < length:
+        character = text[index]
+        index += 1
+        if character == '\n':
+            if quoted:
+                raise GitError('Unterminated quoted git config value')
+            break
+        if comment:
+            continue
+        if character in ' \t\r' and not quoted:
+            if value:
+                spaces += 1
+            continue
+        if character in '#;' and not quoted:
+            comment = True
+            continue
+        if spaces:
+            value.append(' ' * spaces)
+            spaces = 0
+        if character == '\\':
+            if index >= length:
+                break
+            character = text[index]
+            index += 1
+            if character == '\n':
+                continue
+            if character == '\r' and text[index:index + 1] == '\n':
+                index += 1
+                continue
+            try:
+                value.append(CONFIG_VALUE_ESCAPES[character])
+            except KeyError as error:
+                raise GitError(f'Invalid escape in git config value: \\{character}') from error
+        elif character == '"':
+            quoted = not quoted
+        else:
+            value.append(character)
+    if quoted:
+        raise GitError('Unterminated quoted git config value')
+    return ''.join(value), index
+
+
+def parse_section_header(text: str, index: int) -> Tuple[str, Optional[str], int]:
+    """
+    Parse git configuration section header after [, returning section, subsection and
+    end index
+
+    Section names are returned in lower case. Subsections are case sensitive, except
+    in the deprecated [section.subsection] syntax.
+    """
+    match = RE_SECTION_NAME.match(text, index)
+    if not match:
+        raise GitError('Invalid git config section header')
+    name = match.group(0).lower()
+    index = match.end()
+    if text[index:index + 1] == ']':
+        section, _separator, subsection = name.partition('.')
+        return section, subsection if subsection else None, index + 1
+
+    while text[index:index + 1] in (' ', '\t'):
+        index += 1
+    if text[index:index + 1] != '"' or '.' in name:
+        raise GitError(f'Invalid git config section header for {name}')
+    index += 1
+    subsection = []
+    length = len(text)
+    while index < length and text[index] != '"':
+        character = text[index]
+        if character == '\n':
+            break
+        if character == '\\' and index + 1 < length:
+            index += 1
+            character = text[index]
+        subsection.append(character)
+        index += 1
+    if text[index:index + 2] != '"]':
+        raise GitError(f'Invalid git config section header for {name}')
+    return name, ''.join(subsection), index + 2
+
+
+def parse_config(text: str) -> List[ConfigEntry]:
+    """
+    Parse git configuration file contents to list of entries
+
+    Names without value are boolean settings and get value true
+    """
+    entries = []
+    section = None
+    subsection = None
+    index = 0
+    length = len(text)
+    while index < length:
+        character = text[index]
+        if character in ' \t\r\n':
+            index += 1
+        elif character in '#;':
+            end = text.find('\n', index)
+            index = end + 1 if end != -1 else length
+        elif character == '[':
+            section, subsection, index = parse_section_header(text, index + 1)
+        else:
+            match = RE_CONFIG_NAME.match(text, index)
+            if not match or section is None:
+                line = text[index:].split('\n', 1)[0]
+                raise GitError(f'Invalid git config line: {line}')
+            name = match.group(0).lower()
+            index = match.end()
+            while text[index:index + 1] in (' ', '\t'):
+                index += 1
+            if text[index:index + 1] == '=':
+                value, index = parse_config_value(text, index + 1)
+            elif index >= length or text[index] in '\r\n#;':
+                value = 'true'
+                _comment, index = parse_config_value(text, index)
+            else:
+                raise GitError(f'Invalid git config value for {section}.{name}')
+            entries.append((section, subsection, name, value))
+    return entries
+
+
+def load_config_file(path: Union[str, Path]) -> Optional[List[ConfigEntry]]:
+    """
+    Load entries from git configuration file, or None if the file does not exist
+
+    Parsed entries are cached until the file modification time or size changes
+    """
+    path = str(path)
+    state = get_file_state(path)
+    if state is None:
+        return None
+    cached = __config_file_cache__.get(path, None)
+    if cached is not None and cached[0] == state:
+        return cached[1]
+    try:
+        with open(path, 'r', encoding='utf-8', errors='surrogateescape') as filedescriptor:
+            text = filedescriptor.read()
+    except OSError:
+        return None
+    if text.startswith('\ufeff'):
+        text = text[1:]
+    try:
+        entries = parse_config(text)
+    except GitError as error:
+        raise GitError(f'Error parsing git config file {path}: {error}') from error
+    __config_file_cache__[path] = (state, entries)
+    return entries
+
+
+def get_system_config_path() -> Optional[Path]:
+    """
+    Get system git configuration file path from environment or default path
+    """
+    if os.environ.get('GIT_CONFIG_NOSYSTEM', None):
+        return None
+    return Path(os.environ.get('GIT_CONFIG_SYSTEM', DEFAULT_SYSTEM_CONFIG_PATH))
+
+
+def get_global_config_paths() -> List[Path]:
+    """
+    Get global git configuration file paths from environment or default paths
+    """
+    path = os.environ.get('GIT_CONFIG_GLOBAL', None)
+    if path is not None:
+        return [Path(path)] if path else []
+    xdg_config_home = os.environ.get('XDG_CONFIG_HOME', None)
+    if xdg_config_home:
+        xdg_path = Path(xdg_config_home, 'git', 'config')
+    else:
+        xdg_path = Path('~/.config/git/config').expanduser()
+    return [xdg_path, Path('~/.gitconfig').expanduser()]
+
+
+def get_environment_config_entries() -> List[ConfigEntry]:
+    """
+    Get configuration entries from GIT_CONFIG_COUNT, GIT_CONFIG_KEY_<n> and
+    GIT_CONFIG_VALUE_<n> environment variables
+    """
+    try:
+        count = int(os.environ.get('GIT_CONFIG_COUNT', 0))
+    except ValueError as error:
+        raise GitError('Invalid GIT_CONFIG_COUNT environment variable') from error
+    entries = []
+    for index in range(count):
+        key = os.environ.get(f'GIT_CONFIG_KEY_{index}', '')
+        value = os.environ.get(f'GIT_CONFIG_VALUE_{index}', '')
+        section, _separator, name = key.rpartition('.')
+        section, _separator, subsection = section.partition('.')
+        if not section or not name:
+            raise GitError(f'Invalid git config key in GIT_CONFIG_KEY_{index}: {key}')
+        entries.append((section.lower(), subsection if subsection else None, name.lower(), value))
+    return entries
+
 
 def get_section_loader_class(name):
     """
@@ -209,13 +456,19 @@ class GitIncludeConfig(GitConfigSection):
         return super().set(attr, value)
 
 
-# pylint: disable=too-few-public-methods
 class GitConfig(GitConfigSection):
     """
     Git configuration handler base class
+
+    Configuration is loaded from system and global configuration files
     """
+    __config_state__: Optional[List[Tuple[str, Optional[Tuple[int, int]]]]]
+    __settings__: List[GitConfigSetting]
+
     def __init__(self) -> None:
         super().__init__(config=self, parent=None, name='')
+        self.__config_state__ = None
+        self.__settings__ = []
 
     @staticmethod
     def run_git_command(*args, **kwargs) -> List[str]:
@@ -227,29 +480,165 @@ class GitConfig(GitConfigSection):
             args = ['config'] + args
         return run_git_command(*args, cwd=kwargs.get('cwd', None))
 
-    def __load_config__(self) -> List[str]:
+    @property
+    def git_directory(self) -> Optional[Path]:
+        """
+        Return git directory used for includeIf conditions
+        """
+        return None
+
+    @property
+    def settings(self) -> List[GitConfigSetting]:
+        """
+        Return loaded settings in the order they were read, like git config --list
+        """
+        return list(self.__settings__)
+
+    def __get_config_files__(self) -> List[Tuple[str, Path]]:
+        """
+        Get configuration files with scope names in the order they are read
+        """
+        files = []
+        path = get_system_config_path()
+        if path is not None:
+            files.append(('system', path))
+        files.extend(('global', path) for path in get_global_config_paths())
+        return files
+
+    def __match_include_condition__(self,
+                                    condition: str,
+                                    config_path: Path,
+                                    state: List[Tuple[str, Optional[Tuple[int, int]]]]) -> bool:
+        """
+        Check if includeIf condition matches the repository
+
+        Conditions other than gitdir, gitdir/i and onbranch never match
+        """
+        git_directory = self.git_directory
+        if git_directory is None:
+            return False
+        condition, _separator, pattern = condition.partition(':')
+        if condition in ('gitdir', 'gitdir/i'):
+            if pattern.startswith('~/'):
+                pattern = os.path.expanduser(pattern)
+            elif pattern.startswith('./'):
+                pattern = os.path.join(os.path.dirname(config_path), pattern[2:])
+            elif not os.path.isabs(pattern):
+                pattern = f'**/{pattern}'
+            if pattern.endswith('/'):
+                pattern = f'{pattern}**'
+            regex = re.compile(translate_pattern(pattern), re.IGNORECASE if condition == 'gitdir/i' else 0)
+            return any(
+                regex.fullmatch(path)
+                for path in (str(git_directory), os.path.realpath(git_directory))
+            )
+        if condition == 'onbranch':
+            head = git_directory.joinpath('HEAD')
+            state.append((str(head), get_file_state(head)))
+            branch = get_head_branch(git_directory)
+            if branch is None:
+                return False
+            if pattern.endswith('/'):
+                pattern = f'{pattern}**'
+            return re.fullmatch(translate_pattern(pattern), branch) is not None
+        return False
+
+    def __read_config_file__(self,
+                             scope: str,
+                             path: Path,
+                             entries: List[Tuple[str, ConfigEntry]],
+                             state: List[Tuple[str, Optional[Tuple[int, int]]]],
+                             depth: int = 0) -> None:
+        """
+        Read entries from configuration file with included files
+        """
+        state.append((str(path), get_file_state(path)))
+        file_entries = load_config_file(path)
+        if file_entries is None:
+            return
+        for entry in file_entries:
+            entries.append((scope, entry))
+            section, subsection, name, value = entry
+            if name != 'path':
+                continue
+            if section == 'include' and subsection is None:
+                pass
+            elif section != 'includeif' or subsection is None:
+                continue
+            elif not self.__match_include_condition__(subsection, path, state):
+                continue
+            if depth >= MAX_INCLUDE_DEPTH:
+                raise GitError(f'Too deep git config includes in {path}')
+            include_path = Path(value).expanduser()
+            if not include_path.is_absolute():
+                include_path = path.parent.joinpath(include_path)
+            self.__read_config_file__(scope, include_path, entries, state, depth + 1)
+
+    def __load_config__(self) -> Tuple[List[Tuple[str, ConfigEntry]], List]:
+        """
+        Load configuration entries with scope names and state of the read files
+        """
+        entries = []
+        state = []
+        for scope, path in self.__get_config_files__():
+            self.__read_config_file__(scope, path, entries, state)
+        entries.extend(('command', entry) for entry in get_environment_config_entries())
+        state.append(('environment', tuple(sorted(
+            (key, value) for key, value in os.environ.items() if key.startswith('GIT_CONFIG_')
+        ))))
+        return entries, state
+
+    def __is_config_modified__(self) -> bool:
+        """
+        Check if any configuration file read by last load has been modified
         """
-        Load configuration
+        if self.__config_state__ is None:
+            return True
+        for path, value in self.__config_state__:
+            if path == 'environment':
+                current = tuple(sorted(
+                    (key, item) for key, item in os.environ.items() if key.startswith('GIT_CONFIG_')
+                ))
+            else:
+                current = get_file_state(path)
+            if current != value:
+                return True
+        return False
+
+    def __clear_sections__(self) -> None:
         """
-        return self.run_git_command('--show-scope', '--list')
+        Remove loaded configuration sections
+        """
+        for attr, value in list(vars(self).items()):
+            if isinstance(value, GitConfigSection) and value is not self:
+                delattr(self, attr)
 
     def load(self) -> None:
         """
         Load git configuration
+
+        Loading again does nothing unless the configuration files have been modified
         """
-        for line in self.__load_config__():
-            scope, item = line.split(None, 1)
-            key, value = item.split('=', 1)
+        if not self.__is_config_modified__():
+            return
+        entries, state = self.__load_config__()
+        self.__clear_sections__()
+        self.__settings__ = []
+        for scope, (section, subsection, name, value) in entries:
+            path = [section] if subsection is None else [section, subsection]
+            key = '.'.join(path + [name])
             setting = GitConfigSetting(self, scope, key, value)
-            path = setting.key.split('.')[:-1]
-            name = setting.key.split('.')[-1]
-            section = self.__get_or_create_section__(path)
-            section.set(name, setting)
+            self.__get_or_create_section__(path).set(name, setting)
+            self.__settings__.append(setting)
+        self.__config_state__ = state
 
 
 class GitRepositoryConfig(GitConfig):
     """
     Git configuration for a git repository
+
+    Repository configuration and worktree configuration are read after the global
+    configuration files
     """
     repository_path = Path
 
@@ -260,11 +649,30 @@ class GitRepositoryConfig(GitConfig):
     def __repr__(self) -> str:
         return f'{self.repository_path} config'
 
-    def __load_config__(self) -> List[str]:
+    @property
+    def git_directory(self) -> Optional[Path]:
+        """
+        Return git directory for the repository
+        """
+        directories = get_git_directories(self.repository_path)
+        return directories[0] if directories is not None else None
+
+    def __get_config_files__(self) -> List[Tuple[str, Path]]:
         """
-        Load configuration
+        Get configuration files with scope names in the order they are read
+
+        Worktree configuration is read only with extensions.worktreeConfig enabled
         """
-        return self.run_git_command(
-            '--show-scope', '--list',
-            cwd=str(self.repository_path)
-        )
+        files = super().__get_config_files__()
+        directories = get_git_directories(self.repository_path)
+        if directories is None:
+            return files
+        git_directory, common_directory = directories
+        path = common_directory.joinpath('config')
+        files.append(('local', path))
+        for section, subsection, name, value in load_config_file(path) or []:
+            if (section, subsection, name) == ('extensions', None, 'worktreeconfig'):
+                if value.lower() in ('true', 'yes', 'on', '1'):
+                    files.append(('worktree', git_directory.joinpath('config.worktree')))
+                break
+        return files
@@ -0,0 +1,23 @@
+"""
+Configuration for git repository commands
+"""
+from sys_toolkit.configuration.base import ConfigurationSection
+
+from ..constants import DEFAULT_SCAN_CACHE_DIRECTORY
+
+DEFAULT_COMMIT_CACHE_SIZE = 4096
+DEFAULT_CHURN_PERIOD = 'month'
+
+
+class GitConfiguration(ConfigurationSection):
+    """
+    Configuration for git repository commands and caches
+    """
+    __name__ = 'git'
+    __default_settings__ = {
+        'commit_cache_size': DEFAULT_COMMIT_CACHE_SIZE,
+        'commit_cache_persistent': False,
+        'churn_cache_persistent': False,
+        'churn_period': DEFAULT_CHURN_PERIOD,
+        'cache_directory': DEFAULT_SCAN_CACHE_DIRECTORY,
+    }
@@ -0,0 +1,127 @@
+"""
+Content fingerprints of files as git blob object hashes
+
+The fingerprint of a file is the hash git uses for the file contents as a blob
+object, so it is equal for the same contents in the work tree and in any commit.
+Hashes of tracked files not modified in the work tree are read from the git index in
+bulk. Other files are hashed in-process and the hashes are cached by file stat
+details until the file is modified.
+
+Files are hashed as they are in the work tree, without git clean filters or line
+ending conversions.
+"""
+import hashlib
+import os
+import stat
+import threading
+import time
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from ..constants import RACY_MTIME_INTERVAL_NS
+
+DEFAULT_OBJECT_FORMAT = 'sha1'
+
+# Stat details of a file used to detect modified files
+FileState = Tuple[int, int, int, int]
+
+__fingerprint_cache__: Dict[Tuple[str, str], Tuple[FileState, str]] = {}
+__fingerprint_cache_lock__ = threading.Lock()
+
+
+def get_blob_hash(data: bytes, object_format: str = DEFAULT_OBJECT_FORMAT) -> str:
+    """
+    Get git blob object hash for data
+    """
+    digest = hashlib.new(object_format)
+    digest.update(f'blob {len(data)}\0'.encode('ascii'))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def get_file_state(details: os.stat_result) -> FileState:
+    """
+    Get file state used as fingerprint cache key from stat details
+    """
+    return details.st_mtime_ns, details.st_ctime_ns, details.st_size, details.st_ino
+
+
+def is_racy_file_state(details: os.stat_result) -> bool:
+    """
+    Check if file was modified too recently to detect further changes from stat details
+    """
+    return details.st_mtime_ns > time.time_ns() - RACY_MTIME_INTERVAL_NS
+
+
+def store_file_fingerprint(path: Union[str, Path],
+                           details: os.stat_result,
+                           value: str,
+                           object_format: str = DEFAULT_OBJECT_FORMAT) -> None:
+    """
+    Store known fingerprint for a file with stat details read before the fingerprint
+
+    Fingerprints are cached separately for each object format. Fingerprints of files
+    modified within filesystem timestamp resolution are not stored.
+    """
+    if is_racy_file_state(details):
+        return
+    with __fingerprint_cache_lock__:
+        __fingerprint_cache__[(str(path), object_format)] = (get_file_state(details), value)
+
+
+def get_cached_file_fingerprint(path: Union[str, Path],
+                                object_format: str = DEFAULT_OBJECT_FORMAT) -> Optional[str]:
+    """
+    Get cached git blob hash for a file without reading the file
+
+    Returns None if the hash is not cached or the file stat details have changed
+    """
+    path = str(path)
+    try:
+        details = os.lstat(path)
+    except OSError:
+        return None
+    cached = __fingerprint_cache__.get((path, object_format), None)
+    if cached is not None and cached[0] == get_file_state(details):
+        return cached[1]
+    return None
+
+
+def get_file_fingerprint(path: Union[str, Path], object_format: str = DEFAULT_OBJECT_FORMAT) -> Optional[str]:
+    """
+    Get git blob hash for a file or symbolic link in the work tree
+
+    Cached hash is returned if the file stat details have not changed. Returns None if
+    the file does not exist or is not a regular file or symbolic link.
+    """
+    path = str(path)
+    try:
+        details = os.lstat(path)
+    except OSError:
+        return None
+    cached = __fingerprint_cache__.get((path, object_format), None)
+    if cached is not None and cached[0] == get_file_state(details):
+        return cached[1]
+
+    try:
+        if stat.S_ISLNK(details.st_mode):
+            data = os.fsencode(os.readlink(path))
+        elif stat.S_ISREG(details.st_mode):
+            with open(path, 'rb') as filedescriptor:
+                data = filedescriptor.read()
+        else:
+            return None
+    except OSError:
+        return None
+    value = get_blob_hash(data, object_format)
+    store_file_fingerprint(path, details, value, object_format)
+    return value
+
+
+def clear_fingerprint_cache() -> None:
+    """
+    Remove all cached file fingerprints
+    """
+    with __fingerprint_cache_lock__:
+        __fingerprint_cache__.clear()
@@ -0,0 +1,158 @@
+"""
+Resolve git refs by reading the git directory without running git commands
+
+Supports HEAD and refs stored as loose ref files or in packed-refs, symbolic refs,
+linked worktrees with per-worktree HEAD and .git files with gitdir: pointers. Other
+ref storage formats, like reftable, are not supported and resolving returns None,
+in which case git commands should be used instead.
+"""
+import os
+import re
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+GIT_DIRECTORY_NAME = '.git'
+GITDIR_PREFIX = 'gitdir:'
+SYMBOLIC_REF_PREFIX = 'ref:'
+MAX_SYMBOLIC_REF_DEPTH = 5
+
+# Refs stored in the worktree specific git directory instead of the common directory
+WORKTREE_REF_PREFIXES = ('refs/bisect/', 'refs/worktree/', 'refs/rewritten/')
+
+RE_OBJECT_HASH = re.compile(r'^(?:[0-9a-f]{40}|[0-9a-f]{64})$')
+
+__packed_refs_cache__: Dict[str, Tuple[Tuple[int, int], Dict[str, str]]] = {}
+
+
+def read_text_file(path: Union[str, Path]) -> Optional[str]:
+    """
+    Read stripped contents of a small text file, returning None if it can't be read
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as filedescriptor:
+            return filedescriptor.read().strip()
+    except (OSError, ValueError):
+        return None
+
+
+def get_git_directories(path: Union[str, Path]) -> Optional[Tuple[Path, Path]]:
+    """
+    Get git directory and common git directory for a work tree or git directory path
+
+    Path can be a work tree with .git directory or .git file with gitdir: pointer, or a
+    git directory. For linked worktrees the common directory is read from commondir
+    file. Returns None if path is not a git work tree or git directory.
+    """
+    path = Path(path)
+    git_directory = path.joinpath(GIT_DIRECTORY_NAME)
+    if git_directory.is_file():
+        value = read_text_file(git_directory)
+        if value is None or not value.startswith(GITDIR_PREFIX):
+            return None
+        git_directory = path.joinpath(value[len(GITDIR_PREFIX):].strip())
+    elif not git_directory.is_dir():
+        git_directory = path
+    if not git_directory.joinpath('HEAD').is_file():
+        return None
+
+    common_directory = git_directory
+    value = read_text_file(git_directory.joinpath('commondir'))
+    if value:
+        common_directory = git_directory.joinpath(value)
+    return Path(os.path.normpath(git_directory)), Path(os.path.normpath(common_directory))
+
+
+def load_packed_refs(common_directory: Path) -> Dict[str, str]:
+    """
+    Load packed-refs file as dictionary of ref names and object hashes
+
+    Parsed refs are cached until the file modification time or size changes
+    """
+    path = str(common_directory.joinpath('packed-refs'))
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {}
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = __packed_refs_cache__.get(path, None)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    refs = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as filedescriptor:
+            for line in filedescriptor:
+                if line.startswith(('#', '^')):
+                    continue
+                fields = line.split()
+                if len(fields) == 2:
+                    refs[fields[1]] = fields[0]
+    except (OSError, ValueError):
+        return {}
+    __packed_refs_cache__[path] = (key, refs)
+    return refs
+
+
+def has_loose_object(common_directory: Path, object_hash: str) -> bool:
+    """
+    Check if object with full hash is stored as a loose object file
+
+    Objects in pack files or alternate object directories are not found
+    """
+    return common_directory.joinpath('objects', object_hash[:2], object_hash[2:]).is_file()
+
+
+def resolve_ref(git_directory: Path, common_directory: Path, ref: str) -> Optional[str]:
+    """
+    Resolve ref name like HEAD or refs/heads/main to object hash
+
+    Returns None if the ref does not exist, symbolic refs are nested too deep or the
+    refs use unsupported storage
+    """
+    for _depth in range(MAX_SYMBOLIC_REF_DEPTH):
+        if ref == 'HEAD' or ref.startswith(WORKTREE_REF_PREFIXES):
+            directory = git_directory
+        elif ref.startswith('refs/'):
+            directory = common_directory
+        else:
+            return None
+
+        value = read_text_file(directory.joinpath(ref))
+        if value is None and directory == common_directory:
+            value = load_packed_refs(common_directory).get(ref, None)
+        if value is None:
+            return None
+        if value.startswith(SYMBOLIC_REF_PREFIX):
+            ref = value[len(SYMBOLIC_REF_PREFIX):].strip()
+            continue
+        return value if RE_OBJECT_HASH.match(value) else None
+    return None
+
+
+def resolve_head(path: Union[str, Path]) -> Optional[str]:
+    """
+    Resolve HEAD commit hash for a git work tree or git directory
+
+    Returns None if HEAD can't be resolved without git commands, for example in a
+    repository without commits
+    """
+    directories = get_git_directories(path)
+    if directories is None:
+        return None
+    return resolve_ref(*directories, 'HEAD')
+
+
+def get_head_branch(git_directory: Path) -> Optional[str]:
+    """
+    Get branch name checked out in git directory from symbolic HEAD
+
+    Returns None for detached HEAD or if HEAD can't be read
+    """
+    value = read_text_file(git_directory.joinpath('HEAD'))
+    if value is None or not value.startswith(SYMBOLIC_REF_PREFIX):
+        return None
+    ref = value[len(SYMBOLIC_REF_PREFIX):].strip()
+    if not ref.startswith('refs/heads/'):
+        return None
+    return ref[len('refs/heads/'):]
@@ -1,25 +1,69 @@
 """
 Git repository as python class
 """
+import os
+import time
+
 from pathlib import Path
-from typing import List,  Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from ..constants import RACY_MTIME_INTERVAL_NS
 from ..exceptions import GitError
 from ..tree import RepositoryTree
 
+from .batch import GitObjectReader
+from .cache import GitCommitCache
 from .changeset import GitChangeSet
-from .commit import GitCommit
-from .config import GitRepositoryConfig
-from .utils import detect_git_repository_path, run_git_command
+from .churn import GitChurnEngine
+from .commit import COMMIT_FIELDS, GitCommit, get_commit_format, iter_commit_details
+from .config import GitRepositoryConfig, load_config_file
+from .fingerprint import (
+    DEFAULT_OBJECT_FORMAT,
+    get_cached_file_fingerprint,
+    get_file_fingerprint,
+    store_file_fingerprint,
+)
+from .refs import RE_OBJECT_HASH, get_git_directories, has_loose_object, resolve_ref
+from .utils import (
+    detect_git_repository_path,
+    iter_git_command_records,
+    run_git_command,
+    run_git_command_records,
+)
+
+
+# git ls-files -t tags for files missing from the work tree: removed and skip-worktree
+LS_FILES_MISSING_TAGS = ('R', 'S')
+# git ls-files -t tags for files with contents different from the index: modified and unmerged
+LS_FILES_MODIFIED_TAGS = ('C', 'M')
+# git index entry mode for submodules
+SUBMODULE_MODE = '160000'
+
+
+def is_racy_refs_state(state: Tuple) -> bool:
+    """
+    Check if any modification time in refs state is too recent to detect further changes
+    """
+    limit = time.time_ns() - RACY_MTIME_INTERVAL_NS
+    for item in state:
+        mtime = item[1] if isinstance(item, tuple) else item
+        if mtime is not None and mtime > limit:
+            return True
+    return False
 
 
 class GitRepository(RepositoryTree):
     """
     Abstraction of git repository checkout details for specified path
     """
-    is_git_directory: bool
-    config: GitRepositoryConfig
-    __commits_detected__: bool
+    is_git_directory: bool = False
+    config: Optional[GitRepositoryConfig] = None
+    __commits_detected__: Optional[bool] = False
+    __refs_state__: Optional[Tuple] = None
+    __head_state__: Optional[Tuple] = None
+    __head_revision__: Optional[str] = None
+    __object_reader__: Optional[GitObjectReader] = None
+    __object_format__: Optional[str] = None
 
     # pylint: disable=redefined-builtin
     def __new__(cls,
@@ -35,15 +79,41 @@ class GitRepository(RepositoryTree):
         if git_repository_path is not None:
             path = git_repository_path
 
+        instance = super().__new__(cls, path, name, create_missing, sorted, mode, excluded, configuration)
         if git_repository_path:
-            cls.is_git_directory = True
-            cls.__commits_detected__ = None
-            cls.config = GitRepositoryConfig(git_repository_path)
+            instance.is_git_directory = True
+            instance.__commits_detected__ = None
+            instance.config = GitRepositoryConfig(git_repository_path)
         else:
-            cls.is_git_directory = False
-            cls.__commits_detected__ = False
-            cls.config = None
-        return super().__new__(cls, path, name, create_missing, sorted, mode, excluded, configuration)
+            instance.is_git_directory = False
+            instance.__commits_detected__ = False
+            instance.config = None
+        return instance
+
+    def __get_refs_state__(self) -> Optional[Tuple]:
+        """
+        Return modification times of HEAD, packed-refs and directories with loose refs
+
+        git updates HEAD and refs by renaming lock files, so the state changes whenever
+        any ref is created, updated or removed. Returns None if the git directory can't
+        be read.
+        """
+        directories = get_git_directories(self)
+        if directories is None:
+            return None
+        git_directory, common_directory = directories
+        state = []
+        try:
+            for path in (git_directory.joinpath('HEAD'), common_directory.joinpath('packed-refs')):
+                try:
+                    state.append(os.stat(path).st_mtime_ns)
+                except FileNotFoundError:
+                    state.append(None)
+            for directory, _directories, _filenames in os.walk(common_directory.joinpath('refs')):
+                state.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            return None
+        return tuple(state)
 
     @property
     def has_commits(self) -> bool:
@@ -52,12 +122,23 @@ class GitRepository(RepositoryTree):
 
         This is used to avoid running git commands until there are commits
         to avoid script exceptions from self.run_git_command
+
+        Commits are detected without git commands if HEAD can be resolved from the git
+        directory. Detected commits are cached in the object. A repository without
+        commits is checked again with git only when HEAD or refs have been modified.
         """
         if not self.is_git_directory:
             return False
         if self.__commits_detected__:
             return True
+        if self.resolve_revision('HEAD') is not None:
+            self.__commits_detected__ = True
+            return True
+        state = self.__get_refs_state__()
+        if state is not None and state == self.__refs_state__:
+            return False
         lines = run_git_command(*['rev-list', '-n1', '--all'], cwd=self)
+        self.__refs_state__ = state
         if lines:
             self.__commits_detected__ = True
             return True
@@ -77,10 +158,72 @@ class GitRepository(RepositoryTree):
     def reflog(self) -> List[GitCommit]:
         """
         Return git reflog items as GitCommit objects
+
+        Commit details are loaded with the reflog in a single git command
+        """
+        self.validate()
+        records = iter_git_command_records(
+            'reflog', 'show', '-z', '--no-notes', f'--format={get_commit_format(COMMIT_FIELDS)}',
+            cwd=self
+        )
+        return [
+            GitCommit(self, details['commit_hash'], details=details)
+            for details in iter_commit_details(records)
+        ]
+
+    @property
+    def commit_cache(self) -> GitCommitCache:
+        """
+        Return commit details cache shared by all objects for this repository
+        """
+        return GitCommitCache.for_repository(self)
+
+    @property
+    def object_format(self) -> str:
+        """
+        Return object hash algorithm of the repository, sha1 or sha256
+        """
+        if self.__object_format__ is None:
+            object_format = DEFAULT_OBJECT_FORMAT
+            directories = get_git_directories(self) if self.is_git_directory else None
+            if directories is not None:
+                for section, subsection, name, value in load_config_file(directories[1].joinpath('config')) or []:
+                    if (section, subsection, name) == ('extensions', None, 'objectformat'):
+                        object_format = value.lower()
+            self.__object_format__ = object_format
+        return self.__object_format__
+
+    @property
+    def churn(self) -> GitChurnEngine:
+        """
+        Return churn statistics engine shared by all objects for this repository
+
+        Statistics are updated to new commits with churn.update()
+        """
+        return GitChurnEngine.for_repository(self)
+
+    @property
+    def object_reader(self) -> GitObjectReader:
+        """
+        Return reader for git objects using persistent git cat-file processes
+
+        The processes are started on first lookup and stopped with close()
         """
         self.validate()
-        lines = run_git_command(*['reflog', 'show', '--format=%H'], cwd=self)
-        return [GitCommit(self, ref) for ref in lines]
+        if self.__object_reader__ is None:
+            self.__object_reader__ = GitObjectReader(self)
+        return self.__object_reader__
+
+    def close(self) -> None:
+        """
+        Stop persistent git processes started for the repository and save persistent
+        commit cache and churn statistics
+        """
+        if self.__object_reader__ is not None:
+            self.__object_reader__.close()
+        self.commit_cache.save()
+        if str(self) in GitChurnEngine.__instances__:
+            self.churn.save()
 
     def validate(self) -> None:
         """
@@ -102,17 +245,181 @@ class GitRepository(RepositoryTree):
             raise GitError(f'Repository has no commits: {self}')
         return run_git_command(*args, cwd=self)
 
+    def iter_commits(self,
+                     revision_range: str = 'HEAD',
+                     paths: Optional[Iterable[Union[str, Path]]] = None,
+                     max_count: Optional[int] = None) -> Iterator[GitCommit]:
+        """
+        Iterate commits in revision range, newest first, with details loaded
+
+        Commits are streamed from a single git log process, so memory use does not depend
+        on the number of commits. Paths limit the commits to those changing the paths.
+        Signature details are loaded separately for each commit when requested.
+        """
+        self.validate()
+        if not self.has_commits:
+            raise GitError(f'Repository has no commits: {self}')
+        args = ['log', '-z', '--no-notes', f'--format={get_commit_format(COMMIT_FIELDS)}']
+        if max_count is not None:
+            args.append(f'--max-count={max_count}')
+        args.append(revision_range)
+        args.append('--')
+        if paths:
+            args.extend(str(path) for path in paths)
+        for details in iter_commit_details(iter_git_command_records(*args, cwd=self)):
+            yield GitCommit(self, details['commit_hash'], details=details)
+
+    def run_git_command_records(self, *args) -> List[str]:
+        """
+        Run a git command with NUL separated output, returning stdout records
+
+        Command is always executed in the repository directory
+        """
+        self.validate()
+        if not self.has_commits:
+            raise GitError(f'Repository has no commits: {self}')
+        return run_git_command_records(*args, cwd=self)
+
+    def list_files(self,
+                   directory: Optional[Union[str, Path]] = None,
+                   paths: Optional[Iterable[str]] = None,
+                   untracked: bool = False) -> List[str]:
+        """
+        List files in the git index with a single git ls-files command
+
+        Paths are returned relative to directory, which defaults to the repository root,
+        and only files under the directory are listed. Tracked files missing from the work
+        tree are skipped. With untracked set, untracked files not ignored by .gitignore
+        rules are included. Works also in repositories without commits.
+        """
+        self.validate()
+        args = ['ls-files', '-z', '-t', '--cached', '--deleted']
+        if untracked:
+            args.extend(['--others', '--exclude-standard'])
+        if paths:
+            args.append('--')
+            args.extend(str(path) for path in paths)
+        cwd = Path(directory) if directory is not None else self
+
+        files = {}
+        missing = set()
+        for record in run_git_command_records(*args, cwd=cwd):
+            tag, path = record[:1], record[2:]
+            if tag in LS_FILES_MISSING_TAGS:
+                missing.add(path)
+            else:
+                files[path] = None
+        return [path for path in files if path not in missing]
+
+    def get_file_fingerprints(self,
+                              directory: Optional[Union[str, Path]] = None,
+                              paths: Optional[Iterable[str]] = None,
+                              hash_modified: bool = True) -> Dict[Path, str]:
+        """
+        Get git blob hashes for tracked files with a single git ls-files command
+
+        Hashes of files not modified in the work tree are read from the git index and
+        cached by file stat details. Modified and unmerged files are hashed in-process,
+        or with hash_modified False only returned if their hashes are already cached.
+        Returns dictionary of file paths under directory, which defaults to repository
+        root, and blob hashes. Files missing from the work tree and submodules are skipped.
+        """
+        self.validate()
+        args = ['ls-files', '-z', '-s', '-t', '--cached', '--modified', '--deleted']
+        if paths:
+            args.append('--')
+            args.extend(str(path) for path in paths)
+        cwd = Path(os.path.abspath(directory if directory is not None else self))
+
+        hashes = {}
+        missing = set()
+        for record in run_git_command_records(*args, cwd=cwd):
+            tag = record[:1]
+            info, _separator, path = record[2:].partition('\t')
+            mode, object_hash, _stage = info.split(' ', 2)
+            if tag in LS_FILES_MISSING_TAGS:
+                missing.add(path)
+            elif mode == SUBMODULE_MODE or path in missing:
+                continue
+            elif tag in LS_FILES_MODIFIED_TAGS:
+                hashes[path] = None
+            else:
+                hashes.setdefault(path, object_hash)
+
+        object_format = self.object_format
+        fingerprints = {}
+        for path, object_hash in hashes.items():
+            if path in missing:
+                continue
+            path = cwd.joinpath(path)
+            if object_hash is None:
+                if hash_modified:
+                    object_hash = get_file_fingerprint(path, object_format)
+                else:
+                    object_hash = get_cached_file_fingerprint(path, object_format)
+                if object_hash is not None:
+                    fingerprints[path] = object_hash
+                continue
+            try:
+                details = os.lstat(path)
+            except OSError:
+                continue
+            store_file_fingerprint(path, details, object_hash, object_format)
+            fingerprints[path] = object_hash
+        return fingerprints
+
+    def __get_head_revision__(self) -> str:
+        """
+        Get HEAD commit hash with git, caching the value until HEAD or refs are modified
+        """
+        state = self.__get_refs_state__()
+        if state is not None and state == self.__head_state__:
+            return self.__head_revision__
+        value = self.head.commit_hash
+        if state is not None and not is_racy_refs_state(state):
+            self.__head_state__ = state
+            self.__head_revision__ = value
+        return value
+
     def get_revision(self, characters: Optional[str] = None) -> str:
         """
         Get git revision for current branch HEAD
 
         If characters is specified return first <characters> letters
+
+        HEAD is resolved by reading the git directory if possible. Otherwise the revision
+        is loaded with git and cached until HEAD or refs are modified. Refs modified
+        within the filesystem timestamp resolution are not cached.
         """
-        value = self.head.commit_hash
+        value = self.resolve_revision('HEAD')
+        if value is None:
+            value = self.__get_head_revision__()
         if characters is not None:
             return value[:characters]
         return value
 
+    def resolve_revision(self, revision: str) -> Optional[str]:
+        """
+        Resolve HEAD, full ref name or full commit hash to commit hash without git commands
+
+        Returns None if revision is some other revision expression or can't be resolved
+        by reading the git directory. Short names are not resolved, because they would
+        require the ambiguity checks done by git. Full hashes are returned only if the
+        object exists as a loose object, so hashes of packed or missing objects must be
+        checked with git commands.
+        """
+        if not self.is_git_directory:
+            return None
+        is_object_hash = RE_OBJECT_HASH.match(revision) is not None
+        if not is_object_hash and revision != 'HEAD' and not revision.startswith('refs/heads/'):
+            return None
+        directories = get_git_directories(self)
+        if directories is None:
+            return None
+        if is_object_hash:
+            return revision if has_loose_object(directories[1], revision) else None
+        return resolve_ref(*directories, revision)
+
     def get_commit(self, reference: str) -> str:
         """
         Get GitCommit object for specified git reference
@@ -124,11 +431,37 @@ class GitRepository(RepositoryTree):
             raise GitError(f'Repository has no commits: {self}')
         return GitCommit(self, reference)
 
-    def get_change_set(self, start_revision: str, end_revision: str) -> GitChangeSet:
+    def read_commit(self, reference: str) -> GitCommit:
+        """
+        Get GitCommit object for git reference with details read from the commit object
+
+        Details are read with the persistent git cat-file process from object_reader
+        instead of running git show. Ref names and signature details are loaded with
+        git show when requested.
+        """
+        details = self.object_reader.read_commit(reference)
+        if details is None:
+            raise GitError(f'No such commit in {self}: {reference}')
+        return GitCommit(self, details['commit_hash'], details=details)
+
+    def get_change_set(self,
+                       start_revision: str,
+                       end_revision: str,
+                       paths: Optional[Iterable[Union[str, Path]]] = None,
+                       find_renames: bool = False,
+                       find_copies: bool = False) -> GitChangeSet:
         """
         Show changed files between two change
 
-        If revision is not given compare to self.reference~1
+        If revision is not given compare to self.reference~1. Paths limit the changes
+        to matching paths, with the filtering done by git.
         """
         self.validate()
-        return GitChangeSet(self, start_revision, end_revision)
+        return GitChangeSet(
+            self,
+            start_revision,
+            end_revision,
+            paths=paths,
+            find_renames=find_renames,
+            find_copies=find_copies,
+        )
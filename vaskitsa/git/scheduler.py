@@ -0,0 +1,314 @@
+"""
+Concurrent git operations in many repositories
+
+GitScheduler runs queued operations for many git repositories concurrently with
+asyncio. Git commands are run as asyncio subprocesses and python functions taking
+the repository as argument are run in worker threads. The number of operations
+running at the same time is limited globally, and operations for the same repository
+are run one at a time in the order they were added.
+
+Each operation returns a GitOperationResult with the parsed value or the error, so
+failures in one repository do not stop operations in other repositories.
+"""
+import asyncio
+import os
+import time
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from ..exceptions import GitError
+from .changeset import get_change_set_command, iter_change_records
+from .repository import GitRepository
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def parse_command_lines(stdout: bytes) -> List[str]:
+    """
+    Parse git command output to list of lines
+    """
+    return os.fsdecode(stdout).splitlines()
+
+
+def parse_command_records(stdout: bytes) -> List[str]:
+    """
+    Parse NUL separated git command output to list of records
+    """
+    records = stdout.split(b'\0')
+    if records and records[-1] == b'':
+        records.pop()
+    return [os.fsdecode(record) for record in records]
+
+
+class GitOperation:
+    """
+    Git command or python function to run for a repository
+    """
+    repository: GitRepository
+    name: str
+    args: Optional[Tuple[str]]
+    function: Optional[Callable[[GitRepository], Any]]
+    parser: Callable[[bytes], Any]
+
+    def __init__(self,
+                 repository: GitRepository,
+                 name: str,
+                 args: Optional[Tuple[str]] = None,
+                 function: Optional[Callable[[GitRepository], Any]] = None,
+                 parser: Optional[Callable[[bytes], Any]] = None) -> None:
+        self.repository = repository
+        self.name = name
+        self.args = args
+        self.function = function
+        self.parser = parser if parser is not None else parse_command_lines
+
+    def __repr__(self) -> str:
+        return f'{self.repository} {self.name}'
+
+    async def __run_command__(self) -> Any:
+        """
+        Run git command as asyncio subprocess and parse the output
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'git', *self.args,
+                cwd=str(self.repository),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError as error:
+            raise GitError(f'Error running git {" ".join(self.args)}: {error}') from error
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            message = os.fsdecode(stderr).strip()
+            raise GitError(f'Error running git {" ".join(self.args)}: returns {process.returncode}: {message}')
+        return self.parser(stdout)
+
+    async def run(self) -> Any:
+        """
+        Run the operation, returning parsed command output or function return value
+        """
+        self.repository.validate()
+        if self.function is not None:
+            return await asyncio.to_thread(self.function, self.repository)
+        return await self.__run_command__()
+
+
+class GitOperationResult:
+    """
+    Result of a git operation with value or error and timing
+    """
+    operation: GitOperation
+    value: Any
+    error: Optional[Exception]
+    started: Optional[float]
+    finished: Optional[float]
+
+    def __init__(self, operation: GitOperation) -> None:
+        self.operation = operation
+        self.value = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    def __repr__(self) -> str:
+        status = 'ok' if self.ok else f'error {self.error}'
+        return f'{self.operation} {status}'
+
+    @property
+    def repository(self) -> GitRepository:
+        """
+        Return repository of the operation
+        """
+        return self.operation.repository
+
+    @property
+    def name(self) -> str:
+        """
+        Return name of the operation
+        """
+        return self.operation.name
+
+    @property
+    def ok(self) -> bool:
+        """
+        Check if the operation was run without errors
+        """
+        return self.started is not None and self.error is None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """
+        Return operation run time in seconds, or None if the operation was not run
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def to_dict(self) -> dict:
+        """
+        Return result as dictionary
+        """
+        return {
+            'repository': str(self.repository),
+            'name': self.name,
+            'ok': self.ok,
+            'value': self.value,
+            'error': str(self.error) if self.error is not None else None,
+            'duration': self.duration,
+        }
+
+
+class GitScheduler:
+    """
+    Run git operations in many repositories concurrently
+
+    With stop_on_error set, operations for a repository are skipped after an operation
+    for the same repository fails
+    """
+    max_concurrency: int
+    stop_on_error: bool
+    operations: List[GitOperation]
+
+    def __init__(self,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 stop_on_error: bool = False) -> None:
+        if max_concurrency < 1:
+            raise ValueError('GitScheduler max_concurrency must be at least 1')
+        self.max_concurrency = max_concurrency
+        self.stop_on_error = stop_on_error
+        self.operations = []
+        self.__repositories__: Dict[str, GitRepository] = {}
+
+    def __repr__(self) -> str:
+        return f'git scheduler {len(self.operations)} operations'
+
+    def __get_repository__(self, repository: Union[str, Path, GitRepository]) -> GitRepository:
+        """
+        Get repository object for path, reusing objects for same repository path
+        """
+        if not isinstance(repository, GitRepository):
+            repository = GitRepository(repository)
+        return self.__repositories__.setdefault(str(repository), repository)
+
+    def add_command(self,
+                    repository: Union[str, Path, GitRepository],
+                    *args: str,
+                    name: Optional[str] = None,
+                    parser: Optional[Callable[[bytes], Any]] = None) -> GitOperation:
+        """
+        Add git command to run in repository
+
+        Output is parsed to list of lines unless a parser for the output bytes is given
+        """
+        operation = GitOperation(
+            self.__get_repository__(repository),
+            name if name is not None else ' '.join(args),
+            args=tuple(str(arg) for arg in args),
+            parser=parser,
+        )
+        self.operations.append(operation)
+        return operation
+
+    def add_function(self,
+                     repository: Union[str, Path, GitRepository],
+                     function: Callable[[GitRepository], Any],
+                     name: Optional[str] = None) -> GitOperation:
+        """
+        Add python function called with the repository object in a worker thread
+        """
+        operation = GitOperation(
+            self.__get_repository__(repository),
+            name if name is not None else getattr(function, '__name__', 'function'),
+            function=function,
+        )
+        self.operations.append(operation)
+        return operation
+
+    def add_revision(self, repository: Union[str, Path, GitRepository]) -> GitOperation:
+        """
+        Add lookup of HEAD commit hash, resolved from the git directory when possible
+        """
+        return self.add_function(repository, lambda item: item.get_revision(), name='revision')
+
+    def add_change_set(self,
+                       repository: Union[str, Path, GitRepository],
+                       start_revision: str,
+                       end_revision: str,
+                       paths: Optional[List[Union[str, Path]]] = None,
+                       find_renames: bool = False,
+                       find_copies: bool = False) -> GitOperation:
+        """
+        Add change set between revisions, returning list of GitChange objects
+        """
+        return self.add_command(
+            repository,
+            *get_change_set_command(
+                start_revision,
+                end_revision,
+                paths=paths,
+                find_renames=find_renames,
+                find_copies=find_copies,
+            ),
+            name=f'change set {start_revision}..{end_revision}',
+            parser=lambda stdout: list(iter_change_records(parse_command_records(stdout))),
+        )
+
+    def add_config(self, repository: Union[str, Path, GitRepository]) -> GitOperation:
+        """
+        Add loading repository git configuration, returning list of loaded settings
+        """
+        def load_config(item: GitRepository) -> list:
+            item.config.load()
+            return item.config.settings
+        return self.add_function(repository, load_config, name='config')
+
+    async def __run_repository__(self,
+                                 operations: List[GitOperation],
+                                 results: Dict[int, GitOperationResult],
+                                 semaphore: asyncio.Semaphore) -> None:
+        """
+        Run operations for one repository in order
+        """
+        failed = False
+        for operation in operations:
+            result = results[id(operation)]
+            if failed and self.stop_on_error:
+                result.error = GitError(f'Skipped after previous error in {operation.repository}')
+                continue
+            async with semaphore:
+                result.started = time.monotonic()
+                try:
+                    result.value = await operation.run()
+                except Exception as error:  # pylint: disable=broad-except
+                    result.error = error
+                    failed = True
+                result.finished = time.monotonic()
+
+    async def run_async(self) -> List[GitOperationResult]:
+        """
+        Run queued operations in the running event loop, returning results in the order
+        the operations were added
+
+        Queued operations are removed from the scheduler
+        """
+        operations = self.operations
+        self.operations = []
+        results = {id(operation): GitOperationResult(operation) for operation in operations}
+        repositories: Dict[str, List[GitOperation]] = {}
+        for operation in operations:
+            repositories.setdefault(str(operation.repository), []).append(operation)
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        await asyncio.gather(*[
+            self.__run_repository__(items, results, semaphore)
+            for items in repositories.values()
+        ])
+        return [results[id(operation)] for operation in operations]
+
+    def run(self) -> List[GitOperationResult]:
+        """
+        Run queued operations, returning results in the order the operations were added
+        """
+        return asyncio.run(self.run_async())
@@ -2,31 +2,103 @@
 Run git command
 """
 import os
+import stat
+import subprocess
+import tempfile
+import threading
 
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 
 from sys_toolkit.exceptions import CommandError
-from sys_toolkit.subprocess import run_command_lineoutput
+from sys_toolkit.subprocess import run_command, run_command_lineoutput
 
 from ..exceptions import GitError
+from .refs import GIT_DIRECTORY_NAME, GITDIR_PREFIX, read_text_file
+
+STREAM_READ_SIZE = 65536
+
+__repository_path_cache__: Dict[str, Path] = {}
+__repository_path_cache_lock__ = threading.Lock()
+
+
+def is_git_work_tree_root(directory: str) -> bool:
+    """
+    Check if directory has .git directory, or .git file with gitdir: pointer to an
+    existing git directory as in linked worktrees and submodules
+    """
+    path = os.path.join(directory, GIT_DIRECTORY_NAME)
+    try:
+        details = os.stat(path)
+    except OSError:
+        return False
+    if stat.S_ISDIR(details.st_mode):
+        return True
+    if not stat.S_ISREG(details.st_mode):
+        return False
+    value = read_text_file(path)
+    if value is None or not value.startswith(GITDIR_PREFIX):
+        return False
+    return os.path.isdir(os.path.join(directory, value[len(GITDIR_PREFIX):].strip()))
+
+
+def clear_git_repository_path_cache() -> None:
+    """
+    Clear cached git repository paths detected by detect_git_repository_path()
+    """
+    with __repository_path_cache_lock__:
+        __repository_path_cache__.clear()
 
 
 def detect_git_repository_path(directory: Optional[str] = None) -> Optional[Path]:
     """
-    Detect git repository path by .git directory
+    Detect git repository work tree root for a directory
+
+    The work tree root is the closest parent directory with .git directory or .git file
+    pointing to the git directory. With GIT_DIR environment variable the work tree is
+    GIT_WORK_TREE or the directory itself, as git commands run in the directory would
+    use them.
+
+    Detected paths are cached for the directory and all directories between it and the
+    work tree root, so detecting the repository again for any of them does not access
+    the filesystem. Directories outside git repositories are not cached, because a
+    repository may be created in them later.
     """
     if directory is not None:
-        directory = Path(directory).expanduser()
+        directory = os.path.abspath(os.path.expanduser(str(directory)))
     else:
-        directory = Path(os.getcwd())
+        directory = os.getcwd()
+
+    git_directory = os.environ.get('GIT_DIR', None)
+    if git_directory:
+        if not os.path.isfile(os.path.join(os.path.abspath(git_directory), 'HEAD')):
+            return None
+        return Path(os.path.abspath(os.environ.get('GIT_WORK_TREE', None) or directory))
 
-    directory = directory.absolute()
-    while directory.parent != directory:
-        if directory.joinpath('.git').is_dir():
-            return directory
-        directory = directory.parent
-    return None
+    cached = __repository_path_cache__.get(directory, None)
+    if cached is not None:
+        return cached
+
+    visited = []
+    path = directory
+    while True:
+        cached = __repository_path_cache__.get(path, None)
+        if cached is not None:
+            root = cached
+            break
+        visited.append(path)
+        if is_git_work_tree_root(path):
+            root = Path(path)
+            break
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+    with __repository_path_cache_lock__:
+        for path in visited:
+            __repository_path_cache__[path] = root
+    return root
 
 
 def run_git_command(*args, **kwargs) -> List[str]:
@@ -50,3 +122,73 @@ def run_git_command(*args, **kwargs) -> List[str]:
     if stderr:
         print(stderr)
     return stdout
+
+
+def run_git_command_records(*args, **kwargs) -> List[str]:
+    """
+    Run a git command with NUL separated output, returning stdout records
+
+    Use with git commands with -z flag to parse paths with any characters. Current
+    work directory for command can be specified with cwd=<path> in kwargs.
+    """
+    cwd = kwargs.pop('cwd', None)
+    if cwd is None:
+        cwd = os.getcwd()
+
+    cmd = ['git'] + list(args)
+    try:
+        stdout, stderr = run_command(*cmd, cwd=cwd)
+    except CommandError as error:
+        raise GitError(error) from error
+    if stderr:
+        print(os.fsdecode(stderr))
+    records = stdout.split(b'\0')
+    if records and records[-1] == b'':
+        records.pop()
+    return [os.fsdecode(record) for record in records]
+
+
+def iter_git_command_records(*args, **kwargs) -> Iterator[str]:
+    """
+    Run a git command with NUL separated output, yielding stdout records as they are read
+
+    Output is read in chunks, so memory use does not depend on the size of the output.
+    If the iterator is closed before the command finishes, the command is terminated.
+    Raises GitError after the last record if the command fails. Current work directory
+    for command can be specified with cwd=<path> in kwargs.
+    """
+    cwd = kwargs.pop('cwd', None)
+    if cwd is None:
+        cwd = os.getcwd()
+    if not os.path.isdir(cwd):
+        raise GitError(f'No such directory: {cwd}')
+
+    cmd = ['git'] + list(args)
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            # pylint: disable=consider-using-with
+            process = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=stderr)
+        except OSError as error:
+            raise GitError(f'Error running {" ".join(cmd)}: {error}') from error
+        try:
+            buffer = b''
+            while True:
+                chunk = process.stdout.read1(STREAM_READ_SIZE)
+                if not chunk:
+                    break
+                records = (buffer + chunk).split(b'\0')
+                buffer = records.pop()
+                for record in records:
+                    yield os.fsdecode(record)
+            if buffer:
+                yield os.fsdecode(buffer)
+            returncode = process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+        if returncode != 0:
+            stderr.seek(0)
+            message = os.fsdecode(stderr.read()).strip()
+            raise GitError(f'Error running {" ".join(cmd)}: returns {returncode}: {message}')
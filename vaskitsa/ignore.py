@@ -0,0 +1,224 @@
+"""
+Compiled matcher for ignored file and directory patterns
+
+Patterns use .gitignore syntax:
+
+- blank lines and lines starting with # are skipped
+- a pattern starting with ! negates the pattern, and the last matching pattern wins
+- a pattern ending with / matches only directories
+- a pattern with / at the start or in the middle is matched against the path relative
+  to the tree root, other patterns are matched against the name at any level
+- * and ? do not match /, ** matches any number of directories and [] matches a set
+- backslash escapes the next character
+
+Consecutive patterns with same negation state are compiled to a set of literal
+names and a combined regular expression, so a path is checked against all the
+patterns with a few lookups instead of matching each pattern separately.
+"""
+import re
+
+from typing import Iterable, List, Tuple
+
+GLOB_CHARACTERS = ('*', '?', '[', '\\')
+
+
+def translate_segment(segment: str) -> str:
+    """
+    Translate glob pattern path segment to regular expression
+    """
+    regex = []
+    index = 0
+    length = len(segment)
+    while index < length:
+        character = segment[index]
+        index += 1
+        if character == '\\' and index < length:
+            regex.append(re.escape(segment[index]))
+            index += 1
+        elif character == '*':
+            while index < length and segment[index] == '*':
+                index += 1
+            regex.append('[^/]*')
+        elif character == '?':
+            regex.append('[^/]')
+        elif character == '[':
+            end = index
+            if end < length and segment[end] in '!^':
+                end += 1
+            if end < length and segment[end] == ']':
+                end += 1
+            while end < length and segment[end] != ']':
+                end += 1
+            if end >= length:
+                regex.append('\\[')
+                continue
+            content = segment[index:end].replace('\\', '\\\\')
+            content = re.sub(r'([&~|\[])', r'\\\1', content)
+            index = end + 1
+            if content[0] in '!^':
+                content = f'^{content[1:]}'
+            regex.append(f'[{content}]')
+        else:
+            regex.append(re.escape(character))
+    return ''.join(regex)
+
+
+def translate_pattern(pattern: str) -> str:
+    """
+    Translate glob pattern matched against a path to regular expression
+    """
+    segments = pattern.split('/')
+    regex = []
+    for index, segment in enumerate(segments):
+        last = index == len(segments) - 1
+        if segment == '**':
+            regex.append('.+' if last else '(?:.+/)?')
+            continue
+        regex.append(translate_segment(segment))
+        if not last:
+            regex.append('/')
+    return ''.join(regex)
+
+
+class IgnorePattern:
+    """
+    Parsed ignore pattern
+    """
+    pattern: str
+    negated: bool
+    directory_only: bool
+    anchored: bool
+    literal: bool
+
+    def __init__(self, line: str) -> None:
+        self.negated = line.startswith('!')
+        if self.negated:
+            line = line[1:]
+        self.directory_only = line.endswith('/')
+        line = line.rstrip('/')
+        self.anchored = '/' in line
+        self.pattern = line.lstrip('/')
+        self.literal = not any(character in self.pattern for character in GLOB_CHARACTERS)
+
+    def __repr__(self) -> str:
+        return self.pattern
+
+    @property
+    def regex(self) -> str:
+        """
+        Return regular expression for the pattern
+        """
+        if self.anchored:
+            return translate_pattern(self.pattern)
+        return translate_segment(self.pattern)
+
+
+class IgnorePatternGroup:
+    """
+    Compiled group of consecutive patterns with same negation state
+
+    Patterns are split to matchers by match target, and directory only patterns to
+    separate matchers only used for directories
+    """
+    negated: bool
+
+    def __init__(self, negated: bool, patterns: List[IgnorePattern]) -> None:
+        self.negated = negated
+        self.__names__ = ({}, {})
+        self.__name_regex__ = self.__compile__(
+            patterns,
+            lambda pattern: not pattern.anchored and not pattern.literal
+        )
+        self.__path_regex__ = self.__compile__(patterns, lambda pattern: pattern.anchored)
+        for pattern in patterns:
+            if pattern.literal and not pattern.anchored:
+                for is_directory in (True, False):
+                    if is_directory or not pattern.directory_only:
+                        self.__names__[is_directory][pattern.pattern] = pattern
+
+    @staticmethod
+    def __compile__(patterns: List[IgnorePattern], condition) -> Tuple:
+        """
+        Compile combined regular expressions for files and directories matching condition
+
+        Returns tuple of compiled expressions or None for files and directories
+        """
+        compiled = []
+        for is_directory in (False, True):
+            expressions = [
+                pattern.regex
+                for pattern in patterns
+                if condition(pattern) and (is_directory or not pattern.directory_only)
+            ]
+            compiled.append(re.compile('|'.join(expressions)) if expressions else None)
+        return tuple(compiled)
+
+    def match(self, path: str, name: str, is_directory: bool) -> bool:
+        """
+        Check if relative path with specified name matches any pattern in the group
+        """
+        if name in self.__names__[is_directory]:
+            return True
+        regex = self.__name_regex__[is_directory]
+        if regex is not None and regex.fullmatch(name):
+            return True
+        regex = self.__path_regex__[is_directory]
+        return regex is not None and regex.fullmatch(path) is not None
+
+
+class IgnorePatterns:
+    """
+    Matcher for list of ignore patterns with .gitignore semantics
+    """
+    patterns: List[IgnorePattern]
+    groups: List[IgnorePatternGroup]
+
+    def __init__(self, lines: Iterable[str]) -> None:
+        self.patterns = []
+        for line in lines:
+            line = self.__strip_line__(line)
+            if line and not line.startswith('#'):
+                self.patterns.append(IgnorePattern(line))
+
+        self.groups = []
+        start = 0
+        for index, pattern in enumerate(self.patterns):
+            if index + 1 == len(self.patterns) or self.patterns[index + 1].negated != pattern.negated:
+                self.groups.append(IgnorePatternGroup(pattern.negated, self.patterns[start:index + 1]))
+                start = index + 1
+        self.groups.reverse()
+
+    def __repr__(self) -> str:
+        return ' '.join(str(pattern) for pattern in self.patterns)
+
+    @staticmethod
+    def __strip_line__(line: str) -> str:
+        """
+        Strip line ending and trailing spaces not escaped with backslash
+        """
+        line = line.rstrip('\r\n')
+        while line.endswith(' ') and not line.endswith('\\ '):
+            line = line[:-1]
+        return line
+
+    def match(self, path: str, is_directory: bool = False) -> bool:
+        """
+        Check if path relative to tree root with / separators is ignored
+
+        Parent directories of the path are not checked. Use match_parts() for paths with
+        directories not already checked.
+        """
+        name = path.rsplit('/', 1)[-1]
+        for group in self.groups:
+            if group.match(path, name, is_directory):
+                return not group.negated
+        return False
+
+    def match_parts(self, parts: Tuple[str], is_directory: bool = False) -> bool:
+        """
+        Check if path components relative to tree root or any parent directory are ignored
+        """
+        for index in range(1, len(parts) + 1):
+            if self.match('/'.join(parts[:index]), is_directory or index < len(parts)):
+                return True
+        return False
@@ -0,0 +1,219 @@
+"""
+Bulk static analysis of python files in a package
+
+Files are parsed with ast to PythonFileSummary objects in a process pool, so parsing
+many files is not limited by the GIL. Workers return the summaries instead of syntax
+trees, because summaries are small to pickle.
+
+The calling process does not read the files. Files with summaries already cached by a
+fingerprint known without reading the file, from the git index or the fingerprint
+cache, are not sent to the workers. Other files are read and hashed by the workers,
+and returned summaries and fingerprints are stored to the caches of the calling process.
+
+The summaries are merged to a PackageSymbolTable with top level symbols of all files
+by their dotted import names.
+"""
+import os
+import stat
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+from ..git.fingerprint import store_file_fingerprint
+from .file import PythonFile
+from .summary import (
+    PythonFileSummary,
+    PythonSymbol,
+    get_cached_file_summary,
+    read_file_summary,
+    store_file_summary,
+)
+
+if TYPE_CHECKING:
+    from .package import Package
+
+DEFAULT_ANALYZER_BATCH_SIZE = 200
+
+
+# Path, stat details read before the file contents and summary of a parsed file
+ParsedFile = Tuple[str, Optional[os.stat_result], Optional[PythonFileSummary]]
+
+
+def read_file_summaries(paths: List[str], object_format: str) -> List[ParsedFile]:
+    """
+    Read summaries for a batch of python files, run in worker processes
+
+    File stat details are returned with the summaries, so the calling process can cache
+    the fingerprints computed by the workers
+    """
+    parsed = []
+    for path in paths:
+        try:
+            details = os.lstat(path)
+        except OSError:
+            details = None
+        parsed.append((path, details, read_file_summary(path, object_format)))
+    return parsed
+
+
+def iter_batches(items: List[str], batch_size: int) -> Iterator[List[str]]:
+    """
+    Iterate items in batches of batch_size items
+    """
+    for index in range(0, len(items), batch_size):
+        yield items[index:index + batch_size]
+
+
+class PackageSymbolTable:
+    """
+    Top level symbols of python files in a package by dotted import name
+
+    Symbols are stored with the import path of the file, like package.module.Symbol.
+    Files with syntax errors have summaries without symbols and are listed in errors.
+    """
+    package: 'Package'
+    summaries: Dict[Path, PythonFileSummary]
+    symbols: Dict[str, Tuple[PythonFile, PythonSymbol]]
+    errors: Dict[Path, str]
+
+    def __init__(self, package: 'Package') -> None:
+        self.package = package
+        self.summaries = {}
+        self.symbols = {}
+        self.errors = {}
+        self.__files__: Dict[str, PythonFile] = {}
+
+    def __repr__(self) -> str:
+        return f'{self.package} {len(self.symbols)} symbols in {len(self.summaries)} files'
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.symbols
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def add_file(self, item: PythonFile, summary: PythonFileSummary) -> None:
+        """
+        Add file summary and the top level symbols of the file
+        """
+        self.summaries[item.path] = summary
+        if summary.syntax_error is not None:
+            self.errors[item.path] = summary.syntax_error
+        import_path = item.import_path
+        if not import_path:
+            return
+        self.__files__[import_path] = item
+        for symbol in summary.symbols:
+            self.symbols[f'{import_path}.{symbol.name}'] = (item, symbol)
+
+    def get(self, name: str) -> Optional[Tuple[PythonFile, PythonSymbol]]:
+        """
+        Get file and symbol for dotted symbol name, or None if the symbol is not known
+        """
+        return self.symbols.get(name, None)
+
+    def find(self, name: str) -> List[str]:
+        """
+        Find dotted names of symbols with specified name in any file
+        """
+        suffix = f'.{name}'
+        return sorted(key for key in self.symbols if key.endswith(suffix))
+
+    def get_exports(self, import_path: str) -> List[str]:
+        """
+        Get public names of a module by import path, or empty list if module is not known
+        """
+        item = self.__files__.get(import_path, None)
+        if item is None:
+            return []
+        return self.summaries[item.path].public_names
+
+
+class PackageAnalyzer:
+    """
+    Parse summaries of many python files in a package with a process pool
+
+    Files are parsed in the calling process when max_workers is 1 or there are fewer
+    files to parse than batch_size, or if worker processes can't be started.
+    """
+    package: 'Package'
+    max_workers: Optional[int]
+    batch_size: int
+
+    def __init__(self,
+                 package: 'Package',
+                 max_workers: Optional[int] = None,
+                 batch_size: int = DEFAULT_ANALYZER_BATCH_SIZE) -> None:
+        if batch_size < 1:
+            raise ValueError('PackageAnalyzer batch_size must be at least 1')
+        self.package = package
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count() or 1
+        self.batch_size = batch_size
+
+    def __repr__(self) -> str:
+        return f'{self.package} analyzer {self.max_workers} workers'
+
+    def __read_summaries__(self, paths: List[str], object_format: str) -> List[ParsedFile]:
+        """
+        Read summaries for files in worker processes
+        """
+        parsed = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(read_file_summaries, batch, object_format)
+                for batch in iter_batches(paths, self.batch_size)
+            ]
+            for future in futures:
+                parsed.extend(future.result())
+        return parsed
+
+    def analyze(self, files: Optional[Iterable[PythonFile]] = None) -> PackageSymbolTable:
+        """
+        Parse summaries for files and return symbol table for them
+
+        By default files in all modules and test modules are analyzed. Unreadable files
+        are skipped.
+        """
+        package = self.package
+        if files is None:
+            files = package.python_files + [item for module in package.python_test_modules for item in module.files]
+        files = list(files)
+        object_format = package.git_object_format
+        fingerprints = package.get_file_fingerprints(files, hash_files=False)
+
+        summaries: Dict[str, Optional[PythonFileSummary]] = {}
+        pending = []
+        for item in files:
+            fingerprint = fingerprints.get(item.path, None)
+            summary = get_cached_file_summary(fingerprint) if fingerprint is not None else None
+            if summary is not None:
+                summaries[str(item.path)] = summary
+            else:
+                pending.append(str(item.path))
+
+        parsed = None
+        if self.max_workers > 1 and len(pending) > self.batch_size:
+            try:
+                parsed = self.__read_summaries__(pending, object_format)
+            except (OSError, BrokenProcessPool):
+                parsed = None
+        if parsed is None:
+            parsed = read_file_summaries(pending, object_format)
+        for path, details, summary in parsed:
+            if summary is not None:
+                if details is not None and stat.S_ISREG(details.st_mode):
+                    store_file_fingerprint(path, details, summary.fingerprint, object_format)
+                summary = store_file_summary(summary)
+            summaries[path] = summary
+
+        symbol_table = PackageSymbolTable(package)
+        for item in files:
+            summary = summaries.get(str(item.path), None)
+            if summary is not None:
+                symbol_table.add_file(item, summary)
+        return symbol_table
@@ -0,0 +1,122 @@
+"""
+Persistent on-disk cache for python package scanner results
+
+The cache stores the listing of each scanned directory with the directory
+st_mtime_ns and st_ino values. A cached listing is used only if the directory
+has not been modified since it was scanned. Directory mtime changes whenever
+entries are added, removed or renamed in it, so unchanged directories can be
+skipped without listing them again.
+"""
+import json
+import os
+import time
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from ..constants import RACY_MTIME_INTERVAL_NS
+
+if TYPE_CHECKING:
+    from .package import Package
+
+SCAN_CACHE_FILENAME = 'scanner.json'
+SCAN_CACHE_VERSION = 1
+
+
+class PackageScanCache:
+    """
+    Cache of directory listings for python package scanner
+    """
+    package: 'Package'
+    path: Path
+    excluded: List[str]
+    modified: bool
+
+    __directories__: Dict[str, dict]
+    __cached_directories__: Dict[str, dict]
+
+    def __init__(self, package: 'Package', excluded: List[str]) -> None:
+        self.package = package
+        self.path = package.joinpath(package.configuration.scanner.cache_directory, SCAN_CACHE_FILENAME)
+        self.excluded = list(excluded)
+        self.modified = False
+        self.__directories__ = {}
+        self.__cached_directories__ = self.__load__()
+
+    def __repr__(self) -> str:
+        return str(self.path)
+
+    def __load__(self) -> Dict[str, dict]:
+        """
+        Load cached directories from cache file
+
+        Returns empty dictionary if cache file is missing, unreadable or created with
+        different cache version or excluded patterns
+        """
+        try:
+            with self.path.open('r', encoding='utf-8') as filedescriptor:
+                data = json.load(filedescriptor)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        if data.get('version', None) != SCAN_CACHE_VERSION or data.get('excluded', None) != self.excluded:
+            return {}
+        return data.get('directories', {})
+
+    @property
+    def directories(self) -> Dict[str, dict]:
+        """
+        Return directories stored to the cache in this scan
+        """
+        return self.__directories__
+
+    def get(self, relative_path: str, stat: os.stat_result) -> Optional[List[Tuple[str, bool]]]:
+        """
+        Get cached directory entries for directory with specified stat details
+
+        Returns None if directory is not cached or has been modified
+        """
+        item = self.__cached_directories__.get(relative_path, None)
+        if item is None or item['mtime'] != stat.st_mtime_ns or item['inode'] != stat.st_ino:
+            return None
+        self.__directories__[relative_path] = item
+        return [(name, is_directory) for name, is_directory in item['entries']]
+
+    def set(self, relative_path: str, stat: os.stat_result, entries: List[Tuple[str, bool]]) -> None:
+        """
+        Store directory entries for directory with specified stat details
+        """
+        self.modified = True
+        if time.time_ns() - stat.st_mtime_ns < RACY_MTIME_INTERVAL_NS:
+            return
+        self.__directories__[relative_path] = {
+            'mtime': stat.st_mtime_ns,
+            'inode': stat.st_ino,
+            'entries': entries,
+        }
+
+    def save(self) -> None:
+        """
+        Save directories from this scan to the cache file
+
+        Directories not visited in this scan are dropped from the cache. Errors writing
+        the cache are passed to package debug messages and otherwise ignored.
+        """
+        if not self.modified and self.__directories__.keys() == self.__cached_directories__.keys():
+            return
+        data = {
+            'version': SCAN_CACHE_VERSION,
+            'excluded': self.excluded,
+            'directories': self.__directories__,
+        }
+        tmpfile = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with tmpfile.open('w', encoding='utf-8') as filedescriptor:
+                json.dump(data, filedescriptor)
+            os.replace(tmpfile, self.path)
+        except OSError as error:
+            self.package.debug(f'error writing scan cache {self.path}: {error}')
+            return
+        self.modified = False
@@ -0,0 +1,22 @@
+"""
+Configuration for python package module scanner
+"""
+from sys_toolkit.configuration.base import ConfigurationSection
+
+from ..constants import DEFAULT_SCAN_CACHE_DIRECTORY
+
+DEFAULT_SCAN_WORKERS = 1
+
+
+class ScannerConfiguration(ConfigurationSection):
+    """
+    Configuration for scanning python modules in a package
+    """
+    __name__ = 'scanner'
+    __default_settings__ = {
+        'cache': False,
+        'cache_directory': DEFAULT_SCAN_CACHE_DIRECTORY,
+        'workers': DEFAULT_SCAN_WORKERS,
+        'git_index': False,
+        'git_untracked': False,
+    }
@@ -8,6 +8,9 @@ from typing import Optional, Union, TYPE_CHECKING
 
 from pathlib_tree.exceptions import FilesystemError
 
+from ..git.fingerprint import DEFAULT_OBJECT_FORMAT, get_file_fingerprint
+from .summary import PythonFileSummary, get_file_summary
+
 if TYPE_CHECKING:
     from .module import PythonModule
 
@@ -17,77 +20,184 @@ Automatically generated file
 '''
 
 
+# Marker for derived values not yet computed in PythonFile
+NOT_LOADED = object()
+
+
 class PythonFile:
     """
     Python code file
+
+    Derived paths are computed when first accessed and cached until the file
+    path or module is changed
     """
-    module: Optional['PythonModule']
-    path: Path
+    __slots__ = (
+        '__file_path__',
+        '__file_module__',
+        '__relative_path__',
+        '__relative_directory__',
+        '__import_path__',
+        'module_root',
+    )
+
     module_root: bool
 
     def __init__(self,
                  path: Union[str, Path],
                  module: Optional['PythonModule'] = None,
                  create_missing: bool = False) -> None:
-        self.module = module
-        self.path = Path(path)
-        if not self.path.is_file() and create_missing:
+        self.__file_module__ = module
+        self.__file_path__ = Path(path)
+        self.__relative_path__ = NOT_LOADED
+        self.__relative_directory__ = NOT_LOADED
+        self.__import_path__ = NOT_LOADED
+        self.module_root = self.__file_path__.name == '__init__.py'
+        if create_missing and not self.path.is_file():
             with open(self.path, 'w', encoding='utf-8') as filedescriptor:
                 filedescriptor.write(EMPTY_FILE)
-        self.module_root = self.path.name == '__init__.py'
 
     def __repr__(self) -> str:
         if self.import_path is not None:
-            if self.path.name == '__init__.py':
+            if self.module_root:
                 return self.path.name
             return self.import_path
         return str(self.path)
 
+    def __reset_derived_paths__(self) -> None:
+        """
+        Clear cached derived paths
+        """
+        self.__relative_path__ = NOT_LOADED
+        self.__relative_directory__ = NOT_LOADED
+        self.__import_path__ = NOT_LOADED
+
+    @property
+    def path(self) -> Path:
+        """
+        Return path to the file
+        """
+        return self.__file_path__
+
+    @path.setter
+    def path(self, value: Union[str, Path]) -> None:
+        """
+        Set path to the file, clearing cached derived paths
+        """
+        self.__file_path__ = Path(value)
+        self.module_root = self.__file_path__.name == '__init__.py'
+        self.__reset_derived_paths__()
+
+    @property
+    def module(self) -> Optional['PythonModule']:
+        """
+        Return module for the file
+        """
+        return self.__file_module__
+
+    @module.setter
+    def module(self, value: Optional['PythonModule']) -> None:
+        """
+        Set module for the file, clearing cached derived paths
+        """
+        self.__file_module__ = value
+        self.__reset_derived_paths__()
+
+    def __load_relative_paths__(self) -> None:
+        """
+        Load cached relative path and directory of the file
+
+        Files directly in the module directory share the relative directory of the module
+        """
+        module = self.module
+        if not module or not module.package:
+            self.__relative_path__ = None
+            self.__relative_directory__ = None
+        elif self.path.parent == module:
+            self.__relative_directory__ = module.relative_directory
+            self.__relative_path__ = self.__relative_directory__.joinpath(self.path.name)
+        else:
+            self.__relative_path__ = self.path.relative_to(module.package)
+            self.__relative_directory__ = self.__relative_path__.parent
+
     @property
     def relative_path(self) -> Optional[Path]:
         """
         Return path relative to package
         """
-        if self.module and self.module.package:
-            return self.path.relative_to(self.module.package)
-        return None
+        if self.__relative_path__ is NOT_LOADED:
+            self.__load_relative_paths__()
+        return self.__relative_path__
 
     @property
     def relative_directory(self) -> Optional[Path]:
         """
         Return parent directory relativve to package root
         """
-        if self.relative_path:
-            return self.relative_path.parent
-        return None
+        if self.__relative_directory__ is NOT_LOADED:
+            self.__load_relative_paths__()
+        return self.__relative_directory__
 
     @property
     def import_path(self) -> str:
         """
         Return file import path
         """
-        path = self.relative_path
-        if path is not None:
-            if path.name == '__init__.py':
-                path = path.with_suffix('').parent
+        if self.__import_path__ is NOT_LOADED:
+            path = self.relative_path
+            if path is not None:
+                if self.module_root:
+                    path = path.with_suffix('').parent
+                else:
+                    path = path.with_suffix('')
+                self.__import_path__ = str(path).replace(os.sep, '.')
             else:
-                path = path.with_suffix('')
-            return str(path).replace(os.sep, '.')
-        return None
+                self.__import_path__ = None
+        return self.__import_path__
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """
+        Return git blob hash of the file contents, or None if the file does not exist
+
+        The hash is computed in-process and cached until file stat details change. Use
+        Package.get_file_fingerprints() to read hashes of many files from the git index.
+        """
+        return get_file_fingerprint(self.path, self.__get_object_format__())
+
+    @property
+    def summary(self) -> Optional[PythonFileSummary]:
+        """
+        Return summary of top level symbols and imports parsed from the file, or None if
+        the file can't be read
+
+        Summaries are cached by the file fingerprint, so the file is parsed again only
+        when the contents change.
+        """
+        object_format = self.__get_object_format__()
+        return get_file_summary(self.path, get_file_fingerprint(self.path, object_format), object_format)
+
+    def __get_object_format__(self) -> str:
+        """
+        Get git object format used for fingerprints of the file
+        """
+        module = self.module
+        if module is not None and module.package is not None:
+            return module.package.git_object_format
+        return DEFAULT_OBJECT_FORMAT
 
     @property
     def is_index(self) -> bool:
         """
         Check if this is file is module root index (__init__.py)
         """
-        return self.path.name == '__init__.py'
+        return self.module_root
 
     @property
     def is_module_index(self) -> bool:
         """
         Check if this is file is modle root index (__init__)
         """
-        return self.module and self.module.parent is None and self.path.name == '__init__.py'
+        return self.module and self.module.parent is None and self.module_root
 
     @property
     def name(self) -> str:
@@ -0,0 +1,150 @@
+"""
+Impact of git changes on python modules in a package
+
+Changed paths from a git change set are mapped to the package modules containing
+them with the package module index. Test modules are selected when they are changed
+themselves or mirror the path of a changed module under a test directory, like
+tests/git for package/git. Optionally modules importing the changed modules are
+included, following the import statements in the python files of the package.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, TYPE_CHECKING
+
+from .constants import TEST_MODULE_DEFAULT_GROUP
+from .file import PythonFile
+from .module import PythonModule
+
+if TYPE_CHECKING:
+    from ..git.changeset import GitChangeSet
+    from .package import Package
+
+
+def get_file_imports(item: PythonFile) -> Set[str]:
+    """
+    Get absolute dotted names imported by a python file
+
+    Returns empty set if file can't be read or parsed
+    """
+    summary = item.summary
+    if summary is None or summary.syntax_error is not None:
+        return set()
+    return set(summary.get_imported_names(item.import_path or '', is_package=item.module_root))
+
+
+class PackageChangeImpact:
+    """
+    Python modules and test modules affected by changes in a git change set
+    """
+    package: 'Package'
+    paths: List[Path]
+    reverse_dependencies: bool
+    changed_modules: List[PythonModule]
+    dependent_modules: List[PythonModule]
+
+    def __init__(self,
+                 package: 'Package',
+                 paths: Iterable[Path],
+                 reverse_dependencies: bool = False) -> None:
+        self.package = package
+        self.paths = list(paths)
+        self.reverse_dependencies = reverse_dependencies
+        self.changed_modules = package.get_python_modules_for_paths(self.paths)
+        self.dependent_modules = []
+        if reverse_dependencies:
+            self.dependent_modules = self.__get_dependent_modules__(self.changed_modules)
+
+    def __repr__(self) -> str:
+        return f'{self.package} {len(self.modules)} modules {len(self.test_modules)} test modules'
+
+    @classmethod
+    def from_change_set(cls,
+                        package: 'Package',
+                        change_set: 'GitChangeSet',
+                        reverse_dependencies: bool = False) -> 'PackageChangeImpact':
+        """
+        Create change impact for changes in git change set
+
+        Both source and destination paths of renamed files are included
+        """
+        repository = change_set.repository
+        paths = []
+        for change in change_set.iter_changes():
+            if change.old_path is not None:
+                paths.append(Path(repository, change.old_path))
+            paths.append(Path(repository, change.path))
+        return cls(package, paths, reverse_dependencies=reverse_dependencies)
+
+    @property
+    def affected_modules(self) -> List[PythonModule]:
+        """
+        Return changed modules and modules depending on them
+        """
+        return self.changed_modules + self.dependent_modules
+
+    @property
+    def modules(self) -> List[PythonModule]:
+        """
+        Return affected modules, excluding test modules
+        """
+        return [module for module in self.affected_modules if module.group != TEST_MODULE_DEFAULT_GROUP]
+
+    @property
+    def test_modules(self) -> List[PythonModule]:
+        """
+        Return affected test modules and test modules matching paths of affected modules
+        """
+        modules = [module for module in self.affected_modules if module.group == TEST_MODULE_DEFAULT_GROUP]
+        found = set(id(module) for module in modules)
+        module_paths = set(
+            module.relative_directory.parts[1:]
+            for module in self.modules
+            if module.relative_directory.parts
+        )
+        for module in self.package.python_test_modules:
+            if id(module) not in found and module.relative_directory.parts[1:] in module_paths:
+                found.add(id(module))
+                modules.append(module)
+        return modules
+
+    def __get_module_for_name__(self, modules: Dict[str, PythonModule], name: str) -> Optional[PythonModule]:
+        """
+        Get module for dotted import name, matching the longest module import path
+        """
+        parts = name.split('.')
+        while parts:
+            module = modules.get('.'.join(parts), None)
+            if module is not None:
+                return module
+            parts.pop()
+        return None
+
+    def __get_dependent_modules__(self, changed_modules: List[PythonModule]) -> List[PythonModule]:
+        """
+        Get modules importing changed modules directly or through other modules
+        """
+        package = self.package
+        all_modules = package.python_modules + package.python_test_modules
+        modules_by_name = {module.import_path: module for module in all_modules if module.import_path != '.'}
+
+        importers: Dict[int, List[PythonModule]] = {}
+        for module in all_modules:
+            imported = set()
+            for item in module.files:
+                for name in get_file_imports(item):
+                    target = self.__get_module_for_name__(modules_by_name, name)
+                    if target is not None and target is not module:
+                        imported.add(id(target))
+            for key in imported:
+                importers.setdefault(key, []).append(module)
+
+        found = set(id(module) for module in changed_modules)
+        dependent_modules = []
+        pending = list(changed_modules)
+        while pending:
+            module = pending.pop(0)
+            for importer in importers.get(id(module), []):
+                if id(importer) not in found:
+                    found.add(id(importer))
+                    dependent_modules.append(importer)
+                    pending.append(importer)
+        return dependent_modules
@@ -5,8 +5,9 @@ A module is part of a package and contains python files
 """
 import os
 
+from bisect import bisect_left
 from pathlib import Path
-from typing import List, Optional, Union, TYPE_CHECKING
+from typing import Iterator, List, Optional, Union, TYPE_CHECKING
 
 from pathlib_tree.exceptions import FilesystemError
 from pathlib_tree.tree import Tree
@@ -25,7 +26,12 @@ class PythonModule(Tree):
     path: Path
     package: Optional['Package']
     group: Optional[str]
-    files: List[PythonFile]
+
+    __files__: Optional[List[PythonFile]]
+    __file_paths__: Optional[List[Path]]
+    __parent_module__: Optional['PythonModule']
+    __child_modules__: List['PythonModule']
+    __relative_directory__: Optional[Path]
 
     python_file_class = PythonFile
 
@@ -40,13 +46,18 @@ class PythonModule(Tree):
                  create_missing: bool = False,
                  sorted: bool = True,
                  mode: str = None,
-                 excluded: List[str] = None):
+                 excluded: List[str] = None,
+                 files: Optional[List[Path]] = None):
         super().__init__(path, create_missing=False, sorted=sorted, mode=mode, excluded=excluded)
         self.package = package
         self.group = group
+        self.__parent_module__ = None
+        self.__child_modules__ = []
+        self.__relative_directory__ = None
         if not self.is_dir() and create_missing:
             self.mkdir(parents=True)
-        self.files = self.load_files()
+        self.__files__ = None
+        self.__file_paths__ = list(files) if files is not None else None
 
     @classmethod
     def create_module(
@@ -81,15 +92,74 @@ class PythonModule(Tree):
     def parent(self) -> Optional[Union['Package', 'PythonModule']]:
         """
         Return module parent as Module
+
+        Returns the package if module is not linked to a parent module
         """
         if not self.package:
             return None
-        item = self.package.joinpath(super().parent)
-        for module in self.package.python_modules:
-            if item == module:
-                return module
+        if self.__parent_module__ is None:
+            self.__parent_module__ = self.package.get_parent_module(self)
+        if self.__parent_module__ is not None:
+            return self.__parent_module__
         return self.package
 
+    @property
+    def children(self) -> List['PythonModule']:
+        """
+        Return modules directly under this module
+        """
+        return list(self.__child_modules__)
+
+    @property
+    def descendants(self) -> List['PythonModule']:
+        """
+        Return all modules under this module, depth first
+        """
+        modules = []
+        for child in self.__child_modules__:
+            modules.extend(child.walk_modules())
+        return modules
+
+    @property
+    def files(self) -> List[PythonFile]:
+        """
+        Return python files in the module, sorted by filename
+
+        Files are loaded on first access, from file paths given when creating the
+        module or by listing the module directory
+        """
+        if self.__files__ is None:
+            if self.__file_paths__ is not None:
+                self.__files__ = [self.python_file_class(item, module=self) for item in self.__file_paths__]
+                self.__file_paths__ = None
+            else:
+                self.__files__ = self.load_files()
+        return self.__files__
+
+    @files.setter
+    def files(self, value: List[PythonFile]) -> None:
+        """
+        Set python files in the module
+        """
+        self.__files__ = value
+        self.__file_paths__ = None
+
+    def reset_files(self, paths: Optional[List[Path]] = None) -> None:
+        """
+        Reset module files, loading them again on next access
+
+        Files are loaded from specified paths or by listing the module directory
+        """
+        self.__files__ = None
+        self.__file_paths__ = list(paths) if paths is not None else None
+
+    @property
+    def files_loaded(self) -> bool:
+        """
+        Check if module files have been loaded
+        """
+        return self.__files__ is not None
+
     @property
     def index(self) -> Optional[PythonFile]:
         """
@@ -104,9 +174,13 @@ class PythonModule(Tree):
     def relative_directory(self) -> Optional[Path]:
         """
         Return relative parent directory to package root
+
+        The value is cached, because it is shared by all files in the module
         """
         if self.package:
-            return Path(self.relative_to(self.package))
+            if self.__relative_directory__ is None:
+                self.__relative_directory__ = Path(self.relative_to(self.package))
+            return self.__relative_directory__
         return None
 
     @property
@@ -119,6 +193,31 @@ class PythonModule(Tree):
             return str(path).replace(os.sep, '.')
         return None
 
+    def link_module(self, module: 'PythonModule') -> None:
+        """
+        Link specified module as child of this module
+        """
+        module.__parent_module__ = self
+        if module not in self.__child_modules__:
+            self.__child_modules__.append(module)
+
+    def unlink_module(self, module: 'PythonModule') -> None:
+        """
+        Unlink specified child module from this module
+        """
+        if module in self.__child_modules__:
+            self.__child_modules__.remove(module)
+        if module.__parent_module__ is self:
+            module.__parent_module__ = None
+
+    def walk_modules(self) -> Iterator['PythonModule']:
+        """
+        Iterate this module and all modules under it, depth first
+        """
+        yield self
+        for child in self.__child_modules__:
+            yield from child.walk_modules()
+
     def debug(self, *args) -> None:
         """
         Pass debug message to parent
@@ -145,19 +244,51 @@ class PythonModule(Tree):
 
     def load_files(self) -> List[PythonFile]:
         """
-        Load python files in module
+        Load python files in module directory, sorted by filename
+
+        Only the module directory is listed, subdirectories are not visited. Files matching
+        the package excluded patterns are skipped.
         """
-        files = []
-        for child in self:
-            if child.parent == self and child.suffix == '.py' and child.is_file():
-                files.append(self.python_file_class(child, module=self))
-        return files
+        try:
+            with os.scandir(self) as iterator:
+                names = sorted(entry.name for entry in iterator if entry.name.endswith('.py') and entry.is_file())
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return []
+        if self.package:
+            scanner = self.package.scanner
+            parts = self.relative_directory.parts
+            names = [name for name in names if not scanner.is_excluded(parts + (name,))]
+        return [self.python_file_class(Path(self, name), module=self) for name in names]
+
+    def add_file(self, path: Union[str, Path], create_missing: bool = False) -> PythonFile:
+        """
+        Add python file to module files, keeping files sorted by filename
+
+        Replaces existing file object with same path
+        """
+        path = Path(path)
+        python_file = self.python_file_class(path, module=self, create_missing=create_missing)
+        index = bisect_left([item.path.name for item in self.files], path.name)
+        if index < len(self.files) and self.files[index].path == path:
+            self.files[index] = python_file
+        else:
+            self.files.insert(index, python_file)
+        return python_file
+
+    def remove_file(self, path: Union[str, Path]) -> Optional[PythonFile]:
+        """
+        Remove python file from module files
+
+        Returns removed file or None if file was not in module files
+        """
+        path = Path(path)
+        for index, item in enumerate(self.files):
+            if item.path == path:
+                return self.files.pop(index)
+        return None
 
     def create_file(self, name: str) -> PythonFile:
         """
         Create python file to module
         """
-        path = self.joinpath(name).with_suffix('.py')
-        python_file = PythonFile(path, module=self, create_missing=True)
-        self.load_files()
-        return python_file
+        return self.add_file(self.joinpath(name).with_suffix('.py'), create_missing=True)
@@ -5,23 +5,29 @@ import os
 import re
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
 
+from ..git.fingerprint import DEFAULT_OBJECT_FORMAT, get_cached_file_fingerprint, get_file_fingerprint
 from ..git.repository import GitRepository
 from ..tree import RepositoryTree
+from .analyzer import DEFAULT_ANALYZER_BATCH_SIZE, PackageAnalyzer, PackageSymbolTable
 from .constants import (
     MODULE_DEFAULT_GROUP,
     REPOSITORY_ROOT_IGNORED_FILES,
     TEST_MODULE_DEFAULT_GROUP
 )
 from .file import PythonFile
+from .impact import PackageChangeImpact
 from .module import PythonModule
+from .scanner import PackageScanner, ScannedDirectory
 from .version import PythonPackageVersion
 from .setup import SetupConfig
 from .utils import detect_package_module_name, get_module_path_components
 
 if TYPE_CHECKING:
     from ..configuration import Configuration
+    from ..git.changeset import GitChangeSet
+    from ..git.churn import ChurnStatistics
 
 RE_VERSION = re.compile("""^__version__ = '(?P<version>.*)'$""")
 
@@ -32,12 +38,16 @@ class Package(RepositoryTree):
     """
     module_name: str
     python_module_class = PythonModule
+    python_scanner_class = PackageScanner
     configuration: Optional['Configuration']
 
-    __module_index__: Dict
+    __module_index__: Dict[str, PythonModule]
+    __lookup_modules__: Dict[str, Optional[PythonModule]]
+    __root_modules__: List[PythonModule]
     __python_modules__: Optional[List[PythonModule]]
     __python_test_modules__: Optional[List[PythonModule]]
     __setup__: Optional[SetupConfig]
+    __git_repository__: Optional[GitRepository]
 
     __git_revision_characters__ = 8
     """Number of characters in short git revision from git_short_revision propery"""
@@ -53,9 +63,12 @@ class Package(RepositoryTree):
                  configuration: Optional['Configuration'] = None):
         super().__init__(path, create_missing, sorted, mode, excluded)
         self.__module_index__ = {}
+        self.__lookup_modules__ = {}
+        self.__root_modules__ = []
         self.__python_modules__ = None
         self.__python_test_modules__ = None
         self.__setup__ = None
+        self.__git_repository__ = None
         self.module_name = detect_package_module_name(self)
 
     def __load_modules__(self) -> None:
@@ -65,6 +78,157 @@ class Package(RepositoryTree):
         """
         self.__python_modules__, self.__python_test_modules__ = self.detect_python_modules()
 
+    def __create_python_module__(self, directory: ScannedDirectory) -> PythonModule:
+        """
+        Create python module for a directory from the scanner
+
+        Modules already returned by get_python_module() before loading all modules are
+        reused, so the same module object is returned before and after loading modules
+        """
+        module = self.__lookup_modules__.get(str(directory.relative_path), None)
+        if module is not None:
+            module.reset_files(directory.files)
+            return module
+        group = TEST_MODULE_DEFAULT_GROUP if directory.is_test_directory else None
+        return self.python_module_class(directory.path, package=self, group=group, files=directory.files)
+
+    def __lookup_python_module__(self, relative_path: Path) -> Optional[PythonModule]:
+        """
+        Look up a single python module without loading all modules in the package
+
+        Only the module directory is listed and its parent directory names checked for
+        excluded patterns. Returns None if the directory is not a python module.
+        """
+        key = str(relative_path)
+        if key not in self.__lookup_modules__:
+            parts = relative_path.parts if key != '.' else ()
+            directory = self.scanner.scan_module_directory(parts)
+            self.__lookup_modules__[key] = (
+                self.__create_python_module__(directory) if directory is not None else None
+            )
+        return self.__lookup_modules__[key]
+
+    def __get_modules_in_directory__(self, relative_path: Path) -> List[PythonModule]:
+        """
+        Get loaded modules in specified directory relative to package root, including the
+        module for the directory itself
+        """
+        prefix = str(relative_path)
+        if prefix == '.':
+            return list(self.__module_index__.values())
+        return [
+            module
+            for key, module in self.__module_index__.items()
+            if key == prefix or key.startswith(f'{prefix}{os.sep}')
+        ]
+
+    def __add_module__(self, module: PythonModule) -> PythonModule:
+        """
+        Add module to loaded modules and module index, linking it to parent and child modules
+
+        Returns existing module from the index if module with same path was already loaded.
+        All package modules are loaded first if they have not been loaded yet.
+        """
+        if self.__python_modules__ is None:
+            self.__load_modules__()
+        relative_directory = module.relative_directory
+        existing = self.__module_index__.get(str(relative_directory), None)
+        if existing is not None:
+            return existing
+
+        self.__module_index__[str(relative_directory)] = module
+        if module.group == TEST_MODULE_DEFAULT_GROUP:
+            self.__python_test_modules__.append(module)
+        else:
+            self.__python_modules__.append(module)
+
+        parent = None
+        if relative_directory != Path('.'):
+            parent = self.__module_index__.get(str(relative_directory.parent), None)
+        if parent is not None:
+            parent.link_module(module)
+        else:
+            self.__root_modules__.append(module)
+
+        for child in list(self.__root_modules__):
+            if child is module or child.relative_directory == Path('.'):
+                continue
+            if child.relative_directory.parent == relative_directory:
+                self.__root_modules__.remove(child)
+                module.link_module(child)
+        return module
+
+    def __remove_module__(self, module: PythonModule) -> None:
+        """
+        Remove module from loaded modules and module index
+
+        Child modules of the removed module are not linked to a parent module after this
+        """
+        key = str(module.relative_directory)
+        if self.__module_index__.get(key, None) is not module:
+            return
+        del self.__module_index__[key]
+        for modules in (self.__python_modules__, self.__python_test_modules__, self.__root_modules__):
+            if module in modules:
+                modules.remove(module)
+
+        parent = module.parent
+        if isinstance(parent, PythonModule):
+            parent.unlink_module(module)
+        for child in module.children:
+            module.unlink_module(child)
+            self.__root_modules__.append(child)
+
+    def __add_python_file__(self, scanner: PackageScanner, path: Path) -> None:
+        """
+        Add python file to loaded modules, creating the module as required
+        """
+        if path.suffix != '.py':
+            return
+        try:
+            parts = path.relative_to(self).parts
+        except ValueError:
+            return
+        if scanner.is_excluded_path(parts, is_directory=False):
+            return
+
+        directory_parts = parts[:-1]
+        module = self.__module_index__.get(str(Path(*directory_parts)), None)
+        if module is None:
+            if not directory_parts and path.name in REPOSITORY_ROOT_IGNORED_FILES:
+                return
+            group = TEST_MODULE_DEFAULT_GROUP if scanner.is_test_directory(directory_parts) else None
+            module = self.__add_module__(
+                self.python_module_class(path.parent, package=self, group=group, files=[])
+            )
+            if not directory_parts:
+                for filename in REPOSITORY_ROOT_IGNORED_FILES:
+                    if self.joinpath(filename).is_file():
+                        module.add_file(Path(self, filename))
+        module.add_file(path)
+
+    def __remove_path__(self, path: Path) -> None:
+        """
+        Remove python file or all modules in a directory from loaded modules
+        """
+        try:
+            relative_path = path.relative_to(self)
+        except ValueError:
+            return
+
+        if path.suffix == '.py':
+            module = self.__module_index__.get(str(relative_path.parent), None)
+            if module is not None:
+                module.remove_file(path)
+                filenames = [item.path.name for item in module.files]
+                if relative_path.parent == Path('.'):
+                    filenames = [name for name in filenames if name not in REPOSITORY_ROOT_IGNORED_FILES]
+                if not filenames:
+                    self.__remove_module__(module)
+
+        for module in self.__get_modules_in_directory__(relative_path):
+            self.__remove_module__(module)
+
     @property
     def setup(self) -> SetupConfig:
         """
@@ -74,12 +238,23 @@ class Package(RepositoryTree):
             self.__setup__ = SetupConfig(self)
         return self.__setup__
 
+    @property
+    def scanner(self) -> PackageScanner:
+        """
+        Return filesystem scanner for python modules in the package
+        """
+        return self.python_scanner_class(self)
+
     @property
     def git_repository(self) -> GitRepository:
         """
         Return git repository object for python package source code tree
+
+        The object is cached to reuse detected repository state
         """
-        return GitRepository(self)
+        if self.__git_repository__ is None:
+            self.__git_repository__ = GitRepository(self)
+        return self.__git_repository__
 
     @property
     def git_short_revision(self) -> str:
@@ -88,13 +263,21 @@ class Package(RepositoryTree):
         """
         return self.git_repository.get_revision(self.__git_revision_characters__)
 
+    @property
+    def git_object_format(self) -> str:
+        """
+        Return object hash algorithm of git repository, or default sha1 outside git
+        """
+        repository = self.git_repository
+        if not repository.is_git_directory:
+            return DEFAULT_OBJECT_FORMAT
+        return repository.object_format
+
     @property
     def python_package_version(self) -> PythonPackageVersion:
         """
         Try to read version from main module index file
         """
-        if self.__python_modules__ is None:
-            self.__load_modules__()
         return PythonPackageVersion(self)
 
     @property
@@ -102,14 +285,7 @@ class Package(RepositoryTree):
         """
         Find valid module paths in directory
         """
-        modules = []
-        if self.is_dir():
-            for item in self.filter('*.py'):
-                if item.parent == self and item.name in REPOSITORY_ROOT_IGNORED_FILES:
-                    continue
-                if item.parent not in modules:
-                    modules.append(item.parent)
-        return modules
+        return [Path(directory.path) for directory in self.scanner.scan()]
 
     @property
     def python_modules(self) -> List[PythonModule]:
@@ -129,6 +305,15 @@ class Package(RepositoryTree):
             self.__load_modules__()
         return self.__python_test_modules__
 
+    @property
+    def children(self) -> List[PythonModule]:
+        """
+        Return modules not linked to a parent module
+        """
+        if self.__python_modules__ is None:
+            self.__load_modules__()
+        return list(self.__root_modules__)
+
     @property
     def python_files(self) -> List[PythonFile]:
         """
@@ -142,51 +327,245 @@ class Package(RepositoryTree):
     def detect_python_modules(self) -> Tuple[List[PythonModule], List[PythonModule]]:
         """
         Detect python modules in package
+
+        Modules and their files are loaded from a single scan of the package tree
         """
         modules = []
         test_modules = []
-        for path in self.python_module_paths:
-            name = path.name
-            module = None
-
-            parents = list(
-                reversed([
-                    parent.name
-                    for parent in path.relative_to(self).parents
-                    if parent.name != ''
-                ])
-            )
-            # pylint: disable=no-member
-            test_directory_parent = set(parents).intersection(
-                set(self.configuration.test_directories)
-            )
-            if test_directory_parent or name in self.configuration.test_directories:
-                module = self.python_module_class(path, package=self, group=TEST_MODULE_DEFAULT_GROUP)
-                if path not in test_modules:
-                    test_modules.append(module)
+        self.__module_index__ = {}
+        self.__root_modules__ = []
+        directories = self.scanner.scan()
+        for directory in directories:
+            module = self.__create_python_module__(directory)
+            if directory.is_test_directory:
+                test_modules.append(module)
             else:
-                module = self.python_module_class(path, package=self)
-                if path not in modules:
-                    modules.append(module)
+                modules.append(module)
+            self.__module_index__[str(directory.relative_path)] = module
+        self.__lookup_modules__ = {}
 
-            module_relative_path = str(module.relative_directory)
-            if module_relative_path not in self.__module_index__:
-                self.__module_index__[module_relative_path] = module
+        for directory in directories:
+            module = self.__module_index__[str(directory.relative_path)]
+            parent = None
+            if directory.parts:
+                parent = self.__module_index__.get(str(Path(*directory.parts[:-1])), None)
+            if parent is not None:
+                parent.link_module(module)
+            else:
+                self.__root_modules__.append(module)
 
         return modules, test_modules
 
+    def get_parent_module(self, module: PythonModule) -> Optional[PythonModule]:
+        """
+        Get parent module for a module from the module index
+
+        Returns None if parent directory of the module is not a python module
+        """
+        relative_directory = module.relative_directory
+        if relative_directory is None or relative_directory == Path('.'):
+            return None
+        return self.get_python_module(str(relative_directory.parent))
+
     def get_python_module(self, name: str) -> Optional[PythonModule]:
         """
         Get python module by relative path with root module name
+
+        If package modules are not loaded yet, only the requested module directory is
+        scanned instead of loading all modules. With scanner git_index enabled all
+        modules are loaded to use the git file listing.
         """
-        if not self.__module_index__:
-            self.detect_python_modules()
+        relative_path = Path(self, name).relative_to(self)
+        if self.__python_modules__ is None:
+            if not self.configuration.scanner.git_index:
+                return self.__lookup_python_module__(relative_path)
+            self.__load_modules__()
+        return self.__module_index__.get(str(relative_path), None)
 
-        relative_path = str(self.joinpath(name).relative_to(self))
-        try:
-            return self.__module_index__[relative_path]
-        except KeyError:
-            return None
+    def apply_changes(self,
+                      added: Iterable[Union[str, Path]] = (),
+                      removed: Iterable[Union[str, Path]] = ()) -> None:
+        """
+        Apply added and removed files to loaded package modules
+
+        Paths can be absolute or relative to the package root. Added directories are
+        scanned for python files and removed directories remove all modules in them.
+        Added files already in the modules are reloaded.
+
+        Does nothing if modules have not been loaded yet. If only some modules were looked
+        up with get_python_module(), all modules are loaded to update the returned modules.
+        """
+        if self.__python_modules__ is None:
+            if not self.__lookup_modules__:
+                return
+            self.__load_modules__()
+        scanner = self.scanner
+        for path in removed:
+            self.__remove_path__(Path(self, path))
+        for path in added:
+            path = Path(self, path)
+            if path.is_dir():
+                for directory in scanner.scan_directory(path):
+                    for item in directory.files:
+                        self.__add_python_file__(scanner, item)
+            else:
+                self.__add_python_file__(scanner, path)
+
+    def refresh(self, paths: Optional[Iterable[Union[str, Path]]] = None) -> None:
+        """
+        Refresh loaded package modules from the filesystem
+
+        Without paths the package is fully rescanned. With paths only the specified files
+        and directories are checked and changes are applied with apply_changes()
+        """
+        if paths is None or self.__python_modules__ is None:
+            self.__load_modules__()
+            return
+
+        scanner = self.scanner
+        added = []
+        removed = []
+        for path in paths:
+            path = Path(self, path)
+            if path.is_dir():
+                found = set()
+                for directory in scanner.scan_directory(path):
+                    found.update(directory.files)
+                existing = set()
+                for module in self.__get_modules_in_directory__(path.relative_to(self)):
+                    existing.update(item.path for item in module.files)
+                added.extend(sorted(found - existing))
+                removed.extend(sorted(existing - found))
+            elif path.is_file():
+                added.append(path)
+            else:
+                removed.append(path)
+        self.apply_changes(added=added, removed=removed)
+
+    def get_python_modules_for_paths(self, paths: Iterable[Union[str, Path]]) -> List[PythonModule]:
+        """
+        Get loaded modules containing specified files or directories
+
+        Modules are returned in the order of paths without duplicates. Paths outside the
+        package or not in any module are skipped.
+        """
+        if self.__python_modules__ is None:
+            self.__load_modules__()
+        modules = []
+        found = set()
+        for path in paths:
+            try:
+                relative_path = Path(self, path).relative_to(self)
+            except ValueError:
+                continue
+            if str(relative_path) in self.__module_index__:
+                matches = self.__get_modules_in_directory__(relative_path)
+            else:
+                matches = [self.__module_index__.get(str(relative_path.parent), None)]
+                if relative_path.suffix != '.py':
+                    matches.extend(self.__get_modules_in_directory__(relative_path))
+            for module in matches:
+                if module is not None and id(module) not in found:
+                    found.add(id(module))
+                    modules.append(module)
+        return modules
+
+    def get_change_impact(self,
+                          change_set: Optional['GitChangeSet'] = None,
+                          start_revision: Optional[str] = None,
+                          end_revision: str = 'HEAD',
+                          reverse_dependencies: bool = False) -> PackageChangeImpact:
+        """
+        Get python modules and test modules affected by changes in git change set
+
+        Change set can be given or loaded for changes in the package directory between
+        start and end revisions, with renames detected. With reverse_dependencies the
+        modules importing the changed modules are included.
+        """
+        if change_set is None:
+            if start_revision is None:
+                raise ValueError('get_change_impact() requires change set or start revision')
+            repository = self.git_repository
+            change_set = repository.get_change_set(
+                start_revision,
+                end_revision,
+                paths=[Path(os.path.abspath(self)).relative_to(repository)],
+                find_renames=True,
+            )
+        return PackageChangeImpact.from_change_set(self, change_set, reverse_dependencies=reverse_dependencies)
+
+    def get_file_fingerprints(self,
+                              files: Optional[Iterable[PythonFile]] = None,
+                              hash_files: bool = True) -> Dict[Path, str]:
+        """
+        Get git blob hash fingerprints for python files by file path
+
+        By default fingerprints are returned for files in all modules and test modules.
+        Hashes of tracked files not modified in the work tree are read from the git index
+        with one git command and other files are hashed in-process. With hash_files False
+        files are not read, and other files are returned only if their hashes are cached.
+        """
+        if files is None:
+            files = self.python_files + [item for module in self.python_test_modules for item in module.files]
+        known = {}
+        repository = self.git_repository
+        if repository.is_git_directory:
+            known = {
+                str(path): value
+                for path, value in repository.get_file_fingerprints(self, hash_modified=hash_files).items()
+            }
+        object_format = self.git_object_format
+
+        fingerprints = {}
+        for item in files:
+            value = known.get(os.path.abspath(item.path), None)
+            if value is None:
+                if hash_files:
+                    value = get_file_fingerprint(item.path, object_format)
+                else:
+                    value = get_cached_file_fingerprint(item.path, object_format)
+            if value is not None:
+                fingerprints[item.path] = value
+        return fingerprints
+
+    def analyze_files(self,
+                      files: Optional[Iterable[PythonFile]] = None,
+                      max_workers: Optional[int] = None,
+                      batch_size: int = DEFAULT_ANALYZER_BATCH_SIZE) -> PackageSymbolTable:
+        """
+        Parse python files with a process pool and return symbol table for the files
+
+        By default files in all modules and test modules are parsed, using one worker
+        process per CPU. Files with cached summaries are not parsed again.
+        """
+        return PackageAnalyzer(self, max_workers=max_workers, batch_size=batch_size).analyze(files)
+
+    def get_module_churn(self,
+                         revision: str = 'HEAD',
+                         test_modules: bool = False) -> Dict[PythonModule, 'ChurnStatistics']:
+        """
+        Get churn and ownership statistics for python modules
+
+        Repository churn statistics are updated to the revision with only the commits not
+        processed yet. Statistics for a module include files directly in the module
+        directory.
+        """
+        repository = self.git_repository
+        churn = repository.churn
+        churn.update(revision)
+        prefix = Path(os.path.abspath(self)).relative_to(repository)
+        modules = self.python_modules + self.python_test_modules if test_modules else self.python_modules
+        return {
+            module: churn.get_directory_statistics(prefix.joinpath(module.relative_directory).as_posix())
+            for module in modules
+        }
+
+    def walk_modules(self) -> Iterator[PythonModule]:
+        """
+        Iterate all modules in the package, depth first
+        """
+        for module in self.children:
+            yield from module.walk_modules()
 
     def create_python_module(
             self,
@@ -200,12 +579,14 @@ class Package(RepositoryTree):
         group = TEST_MODULE_DEFAULT_GROUP if test_module else MODULE_DEFAULT_GROUP
         for index in range(0, len(module_path)):
             path = str(self.joinpath(*module_path[:index + 1]).relative_to(self))
-            module = self.get_python_module(name)
+            module = self.get_python_module(path)
             if module is None:
-                module = self.python_module_class.create_module(
-                    path,
-                    package=self,
-                    group=group
+                module = self.__add_module__(
+                    self.python_module_class.create_module(
+                        path,
+                        package=self,
+                        group=group
+                    )
                 )
         return module
 
@@ -231,4 +612,6 @@ class Package(RepositoryTree):
             module = self.create_python_module(module_path, test_module=test_module, group=group)
             return module.create_file(filename)
         path = self.joinpath(filename).with_suffix('.py')
-        return PythonFile(path, module=None, create_missing=True)
+        python_file = PythonFile(path, module=None, create_missing=True)
+        self.apply_changes(added=[path])
+        return python_file
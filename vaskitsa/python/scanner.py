@@ -0,0 +1,367 @@
+"""
+Single pass filesystem scanner for python modules in a package
+
+The scanner walks the package directory once with os.scandir, prunes ignored
+directories with compiled vaskitsa.ignore.IgnorePatterns matcher before descending
+into them and collects the python files of each
+module directory during the same walk. Directory listings can optionally be
+cached on disk with vaskitsa.python.cache.PackageScanCache.
+
+With scanner workers configured above 1 the top level directories of the
+package are scanned in parallel in a thread pool, which helps on filesystems
+where each directory listing is slow, for example NFS mounts. The results are
+merged in the same order as the sequential scan.
+
+With scanner git_index enabled and the package in a git repository, the
+directory listings are built from the file list of a single git ls-files call
+instead of walking the filesystem, so untracked directories are never visited.
+Untracked files not ignored by git can be included with git_untracked option.
+"""
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from ..exceptions import GitError
+from ..ignore import IgnorePatterns
+from .cache import PackageScanCache
+from .constants import REPOSITORY_ROOT_IGNORED_FILES
+
+if TYPE_CHECKING:
+    from .package import Package
+
+PYTHON_FILE_SUFFIX = '.py'
+
+
+class ScannedDirectory:
+    """
+    Python module directory detected by the package scanner
+    """
+    path: str
+    parts: Tuple[str]
+    is_test_directory: bool
+    filenames: List[str]
+
+    def __init__(self,
+                 path: str,
+                 parts: Tuple[str],
+                 is_test_directory: bool,
+                 filenames: List[str]) -> None:
+        self.path = path
+        self.parts = parts
+        self.is_test_directory = is_test_directory
+        self.filenames = filenames
+
+    def __repr__(self) -> str:
+        return str(self.relative_path)
+
+    @property
+    def relative_path(self) -> Path:
+        """
+        Return directory path relative to the package root
+        """
+        return Path(*self.parts)
+
+    @property
+    def files(self) -> List[Path]:
+        """
+        Return python files in the directory as paths
+        """
+        path = Path(self.path)
+        return [path.joinpath(filename) for filename in self.filenames]
+
+
+class PackageScanner:
+    """
+    Scanner for python module directories in a package
+    """
+    package: 'Package'
+    excluded: List[str]
+    ignore_patterns: IgnorePatterns
+    test_directories: Tuple[str]
+    cache: Optional[PackageScanCache]
+
+    python_scan_cache_class = PackageScanCache
+
+    def __init__(self, package: 'Package') -> None:
+        self.package = package
+        self.excluded = list(package.excluded)
+        self.test_directories = tuple(package.configuration.test_directories)
+        self.cache = None
+        self.ignore_patterns = IgnorePatterns(self.excluded)
+        self.__git_listing__ = None
+
+    def __repr__(self) -> str:
+        return f'scanner {self.package}'
+
+    def __read_directory__(self, path: str, parts: Tuple[str]) -> List[Tuple[str, bool]]:
+        """
+        Read subdirectories and python files in a directory
+
+        Returns sorted list of entry names with a flag indicating directories. Path parts
+        are the directory path components relative to the package root. Symbolic links to
+        directories are not followed, because links to parent directories would loop.
+        """
+        try:
+            with os.scandir(path) as iterator:
+                entries = sorted(iterator, key=attrgetter('name'))
+        except (FileNotFoundError, NotADirectoryError, PermissionError):
+            return []
+
+        prefix = '/'.join(parts + ('',))
+        items = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if not self.ignore_patterns.match(prefix + entry.name, True):
+                    items.append((entry.name, True))
+            elif entry.name.endswith(PYTHON_FILE_SUFFIX) and entry.is_file():
+                if not self.ignore_patterns.match(prefix + entry.name, False):
+                    items.append((entry.name, False))
+        return items
+
+    def __list_directory__(self, path: str, parts: Tuple[str]) -> List[Tuple[str, bool]]:
+        """
+        List directory entries, using git index listing or cached entries for unmodified directories
+        """
+        if self.__git_listing__ is not None:
+            return self.__git_listing__.get(parts, [])
+        if self.cache is None:
+            return self.__read_directory__(path, parts)
+
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return []
+        relative_path = os.sep.join(parts)
+        entries = self.cache.get(relative_path, stat)
+        if entries is None:
+            entries = self.__read_directory__(path, parts)
+            self.cache.set(relative_path, stat, entries)
+        return entries
+
+    def __scan_directory__(self,
+                           path: str,
+                           parts: Tuple[str],
+                           is_test_directory: bool,
+                           directories: List[ScannedDirectory]) -> None:
+        """
+        Scan a directory recursively, appending module directories to directories
+
+        A directory is added to the list when first python file in it is found, which
+        keeps the order of modules same as the depth first walk of the whole tree.
+        """
+        directory = None
+        filenames = []
+        for name, is_directory in self.__list_directory__(path, parts):
+            if is_directory:
+                self.__scan_directory__(
+                    os.path.join(path, name),
+                    parts + (name,),
+                    is_test_directory or name in self.test_directories,
+                    directories
+                )
+            else:
+                filenames.append(name)
+                if directory is None and (parts or name not in REPOSITORY_ROOT_IGNORED_FILES):
+                    directory = ScannedDirectory(path, parts, is_test_directory, filenames)
+                    directories.append(directory)
+
+    def __load_git_listing__(self, untracked: bool) -> Optional[Dict[Tuple[str], List[Tuple[str, bool]]]]:
+        """
+        Load directory listings for the package from git index
+
+        Returns dictionary of sorted directory entries by directory path components, or
+        None if the package is not in a git repository
+        """
+        repository = self.package.git_repository
+        if not repository.is_git_directory:
+            return None
+        try:
+            files = repository.list_files(directory=self.package, untracked=untracked)
+        except GitError as error:
+            self.package.debug(f'error listing git files, scanning filesystem: {error}')
+            return None
+
+        listing = {}
+        for filename in files:
+            if not filename.endswith(PYTHON_FILE_SUFFIX):
+                continue
+            parts = tuple(filename.split('/'))
+            for index, name in enumerate(parts):
+                listing.setdefault(parts[:index], set()).add((name, index < len(parts) - 1))
+
+        for parts, entries in listing.items():
+            prefix = '/'.join(parts + ('',))
+            listing[parts] = sorted(
+                (name, is_directory)
+                for name, is_directory in entries
+                if not self.ignore_patterns.match(prefix + name, is_directory)
+            )
+        return listing
+
+    def __scan_parallel__(self, workers: int, directories: List[ScannedDirectory]) -> None:
+        """
+        Scan the package with top level directories scanned in a thread pool
+
+        Directories are merged in the order of package root entries, which gives the
+        same order as the sequential depth first walk.
+        """
+        path = str(self.package)
+        is_test_directory = self.is_test_directory(())
+        entries = self.__list_directory__(path, ())
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='vaskitsa-scanner') as executor:
+            results = []
+            for name, is_directory in entries:
+                if is_directory:
+                    results.append(executor.submit(
+                        self.scan_subdirectory,
+                        os.path.join(path, name),
+                        (name,),
+                        is_test_directory or name in self.test_directories
+                    ))
+                else:
+                    results.append(name)
+
+            directory = None
+            filenames = []
+            for result in results:
+                if not isinstance(result, str):
+                    directories.extend(result.result())
+                    continue
+                filenames.append(result)
+                if directory is None and result not in REPOSITORY_ROOT_IGNORED_FILES:
+                    directory = ScannedDirectory(path, (), is_test_directory, filenames)
+                    directories.append(directory)
+
+    def scan_subdirectory(self,
+                          path: str,
+                          parts: Tuple[str],
+                          is_test_directory: bool) -> List[ScannedDirectory]:
+        """
+        Scan a directory recursively, returning list of module directories
+        """
+        directories = []
+        self.__scan_directory__(path, parts, is_test_directory, directories)
+        return directories
+
+    def is_excluded(self, parts: Tuple[str], is_directory: bool = False) -> bool:
+        """
+        Check if a path relative to package root matches the excluded patterns
+
+        Parent directories of the path are not checked
+        """
+        return self.ignore_patterns.match('/'.join(parts), is_directory)
+
+    def is_excluded_path(self, parts: Tuple[str], is_directory: bool = True) -> bool:
+        """
+        Check if a path relative to package root or any of its parent directories is excluded
+        """
+        return self.ignore_patterns.match_parts(parts, is_directory)
+
+    def is_test_directory(self, parts: Tuple[str]) -> bool:
+        """
+        Check if directory with path components relative to package root contains test modules
+        """
+        if not parts:
+            return self.package.name in self.test_directories
+        for part in parts:
+            if part in self.test_directories:
+                return True
+        return False
+
+    def iter_directories(self, path: Optional[Union[str, Path]] = None) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Iterate all directories in the package or a directory in the package, depth first
+
+        Yields directory path and names of python files in the directory for every directory
+        not excluded, including directories without python files
+        """
+        path = self.package.joinpath(path) if path is not None else self.package
+        try:
+            parts = path.relative_to(self.package).parts
+        except ValueError:
+            return
+        if not path.is_dir() or self.is_excluded_path(parts):
+            return
+
+        stack = [(str(path), parts)]
+        while stack:
+            directory, parts = stack.pop()
+            entries = self.__read_directory__(directory, parts)
+            yield directory, [name for name, is_directory in entries if not is_directory]
+            stack.extend(
+                (os.path.join(directory, name), parts + (name,))
+                for name, is_directory in reversed(entries)
+                if is_directory
+            )
+
+    def scan_module_directory(self, parts: Tuple[str]) -> Optional[ScannedDirectory]:
+        """
+        Scan a single directory with path components relative to package root
+
+        Only the directory and its parent directory names are checked, subdirectories are
+        not visited. Returns None if directory is excluded or is not a python module.
+        """
+        if self.is_excluded_path(parts):
+            return None
+        path = os.path.join(str(self.package), *parts)
+        filenames = [name for name, is_directory in self.__read_directory__(path, parts) if not is_directory]
+        if not parts and all(name in REPOSITORY_ROOT_IGNORED_FILES for name in filenames):
+            return None
+        if not filenames:
+            return None
+        return ScannedDirectory(path, parts, self.is_test_directory(parts), filenames)
+
+    def scan_directory(self, path: Union[str, Path]) -> List[ScannedDirectory]:
+        """
+        Scan a directory in the package for directories containing python files
+
+        The scanner cache is not used when scanning a part of the package
+        """
+        path = self.package.joinpath(path)
+        try:
+            parts = path.relative_to(self.package).parts
+        except ValueError:
+            return []
+        directories = []
+        if not path.is_dir() or self.is_excluded_path(parts):
+            return directories
+        self.__scan_directory__(str(path), parts, self.is_test_directory(parts), directories)
+        return directories
+
+    def scan(self) -> List[ScannedDirectory]:
+        """
+        Scan the package for directories containing python files
+
+        If scanner git_index is enabled in configuration and the package is in a git
+        repository, files are listed from git index. Otherwise, if scanner cache is
+        enabled in configuration, unmodified directories are loaded from the cache and
+        the cache is updated after the scan. If scanner workers is more than 1, top level
+        directories are scanned in parallel.
+        """
+        directories = []
+        if not self.package.is_dir():
+            return directories
+
+        configuration = self.package.configuration.scanner
+        if configuration.git_index:
+            self.__git_listing__ = self.__load_git_listing__(configuration.git_untracked)
+        if self.__git_listing__ is not None:
+            try:
+                self.__scan_directory__(str(self.package), (), self.is_test_directory(()), directories)
+            finally:
+                self.__git_listing__ = None
+            return directories
+
+        if configuration.cache:
+            self.cache = self.python_scan_cache_class(self.package, self.excluded)
+        workers = int(configuration.workers or 1)
+        if workers > 1:
+            self.__scan_parallel__(workers, directories)
+        else:
+            self.__scan_directory__(str(self.package), (), self.is_test_directory(()), directories)
+        if self.cache is not None:
+            self.cache.save()
+        return directories
@@ -0,0 +1,305 @@
+"""
+Static summary of python source files parsed with ast
+
+The summary lists top level classes, functions and constants with docstrings, the
+module docstring, __all__, __version__ and import statements of a file, without
+importing the code. Summaries depend only on file contents, so they are cached by
+the git blob hash fingerprint of the file and shared by files with same contents.
+
+Imports are stored as written in the file. Relative imports are resolved to absolute
+names with the import path of the file by get_imported_names().
+"""
+import ast
+import threading
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from ..git.fingerprint import DEFAULT_OBJECT_FORMAT, get_blob_hash
+
+DEFAULT_SUMMARY_CACHE_SIZE = 32768
+
+# Import statement as imported module, imported names and relative import level
+PythonImport = Tuple[Optional[str], Tuple[str, ...], int]
+
+__summary_cache__: 'OrderedDict[str, PythonFileSummary]' = OrderedDict()
+__summary_cache_lock__ = threading.Lock()
+
+
+def get_literal_value(node: ast.AST) -> Any:
+    """
+    Get value of a literal expression node, or None if the value is not a literal
+    """
+    try:
+        return ast.literal_eval(node)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+
+
+def iter_assignment_targets(node: ast.AST) -> Iterator[Tuple[str, Optional[ast.AST]]]:
+    """
+    Iterate names and value nodes assigned in a top level assignment statement
+    """
+    if isinstance(node, ast.Assign):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                yield target.id, node.value
+    elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        yield node.target.id, node.value
+
+
+class PythonSymbol:
+    """
+    Top level class, function or constant in python file
+    """
+    __slots__ = ('name', 'kind', 'lineno', 'docstring', 'value')
+
+    name: str
+    kind: str
+    lineno: int
+    docstring: Optional[str]
+    value: Any
+
+    def __init__(self,
+                 name: str,
+                 kind: str,
+                 lineno: int,
+                 docstring: Optional[str] = None,
+                 value: Any = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.lineno = lineno
+        self.docstring = docstring
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f'{self.kind} {self.name}'
+
+    def to_dict(self) -> Dict:
+        """
+        Return symbol as dictionary
+        """
+        return {
+            'name': self.name,
+            'kind': self.kind,
+            'lineno': self.lineno,
+            'docstring': self.docstring,
+            'value': self.value,
+        }
+
+
+class PythonFileSummary:
+    """
+    Summary of python file contents parsed with ast
+
+    If the file can't be parsed, syntax_error contains the error and other details
+    are empty
+    """
+    fingerprint: str
+    docstring: Optional[str]
+    classes: List[PythonSymbol]
+    functions: List[PythonSymbol]
+    constants: List[PythonSymbol]
+    all: Optional[List[str]]
+    version: Optional[str]
+    imports: List[PythonImport]
+    syntax_error: Optional[str]
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.docstring = None
+        self.classes = []
+        self.functions = []
+        self.constants = []
+        self.all = None
+        self.version = None
+        self.imports = []
+        self.syntax_error = None
+
+    def __repr__(self) -> str:
+        return f'summary {self.fingerprint}'
+
+    @classmethod
+    def from_source(cls, source: Union[str, bytes], fingerprint: str) -> 'PythonFileSummary':
+        """
+        Parse summary from python source code
+        """
+        summary = cls(fingerprint)
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError, MemoryError, RecursionError) as error:
+            summary.syntax_error = str(error)
+            return summary
+        summary.docstring = ast.get_docstring(tree)
+
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef):
+                summary.classes.append(PythonSymbol(node.name, 'class', node.lineno, ast.get_docstring(node)))
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                summary.functions.append(PythonSymbol(node.name, 'function', node.lineno, ast.get_docstring(node)))
+            elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+                summary.__add_assignment__(node)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    summary.imports.append((alias.name, (), 0))
+            elif isinstance(node, ast.ImportFrom):
+                summary.imports.append((node.module, tuple(alias.name for alias in node.names), node.level))
+        return summary
+
+    def __add_assignment__(self, node: ast.AST) -> None:
+        """
+        Add top level assignment to constants, __all__ or __version__
+
+        Constants are names in upper case
+        """
+        for name, value in iter_assignment_targets(node):
+            if name == '__all__':
+                names = get_literal_value(value) if value is not None else None
+                if isinstance(names, (list, tuple)) and all(isinstance(item, str) for item in names):
+                    self.all = list(names)
+            elif name == '__version__':
+                version = get_literal_value(value) if value is not None else None
+                if isinstance(version, str):
+                    self.version = version
+            elif name.isupper():
+                self.constants.append(PythonSymbol(
+                    name,
+                    'constant',
+                    node.lineno,
+                    value=get_literal_value(value) if value is not None else None,
+                ))
+
+    @property
+    def symbols(self) -> List[PythonSymbol]:
+        """
+        Return all top level symbols sorted by line number
+        """
+        return sorted(self.classes + self.functions + self.constants, key=lambda symbol: symbol.lineno)
+
+    @property
+    def public_names(self) -> List[str]:
+        """
+        Return names in __all__, or top level symbol names not starting with underscore
+        """
+        if self.all is not None:
+            return list(self.all)
+        return [symbol.name for symbol in self.symbols if not symbol.name.startswith('_')]
+
+    def get_imported_names(self, import_path: str, is_package: bool = False) -> List[str]:
+        """
+        Get absolute dotted names imported by the file with specified import path
+
+        For from imports both the module and module.name are returned, because the
+        imported name can be a submodule. Relative imports beyond the top level package
+        are skipped.
+        """
+        package_parts = import_path.split('.') if import_path else []
+        if not is_package:
+            package_parts = package_parts[:-1]
+
+        names = []
+        for module, imported, level in self.imports:
+            if level:
+                if level > len(package_parts):
+                    continue
+                parts = package_parts[:len(package_parts) - level + 1]
+                if module:
+                    parts = parts + module.split('.')
+                base = '.'.join(parts)
+            else:
+                base = module
+            if not base:
+                continue
+            names.append(base)
+            names.extend(f'{base}.{name}' for name in imported if name != '*')
+        return names
+
+    def to_dict(self) -> Dict:
+        """
+        Return summary as dictionary
+        """
+        return {
+            'fingerprint': self.fingerprint,
+            'docstring': self.docstring,
+            'classes': [symbol.to_dict() for symbol in self.classes],
+            'functions': [symbol.to_dict() for symbol in self.functions],
+            'constants': [symbol.to_dict() for symbol in self.constants],
+            'all': self.all,
+            'version': self.version,
+            'imports': [list(item) for item in self.imports],
+            'syntax_error': self.syntax_error,
+        }
+
+
+def store_file_summary(summary: PythonFileSummary,
+                       max_size: int = DEFAULT_SUMMARY_CACHE_SIZE) -> PythonFileSummary:
+    """
+    Store summary to the cache by fingerprint, dropping least recently used summaries
+
+    If a summary with the same fingerprint is already cached, the cached summary is kept
+    and returned, so files with same contents share one summary object
+    """
+    with __summary_cache_lock__:
+        summary = __summary_cache__.setdefault(summary.fingerprint, summary)
+        __summary_cache__.move_to_end(summary.fingerprint)
+        while len(__summary_cache__) > max_size:
+            __summary_cache__.popitem(last=False)
+        return summary
+
+
+def get_cached_file_summary(fingerprint: str) -> Optional[PythonFileSummary]:
+    """
+    Get cached summary by fingerprint, or None if the summary is not cached
+    """
+    with __summary_cache_lock__:
+        summary = __summary_cache__.get(fingerprint, None)
+        if summary is not None:
+            __summary_cache__.move_to_end(fingerprint)
+        return summary
+
+
+def read_file_summary(path: Union[str, Path],
+                      object_format: str = DEFAULT_OBJECT_FORMAT) -> Optional[PythonFileSummary]:
+    """
+    Read and parse summary for python file without using the cache
+
+    The summary fingerprint is computed from the contents read. Returns None if the file
+    can't be read.
+    """
+    try:
+        with open(path, 'rb') as filedescriptor:
+            data = filedescriptor.read()
+    except OSError:
+        return None
+    return PythonFileSummary.from_source(data, get_blob_hash(data, object_format))
+
+
+def get_file_summary(path: Union[str, Path],
+                     fingerprint: Optional[str] = None,
+                     object_format: str = DEFAULT_OBJECT_FORMAT) -> Optional[PythonFileSummary]:
+    """
+    Get summary for python file, parsing the file only if the fingerprint is not cached
+
+    Without fingerprint or if the file was modified after the fingerprint was computed,
+    the summary is cached by the fingerprint of the contents read from the file.
+    Returns None if the file can't be read.
+    """
+    if fingerprint is not None:
+        summary = get_cached_file_summary(fingerprint)
+        if summary is not None:
+            return summary
+    summary = read_file_summary(path, object_format)
+    if summary is not None:
+        summary = store_file_summary(summary)
+    return summary
+
+
+def clear_summary_cache() -> None:
+    """
+    Remove all cached file summaries
+    """
+    with __summary_cache_lock__:
+        __summary_cache__.clear()
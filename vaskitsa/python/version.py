@@ -57,10 +57,18 @@ class PythonPackageVersion(Version):
 
     def __load_module_version__(self) -> Optional[str]:
         """
-        Read version string from pyproject.toml file or __init__.py variable __version__
+        Read version string from __init__.py variable __version__
+
+        The version is read from the cached file summary. Lines are matched with
+        RE_VERSION_LINE only if the file can't be parsed.
         """
         module = self.package.get_python_module(self.main_module_name)
         if module and module.index:
+            summary = module.index.summary
+            if summary is not None and summary.syntax_error is None:
+                if summary.version is not None:
+                    self.version_type = VersionTypes.MODULE
+                return summary.version
             with open(module.index.path, 'r', encoding='utf-8') as filedescriptor:
                 for line in filedescriptor.readlines():
                     match = RE_VERSION_LINE.match(line)
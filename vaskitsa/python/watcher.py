@@ -0,0 +1,433 @@
+"""
+Watch python package files and keep loaded package modules up to date
+
+Changes are detected with inotify on Linux and by polling stat details of python
+files and directories on other platforms. Bursts of events, for example from
+editors saving files or git checkouts, are collected until no new events arrive
+within the debounce interval and then applied to the package with
+Package.refresh(), which updates only the changed modules.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .module import PythonModule
+    from .package import Package
+
+DEFAULT_DEBOUNCE_INTERVAL = 0.2
+"""Seconds without new events before collected changes are applied"""
+DEFAULT_MAX_DELAY = 5.0
+"""Maximum seconds to collect events from a continuous burst of changes"""
+DEFAULT_POLL_INTERVAL = 1.0
+"""Seconds between filesystem polls with the polling backend"""
+STOP_CHECK_INTERVAL = 0.5
+"""Seconds between checks for stop requests while waiting for changes"""
+
+# inotify constants from sys/inotify.h
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+INOTIFY_WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR
+)
+INOTIFY_EVENT_HEADER = struct.Struct('iIII')
+INOTIFY_READ_SIZE = 65536
+
+ChangeCallback = Callable[['Package', List['PythonModule']], None]
+
+
+class WatcherBackend:
+    """
+    Base class for filesystem change detection backends
+    """
+    watcher: 'PackageWatcher'
+    overflow: bool
+
+    def __init__(self, watcher: 'PackageWatcher') -> None:
+        self.watcher = watcher
+        self.overflow = False
+
+    def start(self) -> None:
+        """
+        Start detecting changes
+        """
+        raise NotImplementedError('start() must be implemented in child class')
+
+    def read_changes(self, timeout: float) -> Set[Path]:
+        """
+        Wait up to timeout seconds for changes, returning changed paths
+
+        If changes were lost the backend sets overflow flag
+        """
+        raise NotImplementedError('read_changes() must be implemented in child class')
+
+    def close(self) -> None:
+        """
+        Stop detecting changes and release resources
+        """
+
+
+class InotifyBackend(WatcherBackend):
+    """
+    Linux inotify backend for change detection
+
+    Every directory in the package is watched separately, because inotify watches
+    are not recursive. New directories are added to watches when created or moved into
+    the package, and watches for directories deleted or moved away are removed. If the
+    package directory itself is deleted or moved, overflow is set to rescan the package.
+    """
+    __fd__: Optional[int]
+    __watches__: Dict[int, Path]
+
+    def __init__(self, watcher: 'PackageWatcher') -> None:
+        super().__init__(watcher)
+        library = ctypes.util.find_library('c')
+        if library is None:
+            raise OSError('C library not found')
+        self.__libc__ = ctypes.CDLL(library, use_errno=True)
+        if not hasattr(self.__libc__, 'inotify_init1'):
+            raise OSError('inotify is not supported by C library')
+        self.__fd__ = None
+        self.__watches__ = {}
+
+    def __add_watch__(self, path: str) -> None:
+        """
+        Add inotify watch for a directory
+
+        Directories removed before adding the watch are ignored
+        """
+        descriptor = self.__libc__.inotify_add_watch(self.__fd__, os.fsencode(path), INOTIFY_WATCH_MASK)
+        if descriptor < 0:
+            error = ctypes.get_errno()
+            if error in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(error, f'Error adding inotify watch for {path}: {os.strerror(error)}')
+        self.__watches__[descriptor] = Path(path)
+
+    def __remove_watches__(self, path: Path) -> None:
+        """
+        Remove inotify watches for a directory and directories under it
+        """
+        for descriptor, directory in list(self.__watches__.items()):
+            if directory == path or path in directory.parents:
+                self.__libc__.inotify_rm_watch(self.__fd__, descriptor)
+                del self.__watches__[descriptor]
+
+    def __add_watches__(self, path: Optional[Path] = None) -> None:
+        """
+        Add watches for all directories in the package or under specified directory
+        """
+        for directory, _filenames in self.watcher.scanner.iter_directories(path):
+            self.__add_watch__(directory)
+
+    def start(self) -> None:
+        """
+        Initialize inotify and add watches for package directories
+        """
+        self.__fd__ = self.__libc__.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.__fd__ < 0:
+            error = ctypes.get_errno()
+            self.__fd__ = None
+            raise OSError(error, f'Error initializing inotify: {os.strerror(error)}')
+        try:
+            self.__add_watches__()
+        except OSError:
+            self.close()
+            raise
+
+    def read_changes(self, timeout: float) -> Set[Path]:
+        """
+        Wait up to timeout seconds for inotify events, returning changed paths
+        """
+        changes = set()
+        if not select.select([self.__fd__], [], [], max(timeout, 0))[0]:
+            return changes
+        try:
+            data = os.read(self.__fd__, INOTIFY_READ_SIZE)
+        except BlockingIOError:
+            return changes
+
+        offset = 0
+        while offset + INOTIFY_EVENT_HEADER.size <= len(data):
+            descriptor, mask, _cookie, length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self.__watches__.pop(descriptor, None)
+                continue
+            directory = self.__watches__.get(descriptor, None)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # Directories moved within the package were already watched with the new
+                # path from IN_MOVED_TO, because watches are shared for the same inode
+                if not os.path.isdir(directory):
+                    if directory == Path(self.watcher.package):
+                        self.overflow = True
+                    self.__remove_watches__(directory)
+                    changes.add(directory)
+                continue
+            if not name:
+                continue
+
+            path = directory.joinpath(name)
+            is_directory = bool(mask & IN_ISDIR)
+            if self.watcher.scanner.is_excluded(path.relative_to(self.watcher.package).parts, is_directory):
+                continue
+            if is_directory:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.__add_watches__(path)
+            elif not self.watcher.is_python_file(name):
+                continue
+            changes.add(path)
+        return changes
+
+    def close(self) -> None:
+        """
+        Close inotify file descriptor
+        """
+        if self.__fd__ is not None:
+            os.close(self.__fd__)
+            self.__fd__ = None
+        self.__watches__ = {}
+
+
+class PollingBackend(WatcherBackend):
+    """
+    Change detection backend polling stat details of package python files and directories
+    """
+    __snapshot__: Dict[Path, Optional[Tuple[int, int, int]]]
+    __next_poll__: float
+
+    def __init__(self, watcher: 'PackageWatcher') -> None:
+        super().__init__(watcher)
+        self.__snapshot__ = {}
+        self.__next_poll__ = 0
+
+    def __load_snapshot__(self) -> Dict[Path, Optional[Tuple[int, int, int]]]:
+        """
+        Load stat details for python files in the package
+
+        Directories are stored with no stat details, because changes in directories are
+        detected from added and removed paths
+        """
+        snapshot = {}
+        for directory, filenames in self.watcher.scanner.iter_directories():
+            snapshot[Path(directory)] = None
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[Path(path)] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def start(self) -> None:
+        """
+        Load initial snapshot of package files
+        """
+        self.__snapshot__ = self.__load_snapshot__()
+        self.__next_poll__ = time.monotonic() + self.watcher.poll_interval
+
+    def read_changes(self, timeout: float) -> Set[Path]:
+        """
+        Poll package files if poll interval expires within timeout seconds, returning changed paths
+        """
+        wait = self.__next_poll__ - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self.__next_poll__ = time.monotonic() + self.watcher.poll_interval
+
+        snapshot = self.__load_snapshot__()
+        changes = set(snapshot.keys()) ^ set(self.__snapshot__.keys())
+        for path, details in snapshot.items():
+            if details is not None and path in self.__snapshot__ and self.__snapshot__[path] != details:
+                changes.add(path)
+        self.__snapshot__ = snapshot
+        return changes
+
+
+class PackageWatcher:
+    """
+    Watch package for changes and keep the loaded package modules up to date
+    """
+    package: 'Package'
+    debounce: float
+    max_delay: float
+    poll_interval: float
+    polling: bool
+    backend: Optional[WatcherBackend]
+
+    def __init__(self,
+                 package: 'Package',
+                 debounce: float = DEFAULT_DEBOUNCE_INTERVAL,
+                 max_delay: float = DEFAULT_MAX_DELAY,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 polling: bool = False) -> None:
+        self.package = package
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.polling = polling
+        self.backend = None
+        self.scanner = package.scanner
+        self.__stop_event__ = threading.Event()
+
+    def __repr__(self) -> str:
+        return f'watcher {self.package}'
+
+    def __enter__(self) -> 'PackageWatcher':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @staticmethod
+    def is_python_file(name: str) -> bool:
+        """
+        Check if filename is a python file
+        """
+        return name.endswith('.py')
+
+    def __get_backend__(self) -> WatcherBackend:
+        """
+        Start inotify backend if available, falling back to polling backend
+        """
+        if not self.polling and sys.platform.startswith('linux'):
+            try:
+                backend = InotifyBackend(self)
+                backend.start()
+                return backend
+            except OSError as error:
+                self.package.debug(f'inotify not available, polling for changes: {error}')
+        backend = PollingBackend(self)
+        backend.start()
+        return backend
+
+    def start(self) -> None:
+        """
+        Load package modules and start detecting changes
+        """
+        if self.backend is None:
+            # pylint: disable=pointless-statement
+            self.package.python_modules
+            self.__stop_event__.clear()
+            self.backend = self.__get_backend__()
+
+    def stop(self) -> None:
+        """
+        Request a running watcher to stop
+        """
+        self.__stop_event__.set()
+
+    def close(self) -> None:
+        """
+        Stop detecting changes
+        """
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+    def wait_for_changes(self, timeout: Optional[float] = None) -> List[Path]:
+        """
+        Wait for changes in the package, returning sorted list of changed paths
+
+        After the first change events are collected until no new events arrive within the
+        debounce interval or max_delay seconds have passed. Returns empty list if timeout
+        expires or stop() is called before any changes are detected.
+        """
+        self.start()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        changes = set()
+        first_change = None
+        while not self.__stop_event__.is_set():
+            now = time.monotonic()
+            if first_change is None:
+                if deadline is not None and now >= deadline:
+                    break
+                wait = STOP_CHECK_INTERVAL if deadline is None else min(STOP_CHECK_INTERVAL, deadline - now)
+            else:
+                wait = min(self.debounce, first_change + self.max_delay - now)
+                if wait <= 0:
+                    break
+
+            events = self.backend.read_changes(wait)
+            if events or self.backend.overflow:
+                if first_change is None:
+                    first_change = now
+                changes.update(events)
+            elif first_change is not None:
+                break
+        return sorted(changes)
+
+    def update(self, paths: List[Path]) -> List['PythonModule']:
+        """
+        Apply changed paths to the package, returning affected modules
+
+        Modules removed by the changes are returned after the loaded modules. Removed
+        modules are no longer in package python_modules or python_test_modules. If the
+        backend lost events the package is fully rescanned and all modules are returned.
+        """
+        package = self.package
+        if self.backend is not None and self.backend.overflow:
+            self.backend.overflow = False
+            previous = package.python_modules + package.python_test_modules
+            package.refresh()
+            modules = package.python_modules + package.python_test_modules
+        else:
+            previous = package.get_python_modules_for_paths(paths)
+            package.refresh(paths=paths)
+            modules = package.get_python_modules_for_paths(paths)
+
+        loaded = set(module.relative_directory for module in package.python_modules + package.python_test_modules)
+        return modules + [module for module in previous if module.relative_directory not in loaded]
+
+    def run(self, callback: Optional[ChangeCallback] = None) -> None:
+        """
+        Watch the package until stop() is called
+
+        Callback is called with the package and affected modules after each set of changes
+        is applied to the package
+        """
+        self.start()
+        try:
+            while not self.__stop_event__.is_set():
+                paths = self.wait_for_changes()
+                if not paths and (self.backend is None or not self.backend.overflow):
+                    continue
+                modules = self.update(paths)
+                if callback is not None:
+                    callback(self.package, modules)
+        finally:
+            self.close()
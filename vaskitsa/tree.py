@@ -49,6 +49,7 @@ class RepositoryTree(Tree):
         self.excluded = list(excluded) if isinstance(excluded, (tuple, list)) else []
         # pylint: disable=no-member
         self.excluded.extend(self.configuration.ignored_directories)
+        self.excluded.extend(self.configuration.ignored_cache_directories)
 
         super().__init__(path, create_missing, sorted, mode, self.excluded)
 